@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Compare blocking calls through a Client with concurrent calls through a
+# psphere.aio.AsyncClient, against the tests' local stub server answering
+# each request after a simulated latency.
+#
+# Example usage, from the top of the source tree:
+# PYTHONPATH=. python ./examples/benchmark_async.py --calls 500
+
+import time
+
+from psphere.aio import AsyncClient
+from psphere.soap import ManagedObjectReference
+
+from tests import stub
+
+
+def main(options):
+    server = stub.server()
+    server.latency = options.latency
+    for i in range(options.calls):
+        server.add("VirtualMachine", "vm-%s" % i,
+                   name=stub.string("vm-%s" % i))
+        server.add("Task", "task-%s" % i,
+                   info_state=("TaskInfoState", "success"))
+
+    client = stub.client()
+    aclient = AsyncClient(client, max_connections=options.connections)
+
+    start = time.time()
+    for i in range(options.calls):
+        client.si.CurrentTime()
+    elapsed = time.time() - start
+    print("Client: %s calls in %.2f seconds" % (options.calls, elapsed))
+
+    start = time.time()
+    times = aclient.run([aclient.invoke("CurrentTime", client.si)
+                         for i in range(options.calls)])
+    elapsed = time.time() - start
+    print("AsyncClient: %s calls in %.2f seconds over %s connections" %
+          (len(times), elapsed, options.connections))
+
+    mo_refs = [ManagedObjectReference("VirtualMachine", "vm-%s" % i)
+               for i in range(options.calls)]
+    start = time.time()
+    views = aclient.run([aclient.get_views(mo_refs[i:i + 10], ["name"])
+                         for i in range(0, len(mo_refs), 10)])
+    print("AsyncClient: %s views in %s get_views in %.2f seconds" %
+          (sum(len(batch) for batch in views), len(views),
+           time.time() - start))
+
+    tasks = [client.get_view(ManagedObjectReference("Task", "task-%s" % i))
+             for i in range(options.calls)]
+    start = time.time()
+    aclient.run([aclient.wait_for_task(task) for task in tasks])
+    print("AsyncClient: waited for %s tasks in %.2f seconds" %
+          (len(tasks), time.time() - start))
+
+    aclient.close()
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--calls", dest="calls", type="int", default=500,
+                      help="The number of calls to make")
+    parser.add_option("--connections", dest="connections", type="int",
+                      default=8, help="The AsyncClient's maximum connections")
+    parser.add_option("--latency", dest="latency", type="float", default=0.02,
+                      help="The seconds the stub takes to answer")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Time creating SOAP objects with client.create, which copies a prototype
+# of each type, against building each one from the schema with the suds
+# factory as psphere used to. No server is needed.
+#
+# Example usage:
+# python ./examples/benchmark_create.py --objects 100000
+
+import os
+import time
+
+import suds.client
+
+import psphere.client
+
+from psphere.client import Client
+
+
+def main(options):
+    wsdl_dir = os.path.join(os.path.dirname(os.path.abspath(
+        psphere.client.__file__)), "wsdl")
+    # A Client which only loads the WSDL and never contacts a server
+    client = Client.__new__(Client)
+    suds.client.Client.__init__(client, "file://%s/vimService.wsdl" %
+                                wsdl_dir)
+
+    for type_ in options.types.split(","):
+        start = time.time()
+        for i in xrange(options.objects):
+            client.factory.create("ns0:%s" % type_)
+        built = time.time() - start
+
+        start = time.time()
+        for i in xrange(options.objects):
+            client.create(type_)
+        copied = time.time() - start
+        print("%s %s: factory %.2f, client.create %.2f seconds (%.1fx)" %
+              (options.objects, type_, built, copied, built / copied))
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--objects", dest="objects", type="int",
+                      default=100000, help="The number of each to create")
+    parser.add_option("--types", dest="types",
+                      default="PropertySpec,ObjectSpec",
+                      help="The comma separated types to create")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Measure the size of the RetrievePropertiesRequest envelope which
+# get_views sends for many VMs, and the time taken to build and marshal it,
+# against a PropertySpec per VM as psphere used to send. Also time building
+# the inventory search filter with and without the traversal specs cached.
+# The envelopes are marshalled by suds locally, no server is needed.
+#
+# Example usage:
+# python ./examples/benchmark_filter_spec.py --vms 5000
+
+import os
+import time
+
+import suds.client
+
+import psphere.client
+
+from psphere.client import Client
+from psphere.soap import ManagedObjectReference
+
+
+def per_mor_filter_spec(client, mo_refs, properties):
+    """Build the filter the way get_views_filter_spec used to."""
+    property_specs = []
+    for mo_ref in mo_refs:
+        property_spec = client.create('PropertySpec')
+        property_spec.type = str(mo_ref._type)
+        property_spec.all = False
+        property_spec.pathSet = properties
+        property_specs.append(property_spec)
+
+    object_specs = []
+    for mo_ref in mo_refs:
+        object_spec = client.create('ObjectSpec')
+        object_spec.obj = mo_ref
+        object_specs.append(object_spec)
+
+    pfs = client.create('PropertyFilterSpec')
+    pfs.propSet = property_specs
+    pfs.objectSet = object_specs
+    return pfs
+
+
+def marshal(client, pfs):
+    method = client.service.RetrieveProperties.method
+    _this = ManagedObjectReference("PropertyCollector", "propertyCollector")
+    envelope = method.binding.input.get_message(
+        method, (), {"_this": _this, "specSet": pfs})
+    return envelope.plain()
+
+
+def main(options):
+    wsdl_dir = os.path.join(os.path.dirname(os.path.abspath(
+        psphere.client.__file__)), "wsdl")
+    # A Client which only loads the WSDL and never contacts a server
+    client = Client.__new__(Client)
+    suds.client.Client.__init__(client, "file://%s/vimService.wsdl" %
+                                wsdl_dir)
+    client._traversal_specs = None
+    client._container_traversal_spec = None
+    client._property_specs = {}
+
+    mo_refs = [ManagedObjectReference("VirtualMachine", "vm-%s" % i)
+               for i in range(options.vms)]
+    properties = ["name", "runtime.powerState"]
+    for label, build in (
+            ("PropertySpec per VM", per_mor_filter_spec),
+            ("PropertySpec per type", Client.get_views_filter_spec)):
+        start = time.time()
+        pfs = build(client, mo_refs, properties)
+        built = time.time() - start
+        start = time.time()
+        envelope = marshal(client, pfs)
+        print("%s: %s bytes, built in %.2f and marshalled in %.2f seconds" %
+              (label, len(envelope), built, time.time() - start))
+
+    begin_entity = ManagedObjectReference("Folder", "group-d1")
+    property_spec = client.create('PropertySpec', type="VirtualMachine",
+                                  all=False, pathSet=properties)
+    start = time.time()
+    for i in range(options.searches):
+        client._traversal_specs = None
+        client.get_search_filter_spec(begin_entity, property_spec)
+    print("%s search filters building the traversal specs: %.2f seconds" %
+          (options.searches, time.time() - start))
+    start = time.time()
+    for i in range(options.searches):
+        client.get_search_filter_spec(begin_entity, property_spec)
+    print("%s search filters reusing the traversal specs: %.2f seconds" %
+          (options.searches, time.time() - start))
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--vms", dest="vms", type="int", default=5000,
+                      help="The number of VMs to retrieve properties of")
+    parser.add_option("--searches", dest="searches", type="int",
+                      default=1000, help="The number of search filters")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Measure how long it takes a fresh interpreter to import psphere modules.
+# Each module is imported after the ones before it, so each time is the
+# extra cost of that module.
+#
+# Example usage:
+# python ./examples/benchmark_import.py --runs 10
+
+import subprocess
+import sys
+
+MODULES = ["suds.client", "psphere", "psphere.managedobjects",
+           "psphere.config", "psphere.client"]
+
+SCRIPT = """
+import time
+for name in %r:
+    start = time.time()
+    __import__(name)
+    print("%%s %%f" %% (name, time.time() - start))
+""" % MODULES
+
+
+def main(options):
+    times = dict((name, []) for name in MODULES)
+    for i in range(options.runs):
+        output = subprocess.Popen([sys.executable, "-c", SCRIPT],
+                                  stdout=subprocess.PIPE).communicate()[0]
+        for line in output.splitlines():
+            name, elapsed = line.split()
+            times[name].append(float(elapsed))
+
+    for name in MODULES:
+        print("%-25s %6.1f ms (best of %s)" %
+              (name, min(times[name]) * 1000, options.runs))
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--runs", dest="runs", type="int", default=10,
+                      help="The number of interpreters to time")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Compare the time taken to load the bundled WSDL without the persistent
+# WSDL cache, with an empty (cold) cache and with a populated (warm) cache.
+# This is the part of creating a Client which happens before it contacts
+# the server, so no server is needed.
+#
+# Example usage:
+# python ./examples/benchmark_startup.py
+
+import os
+import shutil
+import tempfile
+import time
+
+import suds.client
+from suds.cache import NoCache
+
+from psphere import __version__
+from psphere.soap import WsdlCache, wsdl_digest
+
+import psphere.client
+
+
+def load(wsdl_uri, **options):
+    start = time.time()
+    suds.client.Client(wsdl_uri, **options)
+    return time.time() - start
+
+
+def main():
+    wsdl_dir = os.path.join(os.path.dirname(psphere.client.__file__), "wsdl")
+    wsdl_uri = "file://%s/vimService.wsdl" % os.path.abspath(wsdl_dir)
+    location = tempfile.mkdtemp()
+    try:
+        start = time.time()
+        key = "%s-%s" % (__version__, wsdl_digest(wsdl_dir))
+        print("Hashing the WSDL: %.2f seconds" % (time.time() - start))
+
+        print("No cache: %.2f seconds" % load(wsdl_uri, cache=NoCache()))
+        cache = WsdlCache(location, key)
+        print("Cold cache: %.2f seconds" %
+              load(wsdl_uri, cache=cache, cachingpolicy=1))
+        print("Warm cache: %.2f seconds" %
+              load(wsdl_uri, cache=cache, cachingpolicy=1))
+    finally:
+        shutil.rmtree(location)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Compare the default suds transport with psphere's KeepAliveTransport by
+# sending small SOAP requests to a local stub server. The stub speaks plain
+# HTTP unless given a certificate, in which case it speaks HTTPS like a real
+# server and the cost of a TLS handshake per request shows up.
+#
+# Example usage:
+# openssl req -x509 -newkey rsa:2048 -nodes -subj /CN=127.0.0.1 \
+#     -keyout stub.pem -out stub.pem
+# python ./examples/benchmark_transport.py --requests 1000 --certfile stub.pem
+
+import ssl
+import threading
+import time
+import zlib
+
+from BaseHTTPServer import BaseHTTPRequestHandler
+from SocketServer import ThreadingTCPServer
+from suds.transport import Request
+from suds.transport.https import HttpAuthenticated
+
+from psphere.soap import ConnectionPool, KeepAliveTransport
+
+REPLY = ('<?xml version="1.0" encoding="UTF-8"?>'
+         '<soapenv:Envelope '
+         'xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">'
+         '<soapenv:Body><CurrentTimeResponse xmlns="urn:vim25">'
+         '<returnval>2013-04-05T00:00:00Z</returnval>'
+         '</CurrentTimeResponse></soapenv:Body></soapenv:Envelope>')
+
+REQUEST = ('<?xml version="1.0" encoding="UTF-8"?>'
+           '<SOAP-ENV:Envelope '
+           'xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/">'
+           '<SOAP-ENV:Body><CurrentTime xmlns="urn:vim25">'
+           '<_this type="ServiceInstance">ServiceInstance</_this>'
+           '</CurrentTime></SOAP-ENV:Body></SOAP-ENV:Envelope>')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every POST with the same SOAP reply."""
+    protocol_version = "HTTP/1.1"
+    # Buffer the reply so it isn't sent a header at a time
+    wbufsize = -1
+
+    def handle(self):
+        try:
+            BaseHTTPRequestHandler.handle(self)
+        except ssl.SSLError:
+            # The client closed a kept alive connection without a TLS close
+            pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = REPLY
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Set-Cookie", 'vmware_soap_session="abc"; Path=/')
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            compressor = zlib.compressobj(6, zlib.DEFLATED,
+                                          16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(transport, url, count):
+    start = time.time()
+    for i in range(count):
+        transport.send(Request(url, REQUEST))
+    return time.time() - start
+
+
+def main(options):
+    # Not HTTPServer, which does a reverse DNS lookup of the address. A
+    # thread per connection stops a kept alive connection blocking others
+    server = ThreadingTCPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    scheme = "http"
+    if options.certfile is not None:
+        server.socket = ssl.wrap_socket(server.socket, server_side=True,
+                                        certfile=options.certfile)
+        # The stub's certificate is self-signed
+        ssl._create_default_https_context = ssl._create_unverified_context
+        scheme = "https"
+    url = "%s://127.0.0.1:%s/sdk" % (scheme, server.server_address[1])
+
+    pool = ConnectionPool()
+    transports = [("urllib2", HttpAuthenticated()),
+                  ("keepalive", KeepAliveTransport(pool=pool))]
+    for name, transport in transports:
+        elapsed = run(transport, url, options.requests)
+        print("%s: %s requests in %.2f seconds (%.2f ms per request)" %
+              (name, options.requests, elapsed,
+               elapsed * 1000 / options.requests))
+
+    pool.close()
+    server.shutdown()
+    server.server_close()
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--requests", dest="requests", type="int",
+                      default=1000, help="The number of requests to send")
+    parser.add_option("--certfile", dest="certfile",
+                      help="A PEM certificate and key to serve HTTPS with")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Time Client._unmarshal over a RetrievePropertiesResponse containing the
+# config of many VMs. The response is generated and parsed by suds locally,
+# no server is needed.
+#
+# With --stream the response is instead parsed and unmarshalled one object
+# at a time by psphere.soap.ObjectContentStream. Run once with and once
+# without to compare the peak memory used.
+#
+# Example usage:
+# python ./examples/benchmark_unmarshal.py --vms 2000
+# python ./examples/benchmark_unmarshal.py --vms 2000 --stream
+
+import os
+import resource
+import time
+import weakref
+
+import suds.client
+
+import psphere.client
+
+from psphere.client import Client
+from psphere.soap import ObjectContentStream
+
+ENVELOPE = """<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+ xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+ xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<soapenv:Body>
+<RetrievePropertiesResponse xmlns="urn:vim25">%s</RetrievePropertiesResponse>
+</soapenv:Body>
+</soapenv:Envelope>"""
+
+DISK = """<device xsi:type="VirtualDisk"><key>%(key)s</key>
+<deviceInfo><label>Hard disk %(key)s</label><summary>10,485,760 KB</summary>
+</deviceInfo>
+<backing xsi:type="VirtualDiskFlatVer2BackingInfo">
+<fileName>[datastore1] vm-%(vm)s/vm-%(vm)s_%(key)s.vmdk</fileName>
+<datastore type="Datastore">datastore-1</datastore>
+<diskMode>persistent</diskMode><thinProvisioned>true</thinProvisioned>
+</backing>
+<controllerKey>1000</controllerKey><unitNumber>%(key)s</unitNumber>
+<capacityInKB>10485760</capacityInKB></device>"""
+
+NIC = """<device xsi:type="VirtualE1000"><key>%(key)s</key>
+<deviceInfo><label>Network adapter 1</label><summary>VM Network</summary>
+</deviceInfo>
+<backing xsi:type="VirtualEthernetCardNetworkBackingInfo">
+<deviceName>VM Network</deviceName><useAutoDetect>false</useAutoDetect>
+<network type="Network">network-1</network></backing>
+<connectable><startConnected>true</startConnected>
+<allowGuestControl>true</allowGuestControl><connected>true</connected>
+</connectable>
+<addressType>assigned</addressType>
+<macAddress>00:50:56:00:00:01</macAddress></device>"""
+
+OBJECT = """<returnval><obj type="VirtualMachine">vm-%(vm)s</obj>
+<propSet><name>config</name><val xsi:type="VirtualMachineConfigInfo">
+<changeVersion>1</changeVersion><modified>2013-04-05T00:00:00Z</modified>
+<name>vm-%(vm)s</name><guestFullName>Red Hat Enterprise Linux 6</guestFullName>
+<version>vmx-08</version><uuid>4201c3bc-%(vm)s</uuid>
+<template>false</template><guestId>rhel6_64Guest</guestId>
+<alternateGuestName></alternateGuestName>
+<files><vmPathName>[datastore1] vm-%(vm)s/vm-%(vm)s.vmx</vmPathName></files>
+<tools><toolsVersion>8384</toolsVersion></tools>
+<flags><disableAcceleration>false</disableAcceleration></flags>
+<defaultPowerOps><powerOffType>soft</powerOffType></defaultPowerOps>
+<hardware><numCPU>2</numCPU><memoryMB>4096</memoryMB>%(devices)s</hardware>
+<extraConfig><key>tools.syncTime</key><value xsi:type="xsd:string">FALSE</value>
+</extraConfig>
+</val></propSet></returnval>"""
+
+
+def make_reply(vms, disks):
+    objects = []
+    for vm in range(vms):
+        devices = [DISK % {"vm": vm, "key": 2000 + key}
+                   for key in range(disks)]
+        devices.append(NIC % {"key": 4000})
+        objects.append(OBJECT % {"vm": vm, "devices": "".join(devices)})
+    return ENVELOPE % "".join(objects)
+
+
+def main(options):
+    wsdl_dir = os.path.join(os.path.dirname(os.path.abspath(
+        psphere.client.__file__)), "wsdl")
+    # A Client which only loads the WSDL and never contacts a server
+    client = Client.__new__(Client)
+    suds.client.Client.__init__(client, "file://%s/vimService.wsdl" %
+                                wsdl_dir)
+    client._mor_free_types = None
+    client._get_mor_free_types()
+    client.identity_map_size = None
+    client._identity_map = weakref.WeakValueDictionary()
+
+    reply = make_reply(options.vms, options.disks)
+    print("Parsing %s VMs, %s bytes of XML" % (options.vms, len(reply)))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    if options.stream is True:
+        method = client.service.RetrieveProperties.method
+        stream = ObjectContentStream(method.binding.input, method, reply,
+                                     convert=client._unmarshal)
+        for object_content in stream:
+            # A real caller would populate a view here and drop the data
+            pass
+        print("Streamed in %.2f seconds" % (time.time() - start))
+    else:
+        object_contents = client.service.RetrieveProperties(
+            _this=None, specSet=None, __inject={"reply": reply})
+        print("Parsed in %.2f seconds" % (time.time() - start))
+        start = time.time()
+        for object_content in object_contents:
+            client._unmarshal(object_content)
+        print("Unmarshalled in %.2f seconds" % (time.time() - start))
+
+    print("Peak memory grew by %.1f MB" %
+          ((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) /
+           1024.0))
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--vms", dest="vms", type="int", default=2000,
+                      help="The number of VMs in the response")
+    parser.add_option("--disks", dest="disks", type="int", default=4,
+                      help="The number of disks each VM has")
+    parser.add_option("--stream", dest="stream", action="store_true",
+                      default=False,
+                      help="Parse with psphere.soap.ObjectContentStream")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -0,0 +1,79 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Measure the memory and time taken to build many VirtualMachine views, as
+# find_entity_views does, from a canned ObjectContent. The property values
+# are shared by every view so only the cost of the views themselves is
+# measured. No server is needed.
+#
+# Example usage:
+# python ./examples/benchmark_views.py --views 100000
+
+import resource
+import time
+
+from suds.sudsobject import Factory
+
+from psphere.managedobjects import VirtualMachine
+from psphere.soap import ManagedObjectReference
+
+
+def canned_object_content():
+    runtime = Factory.object("VirtualMachineRuntimeInfo",
+                             {"connectionState": "connected",
+                              "powerState": "poweredOn"})
+    prop_set = [Factory.object("DynamicProperty",
+                               {"name": "name", "val": "genesis"}),
+                Factory.object("DynamicProperty",
+                               {"name": "runtime", "val": runtime})]
+    return Factory.object("ObjectContent", {"propSet": prop_set})
+
+
+def main(options):
+    object_content = canned_object_content()
+    # The references are built up front, they cost the same either way
+    mo_refs = [ManagedObjectReference("VirtualMachine", "vm-%s" % i)
+               for i in xrange(options.views)]
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    views = []
+    for mo_ref in mo_refs:
+        view = VirtualMachine(mo_ref, None)
+        view._set_view_data(object_content=object_content)
+        views.append(view)
+    elapsed = time.time() - start
+
+    grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+    print("Built %s views in %.2f seconds" % (len(views), elapsed))
+    print("Peak memory grew by %.1f MB, %s bytes per view" %
+          (grown / 1024.0, grown * 1024 / len(views)))
+
+    start = time.time()
+    for view in views:
+        view.name
+        view.runtime
+    print("Read two cached properties of every view in %.2f seconds" %
+          (time.time() - start))
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--views", dest="views", type="int", default=100000,
+                      help="The number of views to build")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# Compare the traversal and container_view search backends by the number of
+# objects found, the size of the responses and the time taken
+#
+# Example usage:
+# python ./examples/compare_search_backends.py --server <server> --username <user> --password <pass> --type VirtualMachine
+
+import time
+
+from suds.plugin import MessagePlugin
+
+from psphere.client import Client
+
+
+class ReplySizePlugin(MessagePlugin):
+    """Accumulates the size of every SOAP reply received."""
+    def __init__(self):
+        self.reply_bytes = 0
+
+    def received(self, context):
+        self.reply_bytes += len(context.reply)
+
+
+def main(options):
+    for backend in ["traversal", "container_view"]:
+        plugin = ReplySizePlugin()
+        client = Client(server=options.server, username=options.username,
+                        password=options.password, plugins=[plugin],
+                        search_backend=backend)
+        # Don't count the replies received while logging in
+        plugin.reply_bytes = 0
+        start = time.time()
+        views = client.find_entity_views(options.type, properties=["name"])
+        elapsed = time.time() - start
+        print("%s: %s objects, %s response bytes, %.2f seconds" %
+              (backend, len(views), plugin.reply_bytes, elapsed))
+        client.logout()
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "Usage: %prog [options]"
+    parser = OptionParser(usage=usage)
+    parser.add_option("--server", dest="server",
+                      help="The server to connect to")
+    parser.add_option("--username", dest="username",
+                      help="The username used to connect to the server")
+    parser.add_option("--password", dest="password",
+                      help="The password used to connect to the server")
+    parser.add_option("--type", dest="type", default="VirtualMachine",
+                      help="The type of ManagedEntity to search for")
+
+    (options, args) = parser.parse_args()
+    main(options)
@@ -4,13 +4,15 @@ import time
 import sys
 
 from psphere.client import Client
+from psphere.errors import ObjectNotFoundError
 from psphere.managedobjects import VirtualMachine
 
 scatter_secs = 8
 
 nodes = sys.argv[1:]
 
-client = Client()
+# Look the VMs up in a local index of names, saved for the next run
+client = Client(entity_index="persistent")
 
 print("Powering on %s VMs" % len(nodes))
 print("Estimated run time with %s seconds sleep between each power on: %s" %
@@ -21,7 +23,7 @@ for node in nodes:
         vm = VirtualMachine.get(client, name=node, properties=["name", "runtime"])
     except ObjectNotFoundError:
         print("WARNING: Could not find VM with name %s" % node)
-        pass
+        continue
 
     print("Powering on %s" % vm.name)
     if vm.runtime.powerState == "poweredOn":
@@ -13,15 +13,144 @@
 # under the License.
 
 import logging
+import threading
 import time
+import weakref
 
-from suds import MethodNotFound
+from collections import MutableMapping
 
 logger = logging.getLogger(__name__)
 
 __version__ = '0.5.3'
 __released__ = '0.5.3 (dev)'
 
+
+class CachePolicy(object):
+    """Decides how long the values of cached properties live.
+
+    There is one instance, psphere.cache_policy, which all cached properties
+    consult. TTLs are looked up for the property, then for the class, going
+    from the class of the object up through its base classes. A TTL set for
+    a property of ManagedObject therefore applies to every managed object::
+
+        from psphere import cache_policy
+        # Refresh VirtualMachine.runtime after 10 seconds
+        cache_policy.set_ttl(10, "VirtualMachine", "runtime")
+        # Keep the capability of every managed object for an hour
+        cache_policy.set_ttl(3600, "ManagedObject", "capability")
+        # Keep every property of a HostSystem for 10 minutes, unless a
+        # property has a TTL of its own
+        cache_policy.set_ttl(600, "HostSystem")
+
+    Policies can also be given in the cache_ttl section of the config file,
+    which is read when a TTL is first needed::
+
+        cache_ttl:
+            VirtualMachine:
+                runtime: 10
+            HostSystem:
+                default: 600
+
+    Properties without a policy use the TTL given to cached_property, 300
+    seconds by default. A TTL of zero never expires, and a negative TTL,
+    such as -1, is never cached so the value is retrieved on every access.
+
+    The number of hits, misses and expiries of each property is counted,
+    see stats().
+
+    """
+    def __init__(self):
+        self._policies = None
+        # The [ttl, hits, misses, expiries] of each (class, property)
+        self._entries = {}
+
+    def _load(self):
+        from psphere.config import _load_config
+        from psphere.errors import ConfigError
+        policies = {}
+        for view_type, ttls in (_load_config().get("cache_ttl") or
+                                {}).items():
+            if not isinstance(ttls, dict):
+                raise ConfigError("cache_ttl must map class names to the "
+                                  "TTLs of their properties")
+            policies[view_type] = dict(ttls)
+        self._policies = policies
+
+    def set_ttl(self, ttl, view_type="ManagedObject", name="default"):
+        """Set the TTL of a property, or of all properties of a class.
+
+        :param ttl: The number of seconds values are cached for, 0 to \
+        cache them forever or -1 to never cache them.
+        :type ttl: int
+        :param view_type: The name of the managed object class.
+        :type view_type: str
+        :param name: The property the TTL is for, by default all \
+        properties of the class.
+        :type name: str
+
+        """
+        if self._policies is None:
+            self._load()
+        self._policies.setdefault(view_type, {})[name] = ttl
+        self._refresh()
+
+    def clear(self):
+        """Remove all policies, including those from the config file."""
+        self._policies = {}
+        self._refresh()
+
+    def ttl(self, cls, name, default=300):
+        """Get the TTL of a property of a class."""
+        if self._policies is None:
+            self._load()
+        classes = [klass.__name__ for klass in cls.__mro__]
+        for key in (name, "default"):
+            for klass in classes:
+                ttls = self._policies.get(klass)
+                if ttls is not None and key in ttls:
+                    return ttls[key]
+        return default
+
+    def _entry(self, cls, name, default):
+        """Get the counters, and current TTL, of a property."""
+        key = (cls, name)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [self.ttl(cls, name, default),
+                                          0, 0, 0, default]
+        return entry
+
+    def _refresh(self):
+        """Look up the TTL of every property again."""
+        for (cls, name), entry in self._entries.items():
+            entry[0] = self.ttl(cls, name, entry[4])
+
+    def stats(self):
+        """Get the hits, misses and expiries of each property.
+
+        Expiries are the misses caused by a value exceeding its TTL.
+
+        :returns: Dicts with the keys hits, misses, expiries and ttl, \
+        keyed by "Class.property".
+        :rtype: dict
+
+        """
+        stats = {}
+        for (cls, name), entry in self._entries.items():
+            stats["%s.%s" % (cls.__name__, name)] = {
+                "ttl": entry[0], "hits": entry[1], "misses": entry[2],
+                "expiries": entry[3]}
+        return stats
+
+    def reset_stats(self):
+        """Set all counters back to zero."""
+        for entry in self._entries.values():
+            entry[1:4] = [0, 0, 0]
+
+
+cache_policy = CachePolicy()
+
+
 class cached_property(object):
     """Decorator for read-only properties evaluated only once within TTL period.
 
@@ -43,40 +172,71 @@ class cached_property(object):
     object which is wrapped by this decorator. Each entry in the cache is
     created only when the property is accessed for the first time and is a
     two-element tuple with the last computed property value and the last time
-    it was updated in seconds since the epoch.
+    it was updated in seconds since the epoch. ManagedObject views keep their
+    values in a more compact store, their '_cache' attribute is a
+    PropertyCache which presents the store as the same dictionary.
 
     The default time-to-live (TTL) is 300 seconds (5 minutes). Set the TTL to
-    zero for the cached value to never expire.
+    zero for the cached value to never expire, or below zero for the value
+    to be retrieved on every access. The TTL given here can be
+    overridden for each class and property, see :class:`CachePolicy`.
 
     To expire a cached property value manually just do::
     
         del instance._cache[<property name>]
 
     """
-    def __init__(self, fget, doc=None):
-        self.ttl = 300
+    def __init__(self, fget=None, doc=None, ttl=300):
+        self.ttl = ttl
         self.fget = fget
-        self.__doc__ = doc or fget.__doc__
-        self.__name__ = fget.__name__
-        self.__module__ = fget.__module__
+        self.__doc__ = doc
+        if fget is not None:
+            self.__doc__ = doc or fget.__doc__
+            self.__name__ = fget.__name__
+            self.__module__ = fget.__module__
+
+    def __call__(self, fget):
+        # Used as @cached_property(ttl=...), decorate the function
+        return cached_property(fget, self.__doc__, self.ttl)
 
     def __get__(self, inst, owner):
+        if inst is None:
+            return self
+        entry = cache_policy._entry(owner, self.__name__, self.ttl)
+        ttl = entry[0]
         now = time.time()
         try:
-            # Get the value from the cache
-            value, last_update = inst._cache[self.__name__]
+            # Get the value from the cache. Views keep theirs in a compact
+            # store which is faster to use directly
+            if isinstance(inst, ManagedObject):
+                value, last_update = inst._get_cached(self.__name__)
+            else:
+                value, last_update = inst._cache[self.__name__]
             logger.info("Found cached value for %s", self.__name__)
             # If the value in the cache exceeds the TTL then raise
             # AttributeError so that we retrieve the value again below
-            if self.ttl > 0 and now - last_update > self.ttl:
+            if ttl < 0 or (ttl > 0 and now - last_update > ttl):
                 logger.info("Cached value has exceeded TTL")
+                entry[3] += 1
                 raise AttributeError
+            entry[1] += 1
+            if isinstance(inst, ManagedObject):
+                prefetcher = getattr(inst._client, "prefetcher", None)
+                if prefetcher is not None:
+                    prefetcher.accessed(inst, self.__name__)
         except (KeyError, AttributeError):
             # We end up here if the value hasn't been cached
             # or the value exceeds the TTL. We call the decorated
             # function to get the value.
             logger.info("%s is not cached.", self.__name__)
+            entry[2] += 1
             value = self.fget(inst)
+            if isinstance(inst, ManagedObject):
+                # Only paths below the property were retrieved, don't cache
+                # the stand-in for it
+                if not isinstance(value, PartialDataObject):
+                    inst._set_cached(self.__name__, value, now)
+                return value
             try:
                 # See if the instance has a cache attribute
                 cache = inst._cache
@@ -90,6 +250,129 @@ class cached_property(object):
         return value
 
 
+# Marks an empty entry in a ManagedObject's property store
+_MISSING = object()
+
+
+class PropertyCache(MutableMapping):
+    """The '_cache' of a ManagedObject.
+
+    Behaves like the dict of (value, last_update) tuples keyed by property
+    name which cached_property expects, but reads and writes the object's
+    compact property store. The store is a single list holding the value
+    and last update time of each property, at a position which is shared
+    by all instances of the class.
+
+    """
+    __slots__ = ["_view"]
+
+    def __init__(self, view):
+        self._view = view
+
+    def __getitem__(self, name):
+        return self._view._get_cached(name)
+
+    def __setitem__(self, name, entry):
+        self._view._set_cached(name, entry[0], entry[1])
+
+    def __delitem__(self, name):
+        self._view._del_cached(name)
+
+    def __iter__(self):
+        view = self._view
+        store = view._store
+        for name, position in view._positions.items():
+            if position < len(store) and store[position] is not _MISSING:
+                yield name
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+
+class ViewList(list):
+    """A list of views, as held by properties such as HostSystem.vm.
+
+    The first time a property is missing from the cache of one of the
+    views, it is retrieved for all the views of the same class in the list
+    which are missing it, in one request. So a loop like::
+
+        for vm in host.vm:
+            print(vm.name)
+
+    makes one request rather than one per VM. A request is for at most
+    batch_size views, so a long list is retrieved in several.
+
+    """
+    batch_size = 100
+
+    def __init__(self, views=()):
+        list.__init__(self, views)
+        # Without a callback the same weakref is shared by every view
+        ref = weakref.ref(self)
+        for view in self:
+            view._batch = ref
+
+
+class PartialDataObject(object):
+    """Stands in for a data object of which only some paths were retrieved.
+
+    When only paths below a property have been retrieved, for example with
+    properties=["summary.quickStats"], the property is a PartialDataObject
+    whose attributes are the values of those paths::
+
+        vm.summary.quickStats.overallCpuUsage
+
+    Reading any other attribute retrieves that path, rather than the whole
+    property, from the server.
+
+    """
+    __slots__ = ["_view", "_path"]
+
+    def __init__(self, view, path):
+        self._view = view
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._view._get_path("%s.%s" % (self._path, name))
+
+    def __repr__(self):
+        return "<PartialDataObject %s of %s>" % (self._path,
+                                                 self._view._mo_ref.value)
+
+
+def _method_proxy(name):
+    """Create a method which invokes the SOAP method name on its view."""
+    def proxy(self, **kwargs):
+        # The proxy is shared by the views of every client, whose WSDLs
+        # may not all have the method
+        if name not in self._client._methods:
+            raise AttributeError("'%s' object has no attribute '%s'" %
+                                 (self.__class__.__name__, name))
+        result = self._client.invoke(name, _this=self._mo_ref, **kwargs)
+        logger.debug("Invoke returned %s", result)
+        return result
+    proxy.__name__ = name
+    return proxy
+
+
+class ManagedObjectType(type):
+    """Gives each class of managed object its own property store layout.
+
+    Positions in the store are handed out as properties are first cached,
+    so the stores of a class only grow as long as the properties which are
+    actually used need. The views of a class share its layout across
+    threads, and views themselves may be shared, so positions are handed
+    out, and stores written, under a lock.
+
+    """
+    def __init__(cls, name, bases, attrs):
+        type.__init__(cls, name, bases, attrs)
+        cls._positions = {}
+        cls._positions_lock = threading.Lock()
+
+
 class ManagedObject(object):
     """The base class which all managed object's derive from.
     
@@ -100,19 +383,113 @@ class ManagedObject(object):
    :type client: Client
 
     """
-    _valid_attrs = set([])
+    # Inventories can hold many thousands of views, so they have no
+    # __dict__. The generated subclasses declare empty __slots__ too
+    __metaclass__ = ManagedObjectType
+    __slots__ = ["_mo_ref", "_client", "_store", "_object_content",
+                 "_batch", "__weakref__"]
+    _valid_attrs = frozenset()
+
     def __init__(self, mo_ref, client):
-        self._cache = {}
         logger.debug("===== Have been passed %s as mo_ref: ", mo_ref)
         self._mo_ref = mo_ref
         self._client = client
+        self._store = ()
+        # A weakref to the last ViewList the view was put in
+        self._batch = None
+
+    def _get_cached(self, name):
+        """Get the (value, last_update) of a cached property.
+
+        :raises: KeyError if the property isn't cached.
+
+        """
+        store = self._store
+        try:
+            position = self._positions[name]
+            value = store[position]
+        except IndexError:
+            raise KeyError(name)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value, store[position + 1]
+
+    def _is_cached(self, name):
+        """Whether a property has a value in the cache."""
+        try:
+            self._get_cached(name)
+        except KeyError:
+            return False
+        return True
+
+    def _set_cached(self, name, value, last_update):
+        """Cache the value of a property."""
+        position = self._positions.get(name)
+        if position is None:
+            position = self._add_position(name)
+        # Views are shared between threads. Growing the store replaces it,
+        # so a value written to the old store at the same time would be lost
+        self._positions_lock.acquire()
+        try:
+            store = self._store
+            if position >= len(store):
+                store = self._store = (list(store) +
+                                       [_MISSING] * (position + 2 -
+                                                     len(store)))
+            store[position] = value
+            store[position + 1] = last_update
+        finally:
+            self._positions_lock.release()
+
+    @classmethod
+    def _add_position(cls, name):
+        """Hand out the position of a property in the stores of the class."""
+        cls._positions_lock.acquire()
+        try:
+            position = cls._positions.get(name)
+            if position is None:
+                position = cls._positions[name] = len(cls._positions) * 2
+        finally:
+            cls._positions_lock.release()
+        return position
+
+    def _del_cached(self, name):
+        """Remove a property from the cache.
+
+        :raises: KeyError if the property isn't cached.
+
+        """
+        self._get_cached(name)
+        position = self._positions[name]
+        self._positions_lock.acquire()
+        try:
+            self._store[position] = _MISSING
+            self._store[position + 1] = None
+        finally:
+            self._positions_lock.release()
+
+    @property
+    def _cache(self):
+        return PropertyCache(self)
+
+    @_cache.setter
+    def _cache(self, cache):
+        self._store = ()
+        for name, (value, last_update) in cache.items():
+            self._set_cached(name, value, last_update)
+
+    @_cache.deleter
+    def _cache(self):
+        self._store = ()
 
     def _get_dataobject(self, name, multivalued):
         """This function only gets called if the decorated property
         doesn't have a value in the cache."""
         logger.debug("Querying server for uncached data object %s", name)
+        if self._has_paths_below(name):
+            return PartialDataObject(self, name)
         # This will retrieve the value and inject it into the cache
-        self.update_view_data(properties=[name])
+        self._fetch(name)
         return self._cache[name][0]
 
     def _get_mor(self, name, multivalued):
@@ -121,7 +498,7 @@ class ManagedObject(object):
         logger.debug("Querying server for uncached MOR %s", name)
         # This will retrieve the value and inject it into the cache
         logger.debug("Getting view for MOR")
-        self.update(properties=[name])
+        self._fetch(name)
         return self._cache[name][0]
         
 #        return self._cache[name][0]
@@ -135,6 +512,72 @@ class ManagedObject(object):
 #            self.update(properties=[name])
 #            return self._cache[name][0]
 
+    def _get_path(self, path):
+        """Get the value of a property path, such as runtime.powerState,
+        retrieving it if it isn't cached or has expired."""
+        entry = cache_policy._entry(self.__class__, path, 300)
+        try:
+            value, last_update = self._get_cached(path)
+        except KeyError:
+            if self._has_paths_below(path):
+                return PartialDataObject(self, path)
+        else:
+            ttl = entry[0]
+            if ttl == 0 or (ttl > 0 and time.time() - last_update <= ttl):
+                entry[1] += 1
+                prefetcher = getattr(self._client, "prefetcher", None)
+                if prefetcher is not None:
+                    prefetcher.accessed(self, path)
+                return value
+            entry[3] += 1
+
+        logger.debug("Querying server for uncached path %s", path)
+        entry[2] += 1
+        self._fetch(path)
+        return self._get_cached(path)[0]
+
+    def _has_paths_below(self, path):
+        """Whether any path below a property path is cached."""
+        prefix = path + "."
+        # Other threads may add positions while we look
+        for name in self._positions.keys():
+            if name.startswith(prefix) and self._is_cached(name):
+                return True
+        return False
+
+    def _fetch(self, name):
+        """Retrieve a property which isn't cached from the server, along
+        with those the client's prefetcher expects to be used with it."""
+        views = self._batch_views(name)
+        prefetcher = getattr(self._client, "prefetcher", None)
+        if prefetcher is not None:
+            prefetcher.fetch(self, name, views)
+        elif len(views) > 1:
+            logger.debug("Retrieving %s for %s views in a list", name,
+                         len(views))
+            self._client.update_views(views, [name])
+        else:
+            self.update_view_data(properties=[name])
+
+    def _batch_views(self, name):
+        """Get this view and those of the same class in the ViewList it
+        belongs to which don't have the property cached, at most the
+        batch_size of the client's Prefetcher, or ViewList.batch_size."""
+        views = self._batch and self._batch()
+        if views is None:
+            return [self]
+        prefetcher = getattr(self._client, "prefetcher", None)
+        batch_size = getattr(prefetcher, "batch_size", ViewList.batch_size)
+        cls = self.__class__
+        batch = [self]
+        for view in views:
+            if len(batch) >= batch_size:
+                break
+            if (view.__class__ is cls and view is not self and
+                not view._is_cached(name)):
+                batch.append(view)
+        return batch
+
     def flush_cache(self, properties=None):
         """Flushes the cache being held for this instance.
 
@@ -142,13 +585,12 @@ class ManagedObject(object):
         :type properties: list or None (default). If None, flush entire cache.
 
         """
-        if hasattr(self, '_cache'):
-            if properties is None:
-                del(self._cache)
-            else:
-                for prop in properties:
-                    if prop in self._cache:
-                        del(self._cache[prop])
+        if properties is None:
+            del(self._cache)
+        else:
+            for prop in properties:
+                if prop in self._cache:
+                    del(self._cache[prop])
 
     def update(self, properties=None):
         """Updates the properties being held for this instance.
@@ -159,11 +601,7 @@ class ManagedObject(object):
 
         """
         if properties is None:
-            try:
-                self.update_view_data(properties=self._cache.keys())
-            except AttributeError:
-                # We end up here and ignore it self._cache doesn't exist
-                pass
+            self.update_view_data(properties=self._cache.keys())
         else:
             self.update_view_data(properties=properties)
 
@@ -184,44 +622,24 @@ class ManagedObject(object):
         >>> vm.update_view_data()
         >>> # Update the config and summary properties
         >>> vm.update_view_data(properties=["config", "summary"]
+        >>> # Update only part of the summary property
+        >>> vm.update_view_data(properties=["summary.quickStats"])
 
         :param properties: A list of properties to update.
         :type properties: list
 
         """
-        if properties is None:
-            properties = []
         logger.info("Updating view data for object of type %s",
                     self._mo_ref._type)
-        property_spec = self._client.create('PropertySpec')
-        property_spec.type = str(self._mo_ref._type)
-        # Determine which properties to retrieve from the server
-        if properties is None:
-            properties = []
-        else:
-            if properties == "all":
-                logger.debug("Retrieving all properties")
-                property_spec.all = True
-            else:
-                logger.debug("Retrieving %s properties", len(properties))
-                property_spec.all = False
-                property_spec.pathSet = properties
-
-        object_spec = self._client.create('ObjectSpec')
-        object_spec.obj = self._mo_ref
-
-        pfs = self._client.create('PropertyFilterSpec')
-        pfs.propSet = [property_spec]
-        pfs.objectSet = [object_spec]
-
-        # Create a copy of the property collector and call the method
-        pc = self._client.sc.propertyCollector
-        object_content = pc.RetrieveProperties(specSet=pfs)[0]
-        if not object_content:
+        # Threads asking for the same properties share one call
+        object_contents = self._client._coalescer.retrieve([self._mo_ref],
+                                                           properties)
+        if not object_contents:
             # TODO: Improve error checking and reporting
             logger.error("Nothing returned from RetrieveProperties!")
+            return
 
-        self._set_view_data(object_content)
+        self._set_view_data(object_contents[0])
 
     def preload(self, name, properties=None):
         """Pre-loads the requested properties for each object in the "name"
@@ -230,8 +648,9 @@ class ManagedObject(object):
         :param name: The name of the attribute containing the list to
         preload.
         :type name: str
-        :param properties: The properties to preload on the objects or the
-        string all to preload all properties.
+        :param properties: The properties to preload on the objects, which
+        may be paths such as summary.quickStats, or the string all to preload
+        all properties.
         :type properties: list or the string "all"
         
         """
@@ -255,7 +674,7 @@ class ManagedObject(object):
         views = self._client.get_views(mo_refs, properties)
 
         # Populate the inst.attr item with the retrieved object/properties
-        self._cache[name] = (views, time.time())
+        self._set_cached(name, ViewList(views), time.time())
 
     def _set_view_data(self, object_content):
         """Update the local object from the passed in object_content."""
@@ -264,50 +683,57 @@ class ManagedObject(object):
         logger.info("Setting view data for a %s", self.__class__)
         self._object_content = object_content
 
+        # An object which has none of the requested properties set comes
+        # back without a propSet
+        if not getattr(object_content, "propSet", None):
+            logger.debug("No properties returned for %s", self._mo_ref)
+            return
+
+        # Every property in the batch shares one timestamp
+        now = time.time()
         for dynprop in object_content.propSet:
-            # If the class hasn't defined the property, don't use it
-            if dynprop.name not in self._valid_attrs:
+            # If the class hasn't defined the property, don't use it. Paths
+            # such as summary.quickStats are cached under the full path
+            if dynprop.name.split(".", 1)[0] not in self._valid_attrs:
                 logger.error("Server returned a property '%s' but the object"
                              " hasn't defined it so it is being ignored." %
                              dynprop.name)
                 continue
 
-            try:
-                if not len(dynprop.val):
-                    logger.info("Server returned empty value for %s",
-                                dynprop.name)
-            except TypeError:
-                # This except allows us to pass over:
-                # TypeError: object of type 'datetime.datetime' has no len()
-                # It will be processed in the next code block
-                logger.info("%s of type %s has no len!",
-                            dynprop.name, type(dynprop.val))
-                pass
+            self._set_property(dynprop.name, dynprop.val, now)
 
-            try:
-                # See if we have a cache attribute
-                cache = self._cache
-            except AttributeError:
-                # If we don't create one and use it
-                cache = self._cache = {}
-
-            # Values which contain classes starting with Array need
-            # to be converted into a nicer Python list
-            if dynprop.val.__class__.__name__.startswith('Array'):
-                # suds returns a list containing a single item, which
-                # is another list. Use the first item which is the real list
-                logger.info("Setting value of an Array* property")
-                logger.debug("%s being set to %s",
-                             dynprop.name, dynprop.val[0])
-                now = time.time()
-                cache[dynprop.name] = (dynprop.val[0], now)
-            else:
-                logger.info("Setting value of a single-valued property")
-                logger.debug("DynamicProperty value is a %s: ",
-                             dynprop.val.__class__.__name__)
-                logger.debug("%s being set to %s", dynprop.name, dynprop.val)
-                now = time.time()
-                cache[dynprop.name] = (dynprop.val, now)
+    def _set_property(self, name, value, now=None):
+        """Set the cached value of a single property."""
+        try:
+            if not len(value):
+                logger.info("Server returned empty value for %s", name)
+        except TypeError:
+            # This except allows us to pass over:
+            # TypeError: object of type 'datetime.datetime' has no len()
+            # It will be processed in the next code block
+            logger.info("%s of type %s has no len!", name, type(value))
+            pass
+
+        if now is None:
+            now = time.time()
+
+        # Values which contain classes starting with Array need
+        # to be converted into a nicer Python list
+        if value.__class__.__name__.startswith('Array'):
+            # suds returns a list containing a single item, which
+            # is another list. Use the first item which is the real list
+            logger.info("Setting value of an Array* property")
+            logger.debug("%s being set to %s", name, value[0])
+            value = value[0]
+            if value and isinstance(value[0], ManagedObject):
+                value = ViewList(value)
+            self._set_cached(name, value, now)
+        else:
+            logger.info("Setting value of a single-valued property")
+            logger.debug("DynamicProperty value is a %s: ",
+                         value.__class__.__name__)
+            logger.debug("%s being set to %s", name, value)
+            self._set_cached(name, value, now)
 
     def __getattr__(self, name):
         """Overridden so that SOAP methods can be proxied.
@@ -316,44 +742,30 @@ class ManagedObject(object):
         SOAP methods through the Python object, like:
         >>> client.si.content.rootFolder.CreateFolder(name="foo")
 
-        This is achieved by asking the underlying SOAP service if the
-        requested name is a valid method. If the method name is not valid
-        then we pass the attribute retrieval back to __getattribute__
-        which will use the default behaviour (i.e. just get the attribute).
+        This is achieved by looking the requested name up in the methods
+        the client found in its WSDL. The proxy for a method is then put on
+        the class, so later uses of it on any object of the class are found
+        without calling __getattr__. The proxy checks the methods of the
+        view's own client when called. Any other name isn't an attribute.
 
         TODO: There's no checking if the SOAP method is valid for the type
         of object being called. e.g. You could do folder.Login() which would
-        be totally bogus.
-        
+        be totally bogus. The WSDL doesn't say which type has each method.
+
         :param name: The name of the method to call.
         :param type: str
 
         """
-        logger.debug("Entering overridden built-in __getattr__"
-                     " with %s" % name)
-        # Built-ins always use the default behaviour
-#        if name.startswith("__"):
-#            logger.debug("Returning built-in attribute %s", name)
-#            return object.__getattribute__(self, name)
-
-        # Here we must access _client through __getattribute__, if we were
-        # to use "self._client" we'd call recursively through __getattr__
-        client = object.__getattribute__(self, "_client")
-
-        try:
-            getattr(client.service, name)
-        except MethodNotFound:
-            # It doesn't, so we let the object check if it's a standard
-            # attribute. This is cool because it 
+        # No method starts with an underscore. Checking first also means a
+        # missing _client raises rather than recursing through __getattr__
+        if name[:1] != "_" and name in self._client._methods:
+            logger.debug("Constructing proxy method %s for a %s",
+                         name, self.__class__.__name__)
+            setattr(self.__class__, name, _method_proxy(name))
+            return getattr(self, name)
+
+        if hasattr(self.__class__, name):
+            # A property of the class raised AttributeError, raise it again
             return object.__getattribute__(self, name)
-
-        # Caller has requested a valid SOAP reference
-        logger.debug("Constructing proxy method %s for a %s",
-                     name, self._mo_ref._type)
-        def func(**kwargs):
-            result = self._client.invoke(name, _this=self._mo_ref,
-                                        **kwargs)
-            logger.debug("Invoke returned %s", result)
-            return result
-
-        return func
+        raise AttributeError("'%s' object has no attribute '%s'" %
+                             (self.__class__.__name__, name))
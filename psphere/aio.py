@@ -0,0 +1,976 @@
+"""
+:mod:`psphere.aio` - Concurrent SOAP calls without threads
+==========================================================
+
+.. module:: aio
+
+Client.invoke, and so every method called on a view, blocks until the
+server replies. An AsyncClient sends calls over a few non-blocking
+connections and returns a Future for each, so thousands of calls can be
+outstanding from a single thread.
+
+Python 2 has no asyncio, so a coroutine is a generator which yields the
+Futures (or lists of Futures) it waits for and is sent their results. It
+gives its own result by raising Return::
+
+    from psphere.aio import AsyncClient, Return
+
+    aclient = AsyncClient(client)
+
+    def power_states(names):
+        vms = yield aclient.find_entity_views("VirtualMachine",
+                                              properties=["name"])
+        vms = [vm for vm in vms if vm.name in names]
+        yield aclient.get_views(vms, ["runtime.powerState"])
+        raise Return(dict((vm.name, vm.runtime.powerState) for vm in vms))
+
+    print(aclient.run(power_states(["genesis", "exodus"])))
+
+Properties which aren't cached are still retrieved by a blocking call when
+they are read, so retrieve what a coroutine needs with get_views first.
+
+"""
+
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import errno
+import heapq
+import httplib
+import logging
+import select
+import socket
+import ssl
+import sys
+import time
+import urllib2
+import urlparse
+import zlib
+import suds
+
+from collections import deque
+from StringIO import StringIO
+from suds.client import SoapClient
+from suds.plugin import PluginContainer
+from suds.transport import Request, TransportError
+
+from psphere.errors import NotLoggedInError, TaskFailedError
+from psphere.soap import _CookieResponse, _never_arrived
+
+logger = logging.getLogger(__name__)
+
+
+class Return(Exception):
+    """Raised by a coroutine to give its result."""
+    def __init__(self, value=None):
+        Exception.__init__(self, value)
+        self.value = value
+
+
+class Future(object):
+    """The result of an operation which hasn't necessarily finished."""
+    def __init__(self):
+        self._done = False
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def done(self):
+        """Whether the operation has finished.
+
+        :rtype: bool
+
+        """
+        return self._done
+
+    def result(self):
+        """Get the result, raising the exception if the operation failed."""
+        if self._done is False:
+            raise RuntimeError("The operation hasn't finished")
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def add_done_callback(self, callback):
+        """Call a callable with the Future when the operation finishes."""
+        if self._done is True:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def set_result(self, result):
+        self._result = result
+        self._finish()
+
+    def set_exception(self, exc_info):
+        """Fail the operation with the sys.exc_info() of an exception."""
+        self._exc_info = exc_info
+        self._finish()
+
+    def _finish(self):
+        if self._done is True:
+            raise RuntimeError("The operation has already finished")
+        self._done = True
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class _Timer(object):
+    __slots__ = ["when", "callback", "args", "cancelled"]
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return self.when < other.when
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class EventLoop(object):
+    """Runs callbacks when sockets are ready or timers expire."""
+    def __init__(self):
+        self._ready = deque()
+        self._timers = []
+        self._readers = {}
+        self._writers = {}
+
+    def call_soon(self, callback, *args):
+        self._ready.append((callback, args))
+
+    def call_later(self, delay, callback, *args):
+        """Call a callable after a delay in seconds.
+
+        :returns: A timer which can be cancelled.
+
+        """
+        timer = _Timer(time.time() + delay, callback, args)
+        heapq.heappush(self._timers, timer)
+        return timer
+
+    def set_interest(self, fileobj, callback, read, write):
+        """Set whether a callable is called when a socket is readable or
+        writable."""
+        for interested, handlers in ((read, self._readers),
+                                     (write, self._writers)):
+            if interested:
+                handlers[fileobj] = callback
+            else:
+                handlers.pop(fileobj, None)
+
+    def run_until(self, future):
+        """Run the loop until a Future is done."""
+        while future.done() is False:
+            self._run_once()
+
+    def _run_once(self):
+        timeout = None
+        if self._ready:
+            timeout = 0
+        elif self._timers:
+            timeout = max(0, self._timers[0].when - time.time())
+        elif not self._readers and not self._writers:
+            raise RuntimeError("Nothing is running which could finish the "
+                               "operation")
+
+        if self._readers or self._writers:
+            try:
+                readable, writable, _ = select.select(
+                    self._readers.keys(), self._writers.keys(), [], timeout)
+            except select.error, e:
+                if e.args[0] != errno.EINTR:
+                    raise
+                readable, writable = [], []
+            for fileobj in readable:
+                self.call_soon(self._readers[fileobj])
+            for fileobj in writable:
+                # Already handled if it was also readable
+                if fileobj not in readable:
+                    self.call_soon(self._writers[fileobj])
+        elif timeout:
+            time.sleep(timeout)
+
+        now = time.time()
+        while self._timers and self._timers[0].when <= now:
+            timer = heapq.heappop(self._timers)
+            if timer.cancelled is False:
+                self.call_soon(timer.callback, *timer.args)
+
+        for i in range(len(self._ready)):
+            callback, args = self._ready.popleft()
+            callback(*args)
+
+
+class _Response(object):
+    """Parses a HTTP/1.1 response as it is received."""
+    def __init__(self):
+        self.status = None
+        self.reason = None
+        self.msg = None
+        self.will_close = False
+        self.complete = False
+        self._state = "headers"
+        self._buffer = ""
+        self._remaining = 0
+        self._body = []
+
+    @property
+    def body(self):
+        body = "".join(self._body)
+        if self.msg.getheader("content-encoding") == "gzip":
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        return body
+
+    def getheaders(self):
+        return self.msg.items()
+
+    def feed(self, data):
+        """Parse received data.
+
+        :returns: Whether the response is complete.
+        :rtype: bool
+
+        """
+        while data and self.complete is False:
+            if self._state in ("body", "chunk"):
+                piece = data[:self._remaining]
+                data = data[len(piece):]
+                self._body.append(piece)
+                self._remaining -= len(piece)
+                if self._remaining == 0:
+                    if self._state == "body":
+                        self.complete = True
+                    else:
+                        self._state = "chunk end"
+                continue
+            if self._state == "until close":
+                self._body.append(data)
+                break
+
+            # The other states need a whole line, or the headers
+            self._buffer += data
+            data = ""
+            separator = "\r\n"
+            if self._state == "headers":
+                separator = "\r\n\r\n"
+            end = self._buffer.find(separator)
+            if end < 0:
+                break
+            line = self._buffer[:end]
+            data = self._buffer[end + len(separator):]
+            self._buffer = ""
+            self._parsed_line(line)
+
+        return self.complete
+
+    def _parsed_line(self, line):
+        if self._state == "headers":
+            self._parsed_headers(line)
+        elif self._state == "chunk size":
+            size = int(line.split(";", 1)[0], 16)
+            if size == 0:
+                self._state = "trailer"
+            else:
+                self._state = "chunk"
+                self._remaining = size
+        elif self._state == "chunk end":
+            self._state = "chunk size"
+        elif self._state == "trailer" and line == "":
+            self.complete = True
+
+    def _parsed_headers(self, block):
+        status_line, _, headers = block.partition("\r\n")
+        version, status, reason = (status_line.split(None, 2) + [""])[:3]
+        self.status = int(status)
+        self.reason = reason
+        self.msg = httplib.HTTPMessage(StringIO(headers + "\r\n\r\n"))
+        connection = (self.msg.getheader("connection") or "").lower()
+        self.will_close = (connection == "close" or
+                           (version == "HTTP/1.0" and
+                            connection != "keep-alive"))
+
+        length = self.msg.getheader("content-length")
+        if self.status in (204, 304) or 100 <= self.status < 200:
+            self.complete = True
+        elif "chunked" in (self.msg.getheader("transfer-encoding") or ""):
+            self._state = "chunk size"
+        elif length is not None:
+            self._remaining = int(length)
+            self._state = "body"
+            self.complete = self._remaining == 0
+        else:
+            self._state = "until close"
+            self.will_close = True
+
+    def eof(self):
+        """Handle the server closing the connection.
+
+        :returns: Whether the response is complete.
+        :rtype: bool
+
+        """
+        if self._state == "until close":
+            self.complete = True
+        return self.complete
+
+
+class _Connection(object):
+    """A non-blocking, persistent HTTP or HTTPS connection."""
+    def __init__(self, pool, scheme, host):
+        self.pool = pool
+        self.loop = pool.loop
+        self.scheme = scheme
+        self.host = host
+        self.request = None
+        # The number of requests sent over the connection
+        self.requests = 0
+        # Whether all of the request, and any of its response, has been
+        # sent and received
+        self.sent = False
+        self.received = False
+        self.closed = False
+        self._response = None
+        self._out = ""
+        self._want_read = False
+        self._want_write = True
+        self._state = "connecting"
+
+        hostname, _, port = host.partition(":")
+        default_port = 443
+        if scheme == "http":
+            default_port = 80
+        self._hostname = hostname
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setblocking(0)
+        error = self.sock.connect_ex((hostname, int(port or default_port)))
+        if error not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            raise socket.error(error, "Couldn't connect to %s" % host)
+        self._interest()
+
+    def send(self, request):
+        """Send a request, the connection must be idle."""
+        self.request = request
+        self.requests += 1
+        self.sent = False
+        self.received = False
+        self._response = _Response()
+        self._out = request.data
+        self._want_write = True
+        self._want_read = False
+        if self._state == "ready":
+            self.loop.call_soon(self._ready)
+        self._interest()
+
+    def close(self):
+        if self.closed is False:
+            self.closed = True
+            self.loop.set_interest(self.sock, None, False, False)
+            self.sock.close()
+
+    def _interest(self):
+        if self.closed is False:
+            self.loop.set_interest(self.sock, self._ready, self._want_read,
+                                   self._want_write)
+
+    def _ready(self):
+        if self.closed is True:
+            return
+        try:
+            self._advance()
+        except (ssl.SSLError, socket.error), e:
+            if (isinstance(e, ssl.SSLError) and
+                e.args[0] == ssl.SSL_ERROR_WANT_READ):
+                self._want_read, self._want_write = True, False
+            elif (isinstance(e, ssl.SSLError) and
+                  e.args[0] == ssl.SSL_ERROR_WANT_WRITE):
+                self._want_read, self._want_write = False, True
+            elif (isinstance(e, socket.error) and
+                  e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK)):
+                pass
+            else:
+                self.pool.failed(self, sys.exc_info())
+                return
+        except Exception:
+            self.pool.failed(self, sys.exc_info())
+            return
+        self._interest()
+
+    def _advance(self):
+        if self._state == "connecting":
+            error = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error != 0:
+                raise socket.error(error, "Couldn't connect to %s" %
+                                   self.host)
+            self._state = "ready"
+            if self.scheme == "https":
+                # The wrapped socket replaces this one in the loop
+                self.loop.set_interest(self.sock, None, False, False)
+                # The same context as httplib, so that overriding it applies
+                # to both
+                context = getattr(ssl, "_create_default_https_context", None)
+                if context is not None:
+                    self.sock = context().wrap_socket(
+                        self.sock, server_hostname=self._hostname,
+                        do_handshake_on_connect=False)
+                else:
+                    self.sock = ssl.wrap_socket(self.sock,
+                                                do_handshake_on_connect=False)
+                self._state = "handshake"
+        if self._state == "handshake":
+            self.sock.do_handshake()
+            self._state = "ready"
+
+        if self.request is None:
+            # An idle connection is only readable when the server closes it
+            self._want_read, self._want_write = True, False
+            if self.sock.recv(1) == "":
+                self.pool.closed(self)
+            return
+
+        while self._out:
+            sent = self.sock.send(self._out)
+            self._out = self._out[sent:]
+        self.sent = True
+
+        self._want_read, self._want_write = True, False
+        while True:
+            data = self.sock.recv(65536)
+            if data == "":
+                if self.received is False:
+                    raise httplib.BadStatusLine(
+                        "No status line received - %s closed the "
+                        "connection" % self.host)
+                if not self._response.eof():
+                    raise httplib.BadStatusLine("Connection closed by %s" %
+                                                self.host)
+            else:
+                self.received = True
+                if not self._response.feed(data):
+                    continue
+            response, self._response = self._response, None
+            self.pool.received(self, response)
+            return
+
+
+class _Request(object):
+    __slots__ = ["data", "future", "timer", "attempts"]
+
+    def __init__(self, data, future):
+        self.data = data
+        self.future = future
+        self.timer = None
+        self.attempts = 0
+
+
+class ConnectionPool(object):
+    """Sends requests to a host over a limited number of connections.
+
+    :param loop: The loop the connections are run by.
+    :type loop: EventLoop
+    :param scheme: http or https.
+    :type scheme: str
+    :param host: The host and optionally port to connect to.
+    :type host: str
+    :param maxsize: The maximum number of open connections. Requests \
+    wait for a connection once this many are in use.
+    :type maxsize: int
+    :param timeout: The number of seconds to wait for each response.
+    :type timeout: int
+
+    """
+    def __init__(self, loop, scheme, host, maxsize=8, timeout=30):
+        self.loop = loop
+        self.scheme = scheme
+        self.host = host
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._waiting = deque()
+        self._idle = []
+        self._connections = set()
+
+    def send(self, data):
+        """Send a request.
+
+        :returns: A Future of the completed _Response.
+        :rtype: Future
+
+        """
+        request = _Request(data, Future())
+        request.timer = self.loop.call_later(self.timeout, self._timed_out,
+                                             request)
+        self._waiting.append(request)
+        self._dispatch()
+        return request.future
+
+    def close(self):
+        """Close all connections, failing the requests which are waiting
+        for a connection or for their response."""
+        requests = list(self._waiting)
+        self._waiting.clear()
+        for connection in list(self._connections):
+            if connection.request is not None:
+                requests.append(connection.request)
+                connection.request = None
+            connection.close()
+        self._connections.clear()
+        self._idle = []
+        for request in requests:
+            if request.future.done() is False:
+                try:
+                    raise socket.error(errno.ECONNABORTED,
+                                       "The connection pool was closed")
+                except socket.error:
+                    self._finish(request, exc_info=sys.exc_info())
+
+    def _dispatch(self):
+        while self._waiting:
+            if self._idle:
+                connection = self._idle.pop()
+            elif len(self._connections) < self.maxsize:
+                logger.debug("Opening new %s connection to %s", self.scheme,
+                             self.host)
+                try:
+                    connection = _Connection(self, self.scheme, self.host)
+                except socket.error:
+                    request = self._waiting.popleft()
+                    self._finish(request, exc_info=sys.exc_info())
+                    continue
+                self._connections.add(connection)
+            else:
+                return
+            request = self._waiting.popleft()
+            request.attempts += 1
+            connection.send(request)
+
+    def received(self, connection, response):
+        request, connection.request = connection.request, None
+        if response.will_close:
+            self._discard(connection)
+        else:
+            self._idle.append(connection)
+        self._finish(request, response)
+        self._dispatch()
+
+    def failed(self, connection, exc_info):
+        request, connection.request = connection.request, None
+        self._discard(connection)
+        if request is not None and request.future.done() is False:
+            # The server may have closed a connection which had been idle
+            # just as it was reused, send the request once more on a new one
+            # if it can't have reached the server
+            if (connection.requests > 1 and request.attempts == 1 and
+                _never_arrived(exc_info[1], connection.sent)):
+                logger.debug("Reused connection to %s failed, retrying",
+                             self.host)
+                self._waiting.appendleft(request)
+            else:
+                self._finish(request, exc_info=exc_info)
+        self._dispatch()
+
+    def closed(self, connection):
+        """Forget an idle connection the server closed."""
+        self._discard(connection)
+
+    def _discard(self, connection):
+        connection.close()
+        self._connections.discard(connection)
+        if connection in self._idle:
+            self._idle.remove(connection)
+
+    def _timed_out(self, request):
+        for connection in list(self._connections):
+            if connection.request is request:
+                connection.request = None
+                self._discard(connection)
+        if request in self._waiting:
+            self._waiting.remove(request)
+        if request.future.done() is False:
+            try:
+                raise socket.timeout("timed out")
+            except socket.timeout:
+                self._finish(request, exc_info=sys.exc_info())
+        self._dispatch()
+
+    def _finish(self, request, response=None, exc_info=None):
+        request.timer.cancel()
+        if exc_info is not None:
+            request.future.set_exception(exc_info)
+        else:
+            request.future.set_result(response)
+
+
+class _DeferredSoapClient(SoapClient):
+    """Builds the request for a method, and processes its reply, in the
+    same way as suds without sending it."""
+    def send(self, soapenv):
+        self.last_sent(soapenv)
+        plugins = PluginContainer(self.options.plugins)
+        plugins.message.marshalled(envelope=soapenv.root())
+        soapenv = soapenv.plain().encode("utf-8")
+        plugins.message.sending(envelope=soapenv)
+        request = Request(self.location(), soapenv)
+        request.headers = self.headers()
+        return request
+
+    def receive(self, response):
+        binding = self.method.binding.input
+        if response.status in (202, 204):
+            return None
+        if response.status >= 300:
+            return self.failed(binding, TransportError(
+                response.reason, response.status, StringIO(response.body)))
+        plugins = PluginContainer(self.options.plugins)
+        ctx = plugins.message.received(reply=response.body)
+        return self.succeeded(binding, ctx.reply)
+
+
+class AsyncClient(object):
+    """Sends calls through a logged in Client without waiting for replies.
+
+    >>> aclient = AsyncClient(client)
+    >>> futures = [aclient.invoke("CurrentTime", client.si)
+    ...            for i in range(1000)]
+    >>> print(aclient.run(aclient.gather(futures)))
+
+    The AsyncClient shares the client's session, parsed WSDL and views.
+    Calls are sent over at most max_connections connections, the rest wait
+    for one to be free. If the client's relogin is enabled, calls which
+    fail because the session expired are sent again after logging in,
+    which blocks the loop.
+
+    :param client: The logged in client to make calls through.
+    :type client: Client
+    :param max_connections: The maximum number of connections to the server.
+    :type max_connections: int
+    :param task_interval: How often, in seconds, the state of the tasks \
+    being waited for is retrieved.
+    :type task_interval: int
+
+    """
+    def __init__(self, client, max_connections=8, task_interval=1):
+        self.client = client
+        self.loop = EventLoop()
+        self.task_interval = task_interval
+        url = urlparse.urlsplit(client.options.location)
+        self._path = url.path
+        self.pool = ConnectionPool(self.loop, url.scheme, url.netloc,
+                                   maxsize=max_connections,
+                                   timeout=client.options.timeout)
+        # The tasks being waited for and their Futures, by MOR value
+        self._tasks = {}
+        self._task_timer = None
+        # The number of times the session has been logged in again
+        self._logins = 0
+
+    def close(self):
+        """Close the connections to the server."""
+        self.pool.close()
+
+    def run(self, awaitable):
+        """Run the loop until a Future or coroutine is done.
+
+        :returns: The result of the Future or coroutine.
+
+        """
+        future = self._future(awaitable)
+        self.loop.run_until(future)
+        return future.result()
+
+    def spawn(self, coroutine):
+        """Start running a coroutine.
+
+        :returns: A Future of the coroutine's result.
+        :rtype: Future
+
+        """
+        future = Future()
+        self.loop.call_soon(self._step, coroutine, future, None, None)
+        return future
+
+    def gather(self, awaitables):
+        """Wait for many Futures or coroutines.
+
+        :returns: A Future of the list of their results, which fails with \
+        the first to fail.
+        :rtype: Future
+
+        """
+        futures = [self._future(awaitable) for awaitable in awaitables]
+        gathered = Future()
+        remaining = [len(futures)]
+        if not futures:
+            gathered.set_result([])
+
+        def done(future):
+            if gathered.done():
+                return
+            if future._exc_info is not None:
+                gathered.set_exception(future._exc_info)
+                return
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                gathered.set_result([f.result() for f in futures])
+
+        for future in futures:
+            future.add_done_callback(done)
+        return gathered
+
+    def sleep(self, seconds):
+        """Get a Future which is done after a number of seconds.
+
+        :rtype: Future
+
+        """
+        future = Future()
+        self.loop.call_later(seconds, future.set_result, None)
+        return future
+
+    def invoke(self, method, _this, **kwargs):
+        """Invoke a method on the server.
+
+        >>> future = aclient.invoke("CurrentTime", client.si)
+
+        :param method: The method to invoke, as found in the SDK.
+        :type method: str
+        :param _this: The managed object to invoke the method against.
+        :type _this: ManagedObject or ManagedObjectReference
+        :param kwargs: The arguments to pass to the method, as found in \
+        the SDK.
+        :returns: A Future of the unmarshalled result.
+        :rtype: Future
+
+        """
+        if self.client._logged_in is False:
+            raise NotLoggedInError("Cannot exec %s unless logged in" % method)
+
+        for kwarg in kwargs:
+            kwargs[kwarg] = self.client._marshal(kwargs[kwarg])
+        kwargs["_this"] = getattr(_this, "_mo_ref", _this)
+        result = Future()
+        self._send(method, kwargs, result, True)
+        return result
+
+    def _send(self, method, kwargs, result, retry):
+        """Send a method with marshalled arguments, giving its result to a
+        Future. If the session has expired and the client's relogin is
+        enabled, login again and send it once more."""
+        soap_client = _DeferredSoapClient(
+            self.client, getattr(self.client.service, method).method)
+        request = soap_client.invoke((), kwargs)
+
+        # The session cookie is kept by the client's transport
+        headers = dict(request.headers)
+        headers["Accept-Encoding"] = "gzip"
+        u2request = urllib2.Request(request.url, request.message, headers)
+        transport = self.client.options.transport
+        transport.addcookies(u2request)
+        lines = ["POST %s HTTP/1.1" % self._path, "Host: %s" % self.pool.host,
+                 "Content-Length: %s" % len(request.message)]
+        for name, value in u2request.header_items():
+            lines.append("%s: %s" % (name, value))
+        data = "\r\n".join(lines) + "\r\n\r\n" + request.message
+        logins = self._logins
+
+        def received(future):
+            try:
+                response = future.result()
+                transport.cookiejar.extract_cookies(
+                    _CookieResponse(response), u2request)
+                result.set_result(self.client._unmarshal_result(
+                    soap_client.receive(response)))
+            except suds.WebFault, e:
+                if retry is False or not self.client._should_relogin(method,
+                                                                     e):
+                    result.set_exception(sys.exc_info())
+                    return
+                # Calls sent with the expired session all fail, only the
+                # first logs in again. Logging in blocks the loop
+                if logins == self._logins:
+                    self.client._relogin(method, kwargs)
+                    self._logins += 1
+                self._send(method, kwargs, result, False)
+            except Exception:
+                result.set_exception(sys.exc_info())
+
+        self.pool.send(data).add_done_callback(received)
+
+    def get_views(self, mo_refs, properties=None):
+        """Retrieve properties of many managed objects.
+
+        :param mo_refs: The managed objects to retrieve properties of.
+        :type mo_refs: list of ManagedObjectReference's or ManagedObject's
+        :param properties: The properties to retrieve.
+        :type properties: list or the string "all"
+        :returns: A Future of the list of views.
+        :rtype: Future
+
+        """
+        mo_refs = [getattr(mo_ref, "_mo_ref", mo_ref) for mo_ref in mo_refs]
+        pfs = self.client.get_views_filter_spec(mo_refs, properties)
+        return self.spawn(self._retrieve_views(pfs))
+
+    def find_entity_views(self, view_type, begin_entity=None,
+                          properties=None):
+        """Find all ManagedEntity's of the requested type.
+
+        :param view_type: The type of ManagedEntity's to find.
+        :type view_type: str
+        :param begin_entity: The MOR to start searching for the entity. \
+        The default is to start the search at the root folder.
+        :type begin_entity: ManagedObjectReference or None
+        :param properties: The properties to retrieve in the views.
+        :type properties: list
+        :returns: A Future of the list of ManagedEntity's.
+        :rtype: Future
+
+        """
+        if properties is None:
+            properties = []
+        if not begin_entity:
+            begin_entity = self.client.sc.rootFolder._mo_ref
+
+        property_spec = self.client.create('PropertySpec')
+        property_spec.type = view_type
+        property_spec.all = False
+        property_spec.pathSet = properties
+        pfs = self.client.get_entity_filter_spec(view_type, begin_entity,
+                                                 property_spec)
+        return self.spawn(self._retrieve_views(pfs))
+
+    def wait_for_task(self, task):
+        """Wait for a task to finish.
+
+        The states of all the tasks being waited for are retrieved in one
+        call every task_interval seconds.
+
+        :param task: The task to wait for.
+        :type task: Task
+        :returns: A Future of the task, which fails with TaskFailedError \
+        if the task does.
+        :rtype: Future
+
+        """
+        key = str(task._mo_ref.value)
+        if key not in self._tasks:
+            self._tasks[key] = (task, Future())
+        if self._task_timer is None:
+            self._task_timer = self.loop.call_later(self.task_interval,
+                                                    self._poll_tasks)
+        return self._tasks[key][1]
+
+    def _poll_tasks(self):
+        # Tasks waited for while the states are retrieved are left for the
+        # next poll
+        self.spawn(self._poll(self._tasks.items())).add_done_callback(
+            self._polled)
+
+    def _poll(self, polling):
+        """Retrieve the states of some of the tasks being waited for and
+        resolve those which have finished."""
+        tasks = [task for key, (task, future) in polling]
+        pfs = self.client.get_views_filter_spec(
+            [task._mo_ref for task in tasks], ["info.state", "info.error"])
+        try:
+            yield self._retrieve_views(pfs, tasks)
+        except Exception:
+            if len(polling) > 1:
+                # A task which no longer exists, such as a purged one,
+                # fails the call for all of them, so retrieve each alone
+                yield [self._poll([item]) for item in polling]
+                return
+            key, (task, future) = polling[0]
+            del self._tasks[key]
+            future.set_exception(sys.exc_info())
+            return
+
+        for key, (task, future) in polling:
+            state = task._get_cached("info.state")[0]
+            if state not in ("success", "error"):
+                continue
+            del self._tasks[key]
+            if state == "success":
+                future.set_result(task)
+                continue
+            error = task._get_cached("info.error")[0]
+            try:
+                raise TaskFailedError(error.localizedMessage)
+            except TaskFailedError:
+                future.set_exception(sys.exc_info())
+
+    def _polled(self, polled):
+        self._task_timer = None
+        if polled._exc_info is not None:
+            logger.error("Couldn't poll tasks", exc_info=polled._exc_info)
+        if self._tasks:
+            self._task_timer = self.loop.call_later(self.task_interval,
+                                                    self._poll_tasks)
+
+    def _retrieve_views(self, pfs, views=None):
+        """Retrieve the views a filter selects, updating the given views
+        rather than those the results are unmarshalled to."""
+        object_contents = yield self.invoke(
+            "RetrieveProperties", self.client.sc.propertyCollector,
+            specSet=pfs)
+        views_by_ref = dict(((view._mo_ref._type, view._mo_ref.value), view)
+                            for view in views or [])
+        results = []
+        for object_content in object_contents or []:
+            mo_ref = object_content.obj._mo_ref
+            view = views_by_ref.get((mo_ref._type, mo_ref.value),
+                                    object_content.obj)
+            view._set_view_data(object_content=object_content)
+            results.append(view)
+        raise Return(results)
+
+    def _future(self, awaitable):
+        if isinstance(awaitable, Future):
+            return awaitable
+        if isinstance(awaitable, list):
+            return self.gather(awaitable)
+        return self.spawn(awaitable)
+
+    def _step(self, coroutine, future, value, exc_info):
+        try:
+            if exc_info is not None:
+                awaited = coroutine.throw(*exc_info)
+            else:
+                awaited = coroutine.send(value)
+        except StopIteration:
+            future.set_result(None)
+            return
+        except Return, e:
+            future.set_result(e.value)
+            return
+        except Exception:
+            future.set_exception(sys.exc_info())
+            return
+
+        def resume(awaited):
+            try:
+                value = awaited.result()
+            except Exception:
+                self._step(coroutine, future, None, sys.exc_info())
+            else:
+                self._step(coroutine, future, value, None)
+
+        # Resumed from the loop so that a long chain of finished Futures
+        # doesn't recurse
+        self._future(awaited).add_done_callback(
+            lambda awaited: self.loop.call_soon(resume, awaited))
@@ -28,17 +28,23 @@ The main module for accessing a vSphere server.
 import logging
 import os
 import suds
-import time
+import weakref
 
+from collections import deque
 from urllib2 import URLError
+from suds.client import ServiceSelector
 from suds.plugin import MessagePlugin
 from suds.transport import TransportError
 
-from psphere import soap, ManagedObject
+from psphere import soap, ManagedObject, __version__
 from psphere.config import _config_value
+from psphere.coalesce import RequestCoalescer
 from psphere.errors import (ConfigError, ObjectNotFoundError, TaskFailedError,
                             NotLoggedInError)
+from psphere.index import EntityIndex
+from psphere.lookup import Lookup
 from psphere.managedobjects import ServiceInstance, Task, classmapper
+from psphere.prefetch import Prefetcher
 
 logger = logging.getLogger(__name__)
 
@@ -61,23 +67,122 @@ class Client(suds.client.Client):
     :param plugins: The plugins classes that will be used to process messages
                     before send them to the web service
     :type plugins: list of classes
+    :param search_backend: How inventory searches select objects. \
+    "traversal" walks the inventory with TraversalSpecs, "container_view" \
+    uses a recursive ContainerView per type which is created on first use \
+    and destroyed on logout.
+    :type search_backend: The string "traversal" (default) or "container_view"
+    :param relogin: Whether to login again and retry when a call fails \
+    because the session has expired.
+    :type relogin: bool (default=False)
+    :param transport: The HTTP transport used for SOAP calls. "urllib2" \
+    opens a new connection for every call, "keepalive" reuses persistent \
+    connections and compresses responses, see \
+    :class:`psphere.soap.KeepAliveTransport`.
+    :type transport: The string "urllib2" (default) or "keepalive", or a \
+    suds Transport instance
+    :param wsdl_cache: Whether to keep the processed local WSDL in a \
+    persistent cache, which saves parsing it every time a Client is \
+    created. The cache is stored in wsdl_cache_dir from the config file, \
+    by default ~/.psphere/cache/.
+    :type wsdl_cache: bool (default=True)
+    :param stream_responses: Whether the results of inventory searches and \
+    get_views are parsed and unmarshalled one object at a time, rather \
+    than building a tree of the whole response first. This greatly \
+    reduces the memory needed for large responses.
+    :type stream_responses: bool (default=False)
+    :param identity_map_size: The maximum number of views in the identity \
+    map, which ensures that while a view of a managed object is in use \
+    the same view is returned whenever the object is referenced. None \
+    means no limit, 0 disables the identity map.
+    :type identity_map_size: int or None (default=None)
+    :param prefetch: Whether to learn which properties are used together \
+    and retrieve them in one request, see \
+    :class:`psphere.prefetch.Prefetcher`. A Prefetcher can be given to \
+    configure it.
+    :type prefetch: bool (default=False) or Prefetcher
+    :param entity_index: Whether find_entity_view looks entities up by \
+    name and UUID in a local index, see :class:`psphere.index.EntityIndex`. \
+    "persistent" also saves the index in wsdl_cache_dir for later clients.
+    :type entity_index: bool (default=False) or the string "persistent"
+    :param coalesce_window: The number of seconds to wait for other \
+    threads to request properties, so they are retrieved in one call, see \
+    :class:`psphere.coalesce.RequestCoalescer`. Threads always share calls \
+    for the same properties of the same object.
+    :type coalesce_window: float (default=0)
     """
     def __init__(self, server=None, username=None, password=None,
-                 wsdl_location="local", timeout=30, plugins=[]):
+                 wsdl_location="local", timeout=30, plugins=[],
+                 search_backend=None, relogin=False, transport=None,
+                 wsdl_cache=True, stream_responses=None,
+                 identity_map_size=None, prefetch=None, entity_index=None,
+                 coalesce_window=None):
         self._logged_in = False
+        self.relogin = relogin
+        self._container_views = {}
+        self._mor_free_types = None
+        # Parts of PropertyFilterSpecs which are built once and reused
+        self._traversal_specs = None
+        self._container_traversal_spec = None
+        self._property_specs = {}
+        self.identity_map_size = identity_map_size
+        self._identity_map = weakref.WeakValueDictionary()
+        if prefetch is None:
+            prefetch = _config_value("general", "prefetch", False)
+        if prefetch is True:
+            prefetch = Prefetcher()
+        self.prefetcher = prefetch or None
+        if coalesce_window is None:
+            coalesce_window = _config_value("general", "coalesce_window", 0)
+        self._coalescer = RequestCoalescer(self, coalesce_window)
+        if entity_index is None:
+            entity_index = _config_value("general", "entity_index", False)
+        if entity_index not in [True, False, "persistent"]:
+            raise ConfigError("entity_index must be true, false or "
+                              "\"persistent\"")
+        self.entity_index = None
+        if entity_index:
+            location = os.path.expanduser(_config_value(
+                "general", "wsdl_cache_dir", "~/.psphere/cache/"))
+            self.entity_index = EntityIndex(
+                self, persist=entity_index == "persistent", location=location)
         if server is None:
             server = _config_value("general", "server")
         if username is None:
             username = _config_value("general", "username")
         if password is None:
             password = _config_value("general", "password")
+        if search_backend is None:
+            search_backend = _config_value("general", "search_backend",
+                                           "traversal")
+        if transport is None:
+            transport = _config_value("general", "transport", "urllib2")
+        if stream_responses is None:
+            stream_responses = _config_value("general", "stream_responses",
+                                             False)
         if server is None:
             raise ConfigError("server must be set in config file or Client()")
         if username is None:
             raise ConfigError("username must be set in config file or Client()")
         if password is None:
             raise ConfigError("password must be set in config file or Client()")
+        if search_backend not in ["traversal", "container_view"]:
+            raise ConfigError("search_backend must be \"traversal\" or "
+                              "\"container_view\"")
+        options = {}
+        if transport == "keepalive":
+            compress_requests = _config_value("general", "compress_requests",
+                                              False)
+            options["transport"] = soap.KeepAliveTransport(
+                compress_requests=compress_requests)
+        elif transport != "urllib2":
+            if isinstance(transport, basestring):
+                raise ConfigError("transport must be \"urllib2\" or "
+                                  "\"keepalive\"")
+            options["transport"] = transport
         self.server = server
+        self.search_backend = search_backend
+        self.stream_responses = bool(stream_responses)
         self.username = username
         self.password = password
         url = "https://%s/sdk" % self.server
@@ -89,6 +194,9 @@ class Client(suds.client.Client):
             if current_path.endswith('/') :
                 current_path = current_path[:-1]
             wsdl_uri = ("file://%s/wsdl/vimService.wsdl" % current_path)
+            if wsdl_cache is True:
+                options["cache"] = get_wsdl_cache()
+                options["cachingpolicy"] = 1
         elif wsdl_location == "remote":
             wsdl_uri = url + "/vimService.wsdl"
         else:
@@ -97,7 +205,8 @@ class Client(suds.client.Client):
         try:
             # Add ExtraConfigPlugin to the plugins
             plugins.append(ExtraConfigPlugin())
-            suds.client.Client.__init__(self, wsdl_uri, plugins=plugins)
+            suds.client.Client.__init__(self, wsdl_uri, plugins=plugins,
+                                        **options)
         except URLError:
             logger.critical("Failed to connect to %s", self.server)
             raise
@@ -109,6 +218,12 @@ class Client(suds.client.Client):
             raise
         self.options.transport.options.timeout = timeout
         self.set_options(location=url)
+        # The methods views can proxy, looked up on every missing attribute
+        self._methods = soap.service_methods(self.wsdl)
+        self._connect()
+
+    def _connect(self):
+        """Retrieve the service content and login."""
         mo_ref = soap.ManagedObjectReference("ServiceInstance",
                                              "ServiceInstance")
         self.si = ServiceInstance(mo_ref, self) 
@@ -122,6 +237,49 @@ class Client(suds.client.Client):
         if self._logged_in is False:
             self.login(self.username, self.password)
 
+    def clone(self):
+        """Create a new client with its own session on the same server.
+
+        The clone shares the parsed WSDL with this client but has its own
+        transport and session cookie, so the two can be used from
+        different threads at the same time.
+
+        >>> other_client = client.clone()
+
+        :returns: A new, logged in, client.
+        :rtype: Client
+
+        """
+        # suds gives us a copy of the options and transport which shares
+        # the WSDL, move it into an instance of our own class
+        suds_clone = suds.client.Client.clone(self)
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(suds_clone.__dict__)
+        clone.service = ServiceSelector(clone, clone.wsdl.services)
+        clone._logged_in = False
+        clone._container_views = {}
+        clone._mor_free_types = self._mor_free_types
+        clone._methods = self._methods
+        clone._traversal_specs = self._traversal_specs
+        clone._container_traversal_spec = self._container_traversal_spec
+        clone._property_specs = {}
+        clone.identity_map_size = self.identity_map_size
+        clone._identity_map = weakref.WeakValueDictionary()
+        # What has been learned about property use applies to clones too
+        clone.prefetcher = self.prefetcher
+        clone._coalescer = RequestCoalescer(clone, self._coalescer.window)
+        clone.entity_index = None
+        if self.entity_index is not None:
+            clone.entity_index = self.entity_index.clone(clone)
+        clone.relogin = self.relogin
+        clone.server = self.server
+        clone.username = self.username
+        clone.password = self.password
+        clone.search_backend = self.search_backend
+        clone.stream_responses = self.stream_responses
+        clone._connect()
+        return clone
+
     def login(self, username=None, password=None):
         """Login to a vSphere server.
 
@@ -143,6 +301,9 @@ class Client(suds.client.Client):
     def logout(self):
         """Logout of a vSphere server."""
         if self._logged_in is True:
+            self.destroy_container_views()
+            if self.entity_index is not None:
+                self.entity_index.stop()
             self.si.flush_cache()
             self.sc.sessionManager.Logout()
             self._logged_in = False
@@ -162,15 +323,12 @@ class Client(suds.client.Client):
         :type kwargs: TODO
 
         """
-        if (self._logged_in is False and
-            method not in ["Login", "RetrieveServiceContent"]):
-            logger.critical("Cannot exec %s unless logged in", method)
-            raise NotLoggedInError("Cannot exec %s unless logged in" % method)
-
-        for kwarg in kwargs:
-            kwargs[kwarg] = self._marshal(kwargs[kwarg])
+        result = self._send(getattr(self.service, method), method, _this,
+                            **kwargs)
+        return self._unmarshal_result(result)
 
-        result = getattr(self.service, method)(_this=_this, **kwargs)
+    def _unmarshal_result(self, result):
+        """Unmarshal the result of a method."""
         if hasattr(result, '__iter__') is False:
             logger.debug("Returning non-iterable result")
             return result
@@ -187,20 +345,151 @@ class Client(suds.client.Client):
         else:
             new_result = self._unmarshal(result)
             
-        logger.debug("Finished in invoke.")
-        #property = self.find_and_destroy(property)
-        #print result
         # Return the modified result to the caller
         return new_result
 
+    def invoke_stream(self, method, _this, **kwargs):
+        """Invoke a RetrieveProperties style method on the server, parsing
+        the returned ObjectContent's one at a time.
+
+        >>> for object_content in client.invoke_stream(
+        ...         "RetrieveProperties", client.sc.propertyCollector._mo_ref,
+        ...         specSet=pfs):
+        ...     print(object_content.obj)
+
+        :param method: RetrieveProperties, RetrievePropertiesEx or \
+        ContinueRetrievePropertiesEx
+        :type method: str
+        :param _this: The managed object reference of the PropertyCollector \
+        to invoke the method against.
+        :type _this: ManagedObjectReference
+        :returns: The unmarshalled ObjectContent's, and for the paged \
+        methods the token of the next page. See \
+        :class:`psphere.soap.ObjectContentStream`.
+        :rtype: ObjectContentStream or None
+
+        """
+        def send(**kwargs):
+            return soap.invoke_stream(self, method, convert=self._unmarshal,
+                                      **kwargs)
+        return self._send(send, method, _this, **kwargs)
+
+    def _send(self, send, method, _this, **kwargs):
+        """Marshal the arguments and send a method, logging in again and
+        retrying if the session has expired and relogin is enabled."""
+        if (self._logged_in is False and
+            method not in ["Login", "RetrieveServiceContent"]):
+            logger.critical("Cannot exec %s unless logged in", method)
+            raise NotLoggedInError("Cannot exec %s unless logged in" % method)
+
+        for kwarg in kwargs:
+            kwargs[kwarg] = self._marshal(kwargs[kwarg])
+
+        try:
+            return send(_this=_this, **kwargs)
+        except suds.WebFault, e:
+            if not self._should_relogin(method, e):
+                raise
+            # The session has expired, login again and retry once
+            self._relogin(method, kwargs)
+            return send(_this=_this, **kwargs)
+
+    def _should_relogin(self, method, fault):
+        """Whether a WebFault from a method is answered by logging in
+        again and retrying."""
+        return (self.relogin is not False and method != "Login" and
+                hasattr(getattr(fault.fault, "detail", None),
+                        "NotAuthenticatedFault"))
+
+    def _relogin(self, method, kwargs):
+        """Login again after the session expired while invoking a method,
+        pointing a filter in its marshalled arguments at the ContainerViews
+        of the new session."""
+        logger.warning("Session expired while invoking %s, logging in "
+                       "again", method)
+        # The server destroyed the session's ContainerViews with it
+        stale = self._container_views
+        self._container_views = {}
+        self._logged_in = False
+        self.login()
+        if stale and "specSet" in kwargs:
+            self._replace_container_views(kwargs["specSet"], stale)
+
+    def _replace_container_views(self, spec_set, stale):
+        """Point a filter's ObjectSpecs at ContainerViews of the current
+        session in place of those of an expired one."""
+        keys = dict((str(container_view._mo_ref.value), key)
+                    for key, container_view in stale.items())
+        if not isinstance(spec_set, list):
+            spec_set = [spec_set]
+        for pfs in spec_set:
+            for object_spec in pfs.objectSet or []:
+                obj = object_spec.obj
+                key = keys.get(str(obj.value))
+                if str(obj._type) != "ContainerView" or key is None:
+                    continue
+                begin_entity = soap.ManagedObjectReference(key[0], key[1])
+                container_view = self.get_container_view(key[2],
+                                                         begin_entity)
+                object_spec.obj = container_view._mo_ref
+
+    def _retrieve(self, method, **kwargs):
+        """Invoke a method of the session's PropertyCollector which returns
+        ObjectContent's, streaming the reply if stream_responses is set."""
+        pc = self.sc.propertyCollector
+        if self.stream_responses is True:
+            return self.invoke_stream(method, pc._mo_ref, **kwargs)
+        return getattr(pc, method)(**kwargs)
+
+    def _max_wait_seconds(self):
+        """Get the longest WaitForUpdatesEx may be held open by the server.
+
+        A long poll which outlasted the transport's timeout would fail even
+        though nothing was wrong, so it's kept well under the timeout and
+        callers wait again when it returns nothing.
+
+        """
+        return max(1, int(self.options.timeout) // 2)
+
     def _mor_to_pobject(self, mo_ref):
-        """Converts a MOR to a psphere object."""
+        """Converts a MOR to a psphere object.
+
+        The view already in the identity map for the MOR is returned if
+        there is one, so that its cached properties are shared.
+
+        """
+        key = (mo_ref._type, mo_ref.value)
+        view = self._identity_map.get(key)
+        if view is not None:
+            return view
+
         kls = classmapper(mo_ref._type)
         new_object = kls(mo_ref, self)
+        if (self.identity_map_size is None or
+            len(self._identity_map) < self.identity_map_size):
+            self._identity_map[key] = new_object
         return new_object
 
+    def clear_identity_map(self):
+        """Forget the views in the identity map.
+
+        Views which are still in use are unaffected, but later references
+        to the same managed objects will get new views.
+
+        """
+        logger.debug("Clearing %s views from the identity map",
+                     len(self._identity_map))
+        self._identity_map.clear()
+
     def _marshal(self, obj):
-        """Walks an object and marshals any psphere object into MORs."""
+        """Walks an object and marshals any psphere object into MORs.
+
+        Objects are modified in place, except those of a type which,
+        according to the schema, can't contain a MOR. They aren't walked,
+        so the PropertySpecs and traversal specs shared between filters,
+        and between threads, are never written.
+
+        """
         logger.debug("Checking if %s needs to be marshalled", obj)
         if isinstance(obj, ManagedObject):
             logger.debug("obj is a psphere object, converting to MOR")
@@ -217,6 +506,9 @@ class Client(suds.client.Client):
             logger.debug("%s is not a sudsobject subclass, skipping", obj)
             return obj
 
+        if obj.__class__.__name__ in self._get_mor_free_types():
+            return obj
+
         if hasattr(obj, '__iter__'):
             logger.debug("obj is iterable, recursing it")
             for (name, value) in obj:
@@ -227,56 +519,50 @@ class Client(suds.client.Client):
         logger.debug("obj doesn't need to be marshalled")
         return obj
 
+    def _get_mor_free_types(self):
+        """Get the types which don't need to be walked when unmarshalling.
+
+        The set is computed from the schema on first use and kept in the
+        WSDL cache, if there is one.
+
+        """
+        if self._mor_free_types is None:
+            cache = self.options.cache
+            if isinstance(cache, soap.WsdlCache):
+                self._mor_free_types = cache.get("mor_free_types")
+            if self._mor_free_types is None:
+                logger.debug("Finding types which can't contain a MOR")
+                self._mor_free_types = soap.mor_free_types(self.wsdl.schema)
+                if isinstance(cache, soap.WsdlCache):
+                    cache.put("mor_free_types", self._mor_free_types)
+
+        return self._mor_free_types
+
     def _unmarshal(self, obj):
-        """Walks an object and unmarshals any MORs into psphere objects."""
+        """Walks an object and unmarshals any MORs into psphere objects.
+
+        The object is modified in place. Objects of a type which, according
+        to the schema, can't contain a MOR are not walked.
+
+        """
         if isinstance(obj, suds.sudsobject.Object) is False:
-            logger.debug("%s is not a suds instance, skipping", obj)
             return obj
 
-        logger.debug("Processing:")
-        logger.debug(obj)
-        logger.debug("...with keylist:")
-        logger.debug(obj.__keylist__)
         # If the obj that we're looking at has a _type key
         # then create a class of that type and return it immediately
         if "_type" in obj.__keylist__:
-            logger.debug("obj is a MOR, converting to psphere class")
             return self._mor_to_pobject(obj)
 
-        new_object = obj.__class__()
-        for sub_obj in obj:
-            logger.debug("Looking at %s of type %s", sub_obj, type(sub_obj))
-
-            if isinstance(sub_obj[1], list):
-                new_embedded_objs = []
-                for emb_obj in sub_obj[1]:
-                    new_emb_obj = self._unmarshal(emb_obj)
-                    new_embedded_objs.append(new_emb_obj)
-                setattr(new_object, sub_obj[0], new_embedded_objs)
-                continue
-
-            if not issubclass(sub_obj[1].__class__, suds.sudsobject.Object):
-                logger.debug("%s is not a sudsobject subclass, skipping",
-                             sub_obj[1].__class__)
-                setattr(new_object, sub_obj[0], sub_obj[1])
-                continue
+        if obj.__class__.__name__ in self._get_mor_free_types():
+            return obj
 
-            logger.debug("Obj keylist: %s", sub_obj[1].__keylist__)
-            if "_type" in sub_obj[1].__keylist__:
-                logger.debug("Converting nested MOR to psphere class:")
-                logger.debug(sub_obj[1])
-                kls = classmapper(sub_obj[1]._type)
-                logger.debug("Setting %s.%s to %s",
-                             new_object.__class__.__name__,
-                             sub_obj[0],
-                             sub_obj[1])
-                setattr(new_object, sub_obj[0], kls(sub_obj[1], self))
-            else:
-                logger.debug("Didn't find _type in:")
-                logger.debug(sub_obj[1])
-                setattr(new_object, sub_obj[0], self._unmarshal(sub_obj[1]))
+        for (name, value) in obj:
+            if isinstance(value, list):
+                setattr(obj, name, [self._unmarshal(item) for item in value])
+            elif isinstance(value, suds.sudsobject.Object):
+                setattr(obj, name, self._unmarshal(value))
 
-        return new_object
+        return obj
 
     def create(self, type_, **kwargs):
         """Create a SOAP object of the requested type.
@@ -289,7 +575,7 @@ class Client(suds.client.Client):
         :type kwargs: TODO
 
         """
-        obj = self.factory.create("ns0:%s" % type_)
+        obj = soap.instantiate(self.factory, type_)
         for key, value in kwargs.items():
             setattr(obj, key, value)
         return obj
@@ -318,9 +604,9 @@ class Client(suds.client.Client):
         :rtype: ManagedObject
 
         """
-        # This maps the mo_ref into a psphere class and then instantiates it
-        kls = classmapper(mo_ref._type)
-        view = kls(mo_ref, self)
+        # This maps the mo_ref into a psphere class and then instantiates
+        # it, or finds the view we already have of it
+        view = self._mor_to_pobject(mo_ref)
         # Update the requested properties of the instance
         #view.update_view_data(properties=properties)
 
@@ -332,48 +618,115 @@ class Client(suds.client.Client):
         :param mo_refs: The list of ManagedObjectReference's that views are \
         to be created for.
         :type mo_refs: ManagedObjectReference
-        :param properties: The properties to retrieve in the views.
+        :param properties: The properties to retrieve in the views, which \
+        may be paths such as summary.quickStats.
         :type properties: list
         :returns: A list of local instances representing the server-side \
         managed objects.
         :rtype: list of ManagedObject's
 
         """
-        property_specs = []
+        object_contents = self._coalescer.retrieve(mo_refs, properties)
+        views = []
+        for object_content in object_contents:
+            # Update the instance with the data in object_content
+            object_content.obj._set_view_data(object_content=object_content)
+            views.append(object_content.obj)
+
+        return views
+
+    def update_views(self, views, properties):
+        """Update the properties of many views with a single request.
+
+        >>> client.update_views(host.vm, ["name", "runtime"])
+
+        :param views: The views to update.
+        :type views: list of ManagedObject's
+        :param properties: The properties to retrieve.
+        :type properties: list or the string "all"
+
+        """
+        if not views:
+            return
+        object_contents = self._coalescer.retrieve(
+            [view._mo_ref for view in views], properties)
+        # Without the identity map the results are new views, so update the
+        # ones we were given
+        views_by_ref = dict(((view._mo_ref._type, view._mo_ref.value), view)
+                            for view in views)
+        for object_content in object_contents:
+            mo_ref = object_content.obj._mo_ref
+            view = views_by_ref.get((mo_ref._type, mo_ref.value),
+                                    object_content.obj)
+            view._set_view_data(object_content=object_content)
+
+    def get_views_filter_spec(self, mo_refs, properties=None):
+        """Build a PropertyFilterSpec which retrieves the given properties
+        of each of the given managed objects.
+
+        :param mo_refs: The managed objects to retrieve properties of.
+        :type mo_refs: list of ManagedObjectReference's
+        :param properties: The properties to retrieve.
+        :type properties: list or the string "all"
+        :rtype: PropertyFilterSpec
+
+        """
+        types = []
         for mo_ref in mo_refs:
-            property_spec = self.create('PropertySpec')
-            property_spec.type = str(mo_ref._type)
-            if properties is None:
-                properties = []
-            else:
-                # Only retrieve the requested properties
-                if properties == "all":
-                    property_spec.all = True
-                else:
-                    property_spec.all = False
-                    property_spec.pathSet = properties
-            property_specs.append(property_spec)
+            if str(mo_ref._type) not in types:
+                types.append(str(mo_ref._type))
+        return self._objects_filter_spec(
+            mo_refs, [(type_, properties) for type_ in types])
 
-        object_specs = []
+    def _objects_filter_spec(self, mo_refs, properties):
+        """Build a PropertyFilterSpec which retrieves properties of some
+        managed objects, with one PropertySpec for each type.
+
+        :param properties: (type, properties) for each type of managed \
+        object.
+        :type properties: list
+
+        """
+        pfs = self.create('PropertyFilterSpec')
+        pfs.propSet = [self._property_spec(type_, paths)
+                       for type_, paths in properties]
+        pfs.objectSet = []
         for mo_ref in mo_refs:
             object_spec = self.create('ObjectSpec')
             object_spec.obj = mo_ref
-            object_specs.append(object_spec)
+            pfs.objectSet.append(object_spec)
+        return pfs
 
-        pfs = self.create('PropertyFilterSpec')
-        pfs.propSet = property_specs
-        pfs.objectSet = object_specs
+    def _property_spec(self, type_, properties):
+        """Get a PropertySpec for some properties of a type.
 
-        object_contents = self.sc.propertyCollector.RetrieveProperties(
-            specSet=pfs)
-        views = []
-        for object_content in object_contents:
-            # Update the instance with the data in object_content
-            object_content.obj._set_view_data(object_content=object_content)
-            views.append(object_content.obj)
+        PropertySpecs are never modified once built, not even by
+        _marshal, so one is shared by every filter which retrieves the same
+        properties of the same type.
+
+        """
+        if properties is None or properties == "all":
+            key = (type_, properties)
+        else:
+            key = (type_, tuple(properties))
+        property_spec = self._property_specs.get(key)
+        if property_spec is not None:
+            return property_spec
+
+        property_spec = self.create('PropertySpec')
+        property_spec.type = type_
+        if properties == "all":
+            property_spec.all = True
+        elif properties is not None:
+            # Only retrieve the requested properties
+            property_spec.all = False
+            property_spec.pathSet = list(properties)
+        # Don't keep every combination of properties ever requested
+        if len(self._property_specs) >= 1000:
+            self._property_specs.clear()
+        self._property_specs[key] = property_spec
+        return property_spec
 
-        return views
-        
     def get_search_filter_spec(self, begin_entity, property_spec):
         """Build a PropertyFilterSpec capable of full inventory traversal.
         
@@ -388,6 +741,25 @@ class Client(suds.client.Client):
         under the given ManagedEntity.
         :rtype: PropertyFilterSpec
 
+        """
+        if self._traversal_specs is None:
+            self._traversal_specs = self._build_traversal_specs()
+
+        obj_spec = self.create('ObjectSpec')
+        obj_spec.obj = begin_entity
+        obj_spec.selectSet = self._traversal_specs
+
+        pfs = self.create('PropertyFilterSpec')
+        pfs.propSet = [property_spec]
+        pfs.objectSet = [obj_spec]
+        return pfs
+
+    def _build_traversal_specs(self):
+        """Build the TraversalSpecs which select every object in the
+        inventory below an entity.
+
+        They don't depend on the search, so are built once per client.
+
         """
         # The selection spec for additional objects we want to filter
         ss_strings = ['resource_pool_traversal_spec',
@@ -456,21 +828,101 @@ class Client(suds.client.Client):
                           selection_specs[6], selection_specs[7],
                           selection_specs[1]]
 
+        return [fts, dvts, dhts, crhts, crrts, rpts, hvts, rpvts]
+
+    def get_container_view(self, view_type, begin_entity):
+        """Get a recursive ContainerView of the requested type.
+
+        The view is created the first time it is requested and reused for
+        subsequent searches until it is destroyed on logout. When the
+        session expires and relogin is enabled, the view is created again
+        in the new session.
+
+        :param view_type: The type of ManagedEntity's the view contains.
+        :type view_type: str
+        :param begin_entity: The container the view is rooted at.
+        :type begin_entity: ManagedObjectReference
+        :returns: A view of every object of view_type under begin_entity.
+        :rtype: ContainerView
+
+        """
+        key = (str(begin_entity._type), str(begin_entity.value), view_type)
+        if key not in self._container_views:
+            logger.debug("Creating ContainerView of %s under %s",
+                         view_type, begin_entity.value)
+            vm = self.sc.viewManager
+            self._container_views[key] = vm.CreateContainerView(
+                container=begin_entity, type=[view_type], recursive=True)
+
+        return self._container_views[key]
+
+    def destroy_container_views(self):
+        """Destroy all ContainerView's created by get_container_view."""
+        for container_view in self._container_views.values():
+            logger.debug("Destroying %s", container_view._mo_ref.value)
+            container_view.DestroyView()
+        self._container_views = {}
+
+    def get_container_filter_spec(self, container_view, property_spec):
+        """Build a PropertyFilterSpec selecting the objects in a ContainerView.
+
+        :param container_view: The view whose contents are to be selected.
+        :type container_view: ContainerView
+        :param property_spec: The properties to retrieve from each object.
+        :type property_spec: PropertySpec
+        :returns: A PropertyFilterSpec, suitable for retrieving every \
+        object in the view.
+        :rtype: PropertyFilterSpec
+
+        """
+        if self._container_traversal_spec is None:
+            ts = self.create('TraversalSpec')
+            ts.name = 'container_view_traversal_spec'
+            ts.type = 'ContainerView'
+            ts.path = 'view'
+            ts.skip = False
+            self._container_traversal_spec = ts
+
+        # The view itself is only the starting point, skip its properties
         obj_spec = self.create('ObjectSpec')
-        obj_spec.obj = begin_entity
-        obj_spec.selectSet = [fts, dvts, dhts, crhts, crrts,
-                               rpts, hvts, rpvts]
+        obj_spec.obj = container_view._mo_ref
+        obj_spec.skip = True
+        obj_spec.selectSet = [self._container_traversal_spec]
 
         pfs = self.create('PropertyFilterSpec')
         pfs.propSet = [property_spec]
         pfs.objectSet = [obj_spec]
         return pfs
 
-    def invoke_task(self, method, **kwargs):
+    def get_entity_filter_spec(self, view_type, begin_entity, property_spec):
+        """Build a PropertyFilterSpec for finding entities of a type.
+
+        The filter is built using the client's search_backend.
+
+        :param view_type: The type of ManagedEntity's to find.
+        :type view_type: str
+        :param begin_entity: The place in the MOB to start the search.
+        :type begin_entity: ManagedObjectReference
+        :param property_spec: The properties to retrieve from each object.
+        :type property_spec: PropertySpec
+        :rtype: PropertyFilterSpec
+
+        """
+        if self.search_backend == "container_view":
+            container_view = self.get_container_view(view_type, begin_entity)
+            return self.get_container_filter_spec(container_view,
+                                                  property_spec)
+
+        return self.get_search_filter_spec(begin_entity, property_spec)
+
+    def invoke_task(self, method, progress_callback=None, **kwargs):
         """Execute a \*_Task method and wait for it to complete.
         
         :param method: The \*_Task method to invoke.
         :type method: str
+        :param progress_callback: Called as the task progresses, see \
+        wait_for_tasks.
+        :type progress_callback: callable or None
         :param kwargs: The arguments to pass to the method.
         :type kwargs: TODO
 
@@ -481,21 +933,160 @@ class Client(suds.client.Client):
                   'return a ManagedObjectReference to a Task.')
             return None
 
-        task_mo_ref = self.invoke(method=method, **kwargs)
-        task = Task(task_mo_ref, self)
-        task.update_view_data(properties=['info'])
-        # TODO: This returns true when there is an error
-        while True:
-            if task.info.state == 'success':
-                return task
-            elif task.info.state == 'error':
-                # TODO: Handle error checking properly
-                raise TaskFailedError(task.info.error.localizedMessage)
+        task = self.invoke(method=method, **kwargs)
+        if not isinstance(task, ManagedObject):
+            task = Task(task, self)
+
+        self.wait_for_tasks([task], progress_callback=progress_callback)
+        if task.info.state == 'error':
+            # TODO: Handle error checking properly
+            raise TaskFailedError(task.info.error.localizedMessage)
+
+        return task
+
+    def wait_for_tasks(self, tasks, progress_callback=None):
+        """Wait for a number of Task's to complete.
+
+        A single PropertyFilter is created over the state and progress of
+        all of the tasks and the server is long-polled with
+        WaitForUpdatesEx, so this returns as soon as the last task
+        completes without polling each task individually.
+
+        >>> tasks = [vm.PowerOnVM_Task() for vm in vms]
+        >>> for task in client.wait_for_tasks(tasks):
+        ...     print(task.info.entityName, task.info.state)
+
+        :param tasks: The tasks to wait for.
+        :type tasks: list of Task's
+        :param progress_callback: Called with the task, its state and its \
+        progress whenever either changes.
+        :type progress_callback: callable or None
+        :returns: The tasks, with the info property of each retrieved \
+        after completion, unless the task no longer exists. Failed tasks \
+        do not raise an exception, check info.state.
+        :rtype: list of Task's
+
+        """
+        waiter = TaskWaiter(self, progress_callback=progress_callback)
+        try:
+            waiter.add(tasks)
+            while waiter.pending:
+                waiter.wait()
+        finally:
+            waiter.destroy()
+
+        waiter.retrieve_info()
+        return tasks
+
+    def run_tasks(self, method, targets, max_in_flight=10, view_type=None,
+                  progress_callback=None, **kwargs):
+        """Run a \*_Task method against many targets.
+
+        At most max_in_flight tasks are outstanding on the server at any
+        time, a new task is started as soon as a running one completes.
+        The completion of every task is tracked through a single
+        PropertyCollector.
+
+        >>> results, failures = client.run_tasks("PowerOnVM_Task",
+        ...                                      ["vm1", "vm2", "vm3"],
+        ...                                      view_type="VirtualMachine",
+        ...                                      max_in_flight=2)
+
+        :param method: The \*_Task method to invoke on each target.
+        :type method: str
+        :param targets: The objects to invoke the method on, either as \
+        views or as the names of entities of view_type.
+        :type targets: list of ManagedObject's or str's
+        :param max_in_flight: The maximum number of tasks to run at once.
+        :type max_in_flight: int
+        :param view_type: The type of ManagedEntity named in targets. \
+        Names are resolved with a single search before any task is started.
+        :type view_type: str or None
+        :param progress_callback: Called as tasks progress, see \
+        wait_for_tasks.
+        :type progress_callback: callable or None
+        :param kwargs: The arguments to pass to the method.
+        :returns: Two dicts keyed by target. The first holds the Task of \
+        each target whose task succeeded, the second holds the exception \
+        for each target which couldn't be found, whose method invocation \
+        raised a fault or whose task failed.
+        :rtype: tuple
+
+        """
+        if not method.endswith('_Task'):
+            raise ValueError("run_tasks can only be used for methods which "
+                             "return a ManagedObjectReference to a Task.")
+
+        results = {}
+        failures = {}
+        queue = deque()
+        by_name = {}
+        names = [target for target in targets
+                 if not isinstance(target, ManagedObject)]
+        if names:
+            if view_type is None:
+                raise ValueError("view_type must be given to resolve names")
+            # Resolve all of the names with one search
+            views = self.find_entity_views(view_type, properties=["name"])
+            by_name = dict((view.name, view) for view in views)
+
+        for target in targets:
+            if isinstance(target, ManagedObject):
+                queue.append((target, target))
+            elif target in by_name:
+                queue.append((target, by_name[target]))
+            else:
+                failures[target] = ObjectNotFoundError(
+                    "No %s named %s" % (view_type, target))
+
+        owners = {}
+        waiter = TaskWaiter(self, progress_callback=progress_callback)
+        try:
+            while queue or waiter.pending:
+                started = []
+                while queue and (len(waiter.pending) + len(started) <
+                                 max_in_flight):
+                    target, view = queue.popleft()
+                    try:
+                        task = self.invoke(method, _this=view._mo_ref,
+                                           **kwargs)
+                    except suds.WebFault, e:
+                        logger.error("%s failed for %s: %s", method, target,
+                                     e)
+                        failures[target] = e
+                        continue
+                    if not isinstance(task, ManagedObject):
+                        task = Task(task, self)
+                    owners[str(task._mo_ref.value)] = target
+                    started.append(task)
+
+                if started:
+                    logger.debug("Started %s %s tasks", len(started), method)
+                    waiter.add(started)
+                if waiter.pending:
+                    waiter.wait()
+        finally:
+            waiter.destroy()
+
+        missing = set(str(task._mo_ref.value)
+                      for task in waiter.retrieve_info())
+        for task in waiter.tasks:
+            key = str(task._mo_ref.value)
+            target = owners[key]
+            if key in missing:
+                # Only the state seen while waiting is known
+                if waiter.states.get(key) == 'success':
+                    results[target] = task
+                else:
+                    failures[target] = TaskFailedError(
+                        "The info of task %s couldn't be retrieved" % key)
+            elif task.info.state == 'success':
+                results[target] = task
+            else:
+                failures[target] = TaskFailedError(
+                    task.info.error.localizedMessage)
 
-            # TODO: Implement progresscallbackfunc
-            # Sleep two seconds and then refresh the data from the server
-            time.sleep(2)
-            task.update_view_data(properties=['info'])
+        return results, failures
 
     def find_entity_views(self, view_type, begin_entity=None, properties=None):
         """Find all ManagedEntity's of the requested type.
@@ -505,6 +1096,9 @@ class Client(suds.client.Client):
         :param begin_entity: The MOR to start searching for the entity. \
         The default is to start the search at the root folder.
         :type begin_entity: ManagedObjectReference or None
+        :param properties: The properties to retrieve in the views, which \
+        may be paths such as summary.quickStats.
+        :type properties: list
         :returns: A list of ManagedEntity's
         :rtype: list
 
@@ -521,25 +1115,113 @@ class Client(suds.client.Client):
         property_spec.all = False
         property_spec.pathSet = properties
 
-        pfs = self.get_search_filter_spec(begin_entity, property_spec)
+        pfs = self.get_entity_filter_spec(view_type, begin_entity,
+                                          property_spec)
 
         # Retrieve properties from server and update entity
-        obj_contents = self.sc.propertyCollector.RetrieveProperties(specSet=pfs)
+        obj_contents = self._retrieve("RetrieveProperties", specSet=pfs)
 
         views = []
-        for obj_content in obj_contents:
+        for obj_content in obj_contents or []:
             logger.debug("In find_entity_view with object of type %s",
                          obj_content.obj.__class__.__name__)
-            obj_content.obj.update_view_data(properties=properties)
+            # The traversal has already returned the requested properties
+            # in the propSet, so populate the view from it rather than
+            # making another round trip for each object
+            obj_content.obj._set_view_data(object_content=obj_content)
             views.append(obj_content.obj)
 
         return views
 
+    def iter_entity_views(self, view_type, begin_entity=None, properties=None,
+                          page_size=500):
+        """Iterate over all ManagedEntity's of the requested type.
+
+        Results are retrieved from the server a page at a time using
+        RetrievePropertiesEx and ContinueRetrievePropertiesEx, so only one
+        page of objects needs to be held in memory at once.
+
+        >>> for vm in client.iter_entity_views("VirtualMachine",
+        ...                                    properties=["name"]):
+        ...     print(vm.name)
+
+        :param view_type: The type of ManagedEntity's to find.
+        :type view_type: str
+        :param begin_entity: The MOR to start searching for the entity. \
+        The default is to start the search at the root folder.
+        :type begin_entity: ManagedObjectReference or None
+        :param properties: The properties to retrieve in the views.
+        :type properties: list
+        :param page_size: The maximum number of objects the server should \
+        return in each page.
+        :type page_size: int
+        :returns: A generator of ManagedEntity's
+        :rtype: generator
+
+        """
+        if properties is None:
+            properties = []
+
+        # Start the search at the root folder if no begin_entity was given
+        if not begin_entity:
+            begin_entity = self.sc.rootFolder._mo_ref
+
+        property_spec = self.create('PropertySpec')
+        property_spec.type = view_type
+        property_spec.all = False
+        property_spec.pathSet = properties
+
+        pfs = self.get_entity_filter_spec(view_type, begin_entity,
+                                          property_spec)
+        for obj_content in self._iter_object_contents(pfs, page_size):
+            obj_content.obj._set_view_data(object_content=obj_content)
+            yield obj_content.obj
+
+    def _iter_object_contents(self, pfs, page_size):
+        """Iterate over the ObjectContent's selected by a
+        PropertyFilterSpec, retrieving them a page at a time."""
+        options = self.create('RetrieveOptions', maxObjects=page_size)
+
+        pc = self.sc.propertyCollector
+        result = self._retrieve("RetrievePropertiesEx", specSet=[pfs],
+                                options=options)
+        token = None
+        try:
+            while result is not None:
+                # A streamed page is parsed as it is iterated over, its
+                # token is known before the first object is returned
+                objects = result
+                if self.stream_responses is False:
+                    objects = result.objects
+                    logger.debug("Retrieved page of %s objects",
+                                 len(objects))
+                for obj_content in objects:
+                    token = getattr(result, "token", None)
+                    yield obj_content
+
+                # A missing token means this was the last page
+                token = getattr(result, "token", None)
+                if token is None:
+                    break
+                result = self._retrieve("ContinueRetrievePropertiesEx",
+                                        token=token)
+                token = None
+        finally:
+            # Release the server-side result set if the caller stopped
+            # iterating before the last page was consumed
+            if token is not None:
+                logger.debug("Cancelling retrieval with token %s", token)
+                pc.CancelRetrievePropertiesEx(token=token)
+
     def find_entity_view(self, view_type, begin_entity=None, filter={},
                          properties=None):
         """Find a ManagedEntity of the requested type.
 
-        Traverses the MOB looking for an entity matching the filter.
+        Entities which can be looked up by the server's SearchIndex, such \
+        as a VirtualMachine by config.uuid, are found without a search. \
+        Otherwise the inventory is searched a page at a time, retrieving \
+        only the filtered properties, until an entity matches. See \
+        :mod:`psphere.lookup`.
 
         :param view_type: The type of ManagedEntity to find.
         :type view_type: str
@@ -547,9 +1229,13 @@ class Client(suds.client.Client):
         The default is to start the search at the root folder.
         :type begin_entity: ManagedObjectReference or None
         :param filter: Key/value pairs to filter the results. The key is \
-        a valid parameter of the ManagedEntity type. The value is what \
-        that parameter should match.
+        a property path of the ManagedEntity type. The value is what \
+        that property should equal, a compiled regular expression to \
+        search it with or a callable which returns True if it matches.
         :type filter: dict
+        :param properties: The properties to retrieve in the view, which \
+        may be paths such as summary.quickStats.
+        :type properties: list
         :returns: If an entity is found, a ManagedEntity matching the search.
         :rtype: ManagedEntity
 
@@ -557,72 +1243,290 @@ class Client(suds.client.Client):
         if properties is None:
             properties = []
 
-        kls = classmapper(view_type)
         # Start the search at the root folder if no begin_entity was given
-        if not begin_entity:
+        at_root = not begin_entity
+        if at_root:
             begin_entity = self.sc.rootFolder._mo_ref
             logger.debug("Using %s", self.sc.rootFolder._mo_ref)
 
+        if not filter:
+            logger.warning('No filter specified, returning first match.')
+
+        lookup = Lookup(filter)
+        view = self._find_indexed(view_type, begin_entity, lookup, at_root,
+                                  properties)
+        if view is not None:
+            return view
+
         property_spec = self.create('PropertySpec')
         property_spec.type = view_type
         property_spec.all = False
-        property_spec.pathSet = filter.keys()
+        property_spec.pathSet = lookup.keys or properties
+        pfs = self.get_entity_filter_spec(view_type, begin_entity,
+                                          property_spec)
 
-        pfs = self.get_search_filter_spec(begin_entity, property_spec)
+        # Stop retrieving pages at the first match, which when there is
+        # no filter is the first entity
+        page_size = 500
+        if not filter:
+            page_size = 1
+        obj_contents = self._iter_object_contents(pfs, page_size)
+        try:
+            for obj_content in obj_contents:
+                if lookup.match(obj_content):
+                    break
+            else:
+                raise ObjectNotFoundError("No matching objects for filter")
+        finally:
+            # Cancels the retrieval of the remaining pages
+            obj_contents.close()
+
+        view = obj_content.obj
+        view._set_view_data(object_content=obj_content)
+        # Only the matching entity's other properties are retrieved
+        missing = [name for name in properties if name not in lookup.keys]
+        if filter and missing:
+            view.update_view_data(missing)
+        return view
 
-        # Retrieve properties from server and update entity
-        #obj_contents = self.propertyCollector.RetrieveProperties(specSet=pfs)
-        obj_contents = self.sc.propertyCollector.RetrieveProperties(specSet=pfs)
+    def _find_indexed(self, view_type, begin_entity, lookup, at_root,
+                      properties):
+        """Find an entity matching a filter using the client's entity
+        index or the SearchIndex.
 
-        # TODO: Implement filtering
-        if not filter:
-            logger.warning('No filter specified, returning first match.')
-            # If no filter is specified we just return the first item
-            # in the list of returned objects
-            logger.debug("Creating class in find_entity_view (filter)")
-            view = kls(obj_contents[0].obj, self)
-            logger.debug("Completed creating class in find_entity_view (filter)")
-            #view.update_view_data(properties)
-            return view
+        :returns: The matching view, or None if neither could find it.
 
-        matched = False
-        # Iterate through obj_contents retrieved
-        for obj_content in obj_contents:
-            # If there are is no propSet, skip this one
-            if not obj_content.propSet:
-                continue
+        """
+        if self.entity_index is not None and at_root:
+            view = self._find_in_entity_index(view_type, lookup, properties)
+            if view is not None:
+                return view
 
-            matches = 0
-            # Iterate through each property in the set
-            for prop in obj_content.propSet:
-                for key in filter.keys():
-                    # If the property name is in the defined filter
-                    if prop.name == key:
-                        # ...and it matches the value specified
-                        # TODO: Regex this?
-                        if prop.val == filter[prop.name]:
-                            # We've found a match
-                            matches += 1
-                        else:
-                            break
-                    else:
-                        continue
-            if matches == len(filter):
-                filtered_obj_content = obj_content
-                matched = True
-                break
-            else:
+        kls = classmapper(view_type)
+        for method, kwargs in lookup.index_lookups(view_type, at_root):
+            if method == "FindChild":
+                kwargs["entity"] = begin_entity
+            logger.debug("Looking up %s with SearchIndex.%s(%s)", view_type,
+                         method, kwargs)
+            try:
+                found = getattr(self.sc.searchIndex, method)(**kwargs)
+            except suds.WebFault, e:
+                # e.g. instanceUuid isn't supported before vSphere 4.0
+                logger.debug("SearchIndex.%s failed: %s", method, e)
+                continue
+            if not isinstance(found, kls):
                 continue
 
-        if matched is not True:
-            # There were no matches
-            raise ObjectNotFoundError("No matching objects for filter")
+            # The entity found is only a candidate, it must match the
+            # whole filter
+            view = self._match_candidates([found._mo_ref], lookup, properties)
+            if view is not None:
+                return view
+
+        return None
+
+    def _find_in_entity_index(self, view_type, lookup, properties):
+        """Find an entity matching a filter using the client's entity
+        index.
+
+        The index is refreshed and consulted again if none of the entities
+        it has for the value match. It then has every entity of the type,
+        so if none match there is no match.
+
+        :returns: The matching view, or None if the filter has no value \
+        which is indexed.
+
+        """
+        index = self.entity_index
+        names = [name for name in sorted(lookup.exact)
+                 if index.indexes(view_type, name) and
+                 isinstance(lookup.exact[name], basestring)]
+        if not names:
+            return None
+
+        name = names[0]
+        refreshed = False
+        while True:
+            mo_refs = index.lookup(view_type, name, lookup.exact[name])
+            if mo_refs:
+                view = self._match_candidates(mo_refs, lookup, properties)
+                if view is not None:
+                    return view
+            if refreshed is True:
+                raise ObjectNotFoundError("No matching objects for filter")
+            index.refresh()
+            refreshed = True
+
+    def _match_candidates(self, mo_refs, lookup, properties):
+        """Get the first of some entities which matches a filter, with
+        the requested properties retrieved.
+
+        :returns: The matching view, or None if none match.
+
+        """
+        pfs = self.get_views_filter_spec(
+            mo_refs, list(set(lookup.keys) | set(properties)))
+        try:
+            obj_contents = self._retrieve("RetrieveProperties", specSet=pfs)
+        except suds.WebFault, e:
+            # A candidate has been deleted since it was found
+            logger.debug("Couldn't retrieve candidates: %s", e)
+            return None
+
+        for obj_content in obj_contents or []:
+            if lookup.match(obj_content):
+                obj_content.obj._set_view_data(object_content=obj_content)
+                return obj_content.obj
+
+        return None
+
+def get_wsdl_cache():
+    """Get the persistent cache for the WSDL bundled with psphere.
+
+    :rtype: psphere.soap.WsdlCache
+
+    """
+    location = os.path.expanduser(_config_value("general", "wsdl_cache_dir",
+                                                "~/.psphere/cache/"))
+    wsdl_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "wsdl")
+    key = "%s-%s" % (__version__, soap.wsdl_digest(wsdl_dir))
+    return soap.WsdlCache(location, key)
+
+
+class TaskWaiter(object):
+    """Tracks the progress of Task's through a single PropertyCollector.
+
+    Tasks can be added at any time, each call to wait() blocks until at
+    least one of them changes state or progress.
+
+    :param client: The client used to talk to the server.
+    :type client: Client
+    :param progress_callback: Called with the task, its state and its \
+    progress whenever either changes.
+    :type progress_callback: callable or None
+
+    """
+    def __init__(self, client, progress_callback=None):
+        self._client = client
+        self.progress_callback = progress_callback
+        self.tasks = []
+        self.pending = {}
+        self.states = {}
+        self.progress = {}
+        self.version = ""
+        # Use a dedicated collector so the long poll only sees our filters
+        pc = client.sc.propertyCollector
+        self._collector = pc.CreatePropertyCollector()
+        self._options = client.create('WaitOptions')
+        self._options.maxWaitSeconds = client._max_wait_seconds()
+
+    def add(self, tasks):
+        """Start tracking a number of tasks with one PropertyFilter."""
+        property_spec = self._client.create('PropertySpec')
+        property_spec.type = 'Task'
+        property_spec.all = False
+        property_spec.pathSet = ['info.state', 'info.progress']
+
+        object_specs = []
+        for task in tasks:
+            object_spec = self._client.create('ObjectSpec')
+            object_spec.obj = task._mo_ref
+            object_specs.append(object_spec)
+            self.pending[str(task._mo_ref.value)] = task
+            self.tasks.append(task)
+
+        pfs = self._client.create('PropertyFilterSpec')
+        pfs.propSet = [property_spec]
+        pfs.objectSet = object_specs
+        self._collector.CreateFilter(spec=pfs, partialUpdates=False)
+
+    def wait(self):
+        """Wait for changes to the tracked tasks.
+
+        The server is only asked to wait for as long as the client's
+        timeout allows, so this may return without any changes.
+
+        :returns: The tasks which completed.
+        :rtype: list of Task's
+
+        """
+        completed = []
+        update_set = self._collector.WaitForUpdatesEx(version=self.version,
+                                                      options=self._options)
+        if update_set is None:
+            return completed
+
+        self.version = update_set.version
+        for filter_update in getattr(update_set, "filterSet", []):
+            for object_update in getattr(filter_update, "objectSet", []):
+                key = str(object_update.obj._mo_ref.value)
+                if key not in self.pending:
+                    continue
+
+                for change in getattr(object_update, "changeSet", []):
+                    value = getattr(change, "val", None)
+                    if change.name == 'info.state':
+                        self.states[key] = value
+                    elif change.name == 'info.progress':
+                        self.progress[key] = value
+
+                logger.debug("Task %s is %s (%s%%)", key,
+                             self.states.get(key), self.progress.get(key))
+                task = self.pending[key]
+                if self.progress_callback is not None:
+                    self.progress_callback(task, self.states.get(key),
+                                           self.progress.get(key))
+
+                if self.states.get(key) in ['success', 'error']:
+                    del self.pending[key]
+                    completed.append(task)
+
+        return completed
+
+    def destroy(self):
+        """Destroy the collector, which also destroys its filters."""
+        if self._collector is not None:
+            self._collector.DestroyPropertyCollector()
+            self._collector = None
+
+    def retrieve_info(self):
+        """Retrieve the full info of every tracked task in a single call.
+
+        This includes the result or error of each completed task. A task
+        which no longer exists, such as one already purged, fails the call
+        for all of them, so then each task is retrieved alone.
+
+        :returns: The tasks whose info couldn't be retrieved.
+        :rtype: list of Task's
+
+        """
+        if not self.tasks:
+            return []
+
+        try:
+            views = self._client.get_views(
+                [task._mo_ref for task in self.tasks], properties=['info'])
+        except suds.WebFault, e:
+            logger.debug("Couldn't retrieve the info of all tasks: %s", e)
+            views = []
+            for task in self.tasks:
+                try:
+                    views.extend(self._client.get_views([task._mo_ref],
+                                                        properties=['info']))
+                except suds.WebFault, e:
+                    logger.warning("Couldn't retrieve the info of %s: %s",
+                                   task._mo_ref.value, e)
+        infos = dict((str(view._mo_ref.value), view.info) for view in views)
+        missing = []
+        for task in self.tasks:
+            info = infos.get(str(task._mo_ref.value))
+            if info is None:
+                missing.append(task)
+            else:
+                task._set_property('info', info)
+        return missing
 
-        logger.debug("Creating class in find_entity_view")
-        view = kls(filtered_obj_content.obj._mo_ref, self)
-        logger.debug("Completed creating class in find_entity_view")
-        #view.update_view_data(properties=properties)
-        return view
 
 class ExtraConfigPlugin(MessagePlugin):
     def addAttributeForValue(self, node):
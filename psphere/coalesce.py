@@ -0,0 +1,228 @@
+"""
+:mod:`psphere.coalesce` - Sharing property retrievals between threads
+=====================================================================
+
+.. module:: coalesce
+
+Threads sharing a client also share its views, so many threads may find
+the same property of the same view missing at once, such as the summary
+of the host all their VMs run on. A RequestCoalescer makes one
+RetrieveProperties call for them and has the others wait for its result.
+
+"""
+
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight(object):
+    """The retrieval of the properties of one managed object."""
+    __slots__ = ["done", "object_content", "exc_info"]
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.object_content = None
+        self.exc_info = None
+
+
+class RequestCoalescer(object):
+    """Retrieves properties, sharing calls between threads.
+
+    A request for properties of a managed object which are already being
+    retrieved, by another thread, waits for that call rather than making
+    its own.
+
+    With a window, the first thread to make a request waits that many
+    seconds for other threads to make theirs, then retrieves them all in
+    one call. The properties retrieved for each type of managed object
+    are those requested for any object of the type. If the call fails,
+    each thread's request is retried alone so that only the requests
+    which caused the failure fail.
+
+    :param client: The client to retrieve properties through.
+    :type client: Client
+    :param window: The number of seconds to wait for more requests.
+    :type window: float
+
+    """
+    def __init__(self, client, window=0):
+        self._client = client
+        self.window = window
+        self._lock = threading.Lock()
+        # Retrievals waiting to be sent or in flight, by (type, value,
+        # properties)
+        self._flights = {}
+        self._batch = None
+        self.requests = 0
+        self.coalesced = 0
+        self.calls = 0
+
+    def retrieve(self, mo_refs, properties):
+        """Retrieve properties of managed objects.
+
+        :param mo_refs: The managed objects to retrieve properties of.
+        :type mo_refs: list of ManagedObjectReference's
+        :param properties: The properties to retrieve.
+        :type properties: list or the string "all"
+        :returns: An ObjectContent for each managed object the server \
+        returned.
+        :rtype: list
+
+        """
+        if properties != "all":
+            properties = tuple(sorted(set(properties or [])))
+        caller = object()
+        flights = []
+        keys = set()
+        leader = False
+        self._lock.acquire()
+        try:
+            for mo_ref in mo_refs:
+                key = (str(mo_ref._type), str(mo_ref.value), properties)
+                # An object listed twice is retrieved, and returned, once
+                if key in keys:
+                    continue
+                keys.add(key)
+                self.requests += 1
+                flight = self._flights.get(key)
+                if flight is not None:
+                    self.coalesced += 1
+                else:
+                    flight = self._flights[key] = _Flight()
+                    if self._batch is None:
+                        self._batch = []
+                        leader = True
+                    self._batch.append((caller, mo_ref, properties, key,
+                                        flight))
+                flights.append(flight)
+        finally:
+            self._lock.release()
+
+        if leader is True:
+            batch = None
+            try:
+                if self.window:
+                    time.sleep(self.window)
+                batch = self._take_batch()
+                self._send(batch)
+            except BaseException:
+                # Even a KeyboardInterrupt mustn't leave the other threads
+                # in the batch waiting forever
+                exc_info = sys.exc_info()
+                if batch is None:
+                    batch = self._take_batch()
+                self._land([request for request in batch
+                            if not request[4].done.is_set()],
+                           exc_info=exc_info)
+                raise exc_info[0], exc_info[1], exc_info[2]
+
+        object_contents = []
+        for flight in flights:
+            flight.done.wait()
+            if flight.exc_info is not None:
+                raise flight.exc_info[0], flight.exc_info[1], \
+                    flight.exc_info[2]
+            if flight.object_content is not None:
+                object_contents.append(flight.object_content)
+        return object_contents
+
+    def _take_batch(self):
+        """Take the requests gathered for the leader to send."""
+        self._lock.acquire()
+        try:
+            batch, self._batch = self._batch, None
+        finally:
+            self._lock.release()
+        return batch
+
+    def _send(self, batch):
+        """Retrieve the properties of a batch of requests in one call."""
+        client = self._client
+        paths = {}
+        mo_refs = {}
+        for caller, mo_ref, properties, key, flight in batch:
+            type_ = key[0]
+            mo_refs[key[:2]] = mo_ref
+            if properties == "all" or paths.get(type_) == "all":
+                paths[type_] = "all"
+            else:
+                paths.setdefault(type_, set()).update(properties)
+
+        pfs = client._objects_filter_spec(
+            mo_refs.values(),
+            [(type_, pathset if pathset == "all" else sorted(pathset))
+             for type_, pathset in sorted(paths.items())])
+
+        logger.debug("Retrieving %s objects for %s requests", len(mo_refs),
+                     len(batch))
+        self.calls += 1
+        try:
+            results = list(client._retrieve("RetrieveProperties",
+                                            specSet=pfs) or [])
+        except Exception:
+            exc_info = sys.exc_info()
+            callers = []
+            for request in batch:
+                if request[0] not in callers:
+                    callers.append(request[0])
+            if len(callers) == 1:
+                self._land(batch, exc_info=exc_info)
+                return
+            # Don't fail everyone's requests because of one caller's
+            for caller in callers:
+                self._send([request for request in batch
+                            if request[0] is caller])
+            return
+
+        object_contents = {}
+        for object_content in results:
+            mo_ref = object_content.obj._mo_ref
+            object_contents[(str(mo_ref._type),
+                             str(mo_ref.value))] = object_content
+        self._land(batch, object_contents)
+
+    def _land(self, batch, object_contents=None, exc_info=None):
+        """Give the requests in a batch their results."""
+        self._lock.acquire()
+        try:
+            for caller, mo_ref, properties, key, flight in batch:
+                self._flights.pop(key, None)
+        finally:
+            self._lock.release()
+
+        for caller, mo_ref, properties, key, flight in batch:
+            if exc_info is not None:
+                flight.exc_info = exc_info
+            else:
+                flight.object_content = object_contents.get(key[:2])
+            flight.done.set()
+
+    def report(self):
+        """Summarise how many requests shared calls.
+
+        :returns: The number of requests for the properties of a managed \
+        object, those which waited for another's call and the calls made.
+        :rtype: dict
+
+        """
+        return {"requests": self.requests, "coalesced": self.coalesced,
+                "calls": self.calls}
@@ -1,23 +1,35 @@
 import os
-import yaml
 import logging
 
 logger = logging.getLogger(__name__)
 config_path = os.path.expanduser('~/.psphere/config.yaml')
-try:
-    config_file = open(config_path, "r")
-    PSPHERE_CONFIG = yaml.load(config_file)
-    config_file.close()
-except IOError:
-    logger.warning("Configuration file %s could not be opened, perhaps you"
-                   " haven't created one?" % config_path)
-    PSPHERE_CONFIG = {"general": {}, "logging": {}}
-    pass
+# The configuration file is only read, and yaml only imported, when the
+# first value is requested so that importing psphere stays cheap
+PSPHERE_CONFIG = None
+
+
+def _load_config():
+    global PSPHERE_CONFIG
+    if PSPHERE_CONFIG is not None:
+        return PSPHERE_CONFIG
+
+    import yaml
+    try:
+        config_file = open(config_path, "r")
+        PSPHERE_CONFIG = yaml.load(config_file) or {}
+        config_file.close()
+    except IOError:
+        logger.warning("Configuration file %s could not be opened, perhaps you"
+                       " haven't created one?" % config_path)
+        PSPHERE_CONFIG = {"general": {}, "logging": {}}
+        pass
+
+    return PSPHERE_CONFIG
 
 
 def _config_value(section, name, default=None):
     file_value = None
-    if name in PSPHERE_CONFIG[section]:
+    if name in _load_config().get(section, {}):
         file_value = PSPHERE_CONFIG[section][name]
 
     if file_value:
@@ -0,0 +1,221 @@
+"""
+:mod:`psphere.index` - A local index of entities by name and UUID
+=================================================================
+
+.. module:: index
+
+Finding a VirtualMachine by name means searching the inventory, so a
+script which looks up many VMs one at a time searches it many times.
+An EntityIndex retrieves the names and UUIDs of every entity once and
+answers later lookups locally.
+
+"""
+
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import cPickle
+import hashlib
+import logging
+import os
+
+import suds
+
+from psphere.mirror import InventoryMirror
+from psphere.soap import ManagedObjectReference, _pickle_atomically
+
+logger = logging.getLogger(__name__)
+
+# The properties indexed by default, by the type of entity
+DEFAULT_PROPERTIES = {
+    "VirtualMachine": ["name", "config.uuid"],
+    "HostSystem": ["name", "hardware.systemInfo.uuid"],
+}
+
+
+class EntityIndex(object):
+    """Finds entities by the values of a few properties without a search.
+
+    >>> client = Client(entity_index=True)
+    >>> for node in nodes:
+    ...     vm = VirtualMachine.get(client, name=node)
+
+    The first lookup retrieves the indexed properties of every entity of
+    the indexed types in one request. find_entity_view then looks up
+    entities in the index and only retrieves the properties of the
+    entities found, which also confirms the index was right. When it
+    wasn't, or the value isn't in the index, the changes made on the server
+    since are applied to the index with WaitForUpdatesEx, which transfers
+    only what has changed, and the index is consulted again.
+
+    With persist, the index is saved in wsdl_cache_dir from the config file
+    and loaded by the next client of the same vCenter, identified by its
+    instance UUID, so that a new process doesn't retrieve it again. ESX
+    servers don't have an instance UUID and their index isn't saved.
+
+    :param client: The client the index retrieves entities through.
+    :type client: Client
+    :param properties: The properties to index, keyed by the type of \
+    entity they are indexed for. The default is the name and UUID of \
+    VirtualMachine's and HostSystem's.
+    :type properties: dict
+    :param persist: Whether to save the index for later clients.
+    :type persist: bool
+    :param location: The directory the index is saved in.
+    :type location: str or None
+
+    """
+    def __init__(self, client, properties=None, persist=False, location=None):
+        if properties is None:
+            properties = DEFAULT_PROPERTIES
+        self._client = client
+        self.properties = properties
+        self.persist = persist
+        self.location = location
+        # The MOR values of the entities with each value of each property,
+        # keyed by (view_type, property)
+        self.entries = None
+        self._mirror = None
+
+    def clone(self, client):
+        """Create an index for another client of the same server, which
+        starts with the entries of this one."""
+        index = self.__class__(client, self.properties, self.persist,
+                               self.location)
+        index.entries = self.entries
+        return index
+
+    def indexes(self, view_type, name):
+        """Whether a property of a type of entity is indexed.
+
+        :rtype: bool
+
+        """
+        return name in self.properties.get(view_type, [])
+
+    def lookup(self, view_type, name, value):
+        """Get the MORs of the entities with a value of a property.
+
+        The server is only contacted when the index is first used and can't
+        be loaded.
+
+        :param view_type: The type of entity to look up.
+        :type view_type: str
+        :param name: The indexed property to look up.
+        :type name: str
+        :param value: The value of the property.
+        :returns: The MORs of the entities which had the value when the \
+        index was last refreshed.
+        :rtype: list of ManagedObjectReference's
+
+        """
+        if self.entries is None and not self.load():
+            self.refresh()
+        values = self.entries.get((view_type, name), {})
+        return [ManagedObjectReference(view_type, mo_value)
+                for mo_value in values.get(value, [])]
+
+    def refresh(self):
+        """Bring the index up to date with the server.
+
+        The first refresh retrieves every indexed entity, later refreshes
+        only the changes made since the last one.
+
+        """
+        if self._mirror is None:
+            self._mirror = InventoryMirror(self._client, self.properties)
+        try:
+            self._mirror.update()
+        except suds.WebFault, e:
+            # The collector is gone with the session it was created in
+            logger.debug("Rebuilding the entity index after: %s", e)
+            self._mirror = InventoryMirror(self._client, self.properties)
+            self._mirror.update()
+
+        entries = {}
+        for (view_type, mo_value), view in self._mirror.objects.items():
+            for name in self.properties.get(view_type, []):
+                try:
+                    value = view._get_cached(name)[0]
+                except KeyError:
+                    continue
+                values = entries.setdefault((view_type, name), {})
+                values.setdefault(unicode(value), []).append(mo_value)
+        self.entries = entries
+        logger.debug("Indexed %s entities", len(self._mirror.objects))
+
+        if self.persist is True:
+            self.save()
+
+    def stop(self):
+        """Destroy the server-side collector which reports changes.
+
+        The entries are kept, the next refresh retrieves every entity.
+
+        """
+        if self._mirror is not None:
+            self._mirror.destroy()
+            self._mirror = None
+
+    def _path(self):
+        """Get the file the index is saved in, or None if the server has
+        no instance UUID."""
+        instance_uuid = getattr(self._client.sc.about, "instanceUuid", None)
+        if not instance_uuid or self.location is None:
+            return None
+        digest = hashlib.sha1("%s-%r" % (instance_uuid,
+                                         sorted(self.properties.items())))
+        return os.path.join(self.location, "index-%s.px" % digest.hexdigest())
+
+    def load(self):
+        """Load the index saved by an earlier client.
+
+        :returns: Whether the index was loaded.
+        :rtype: bool
+
+        """
+        if self.persist is not True:
+            return False
+        path = self._path()
+        if path is None:
+            return False
+
+        try:
+            f = open(path, "rb")
+        except IOError:
+            logger.debug("No saved entity index in %s", path)
+            return False
+
+        try:
+            self.entries = cPickle.load(f)
+        except Exception, e:
+            logger.warning("Ignoring unreadable entity index %s: %s", path, e)
+            return False
+        finally:
+            f.close()
+
+        logger.debug("Loaded entity index from %s", path)
+        return True
+
+    def save(self):
+        """Save the index for later clients of the same vCenter."""
+        path = self._path()
+        if path is None or self.entries is None:
+            return
+
+        try:
+            _pickle_atomically(self.entries, path)
+        except Exception, e:
+            logger.warning("Couldn't save entity index %s: %s", path, e)
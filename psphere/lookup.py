@@ -0,0 +1,153 @@
+"""
+:mod:`psphere.lookup` - Matching entities against a filter
+==========================================================
+
+.. module:: lookup
+
+find_entity_view looks for one entity matching a filter. A filter maps
+property paths to what they should match, which is one of:
+
+- a value, which the property must equal
+- a compiled regular expression, which must be found in the property
+- a callable, which must return True when given the property
+
+>>> import re
+>>> VirtualMachine.get(client, name=re.compile("^web"),
+...                    **{"runtime.powerState": "poweredOn"})
+
+Some exact values can be looked up by the server's SearchIndex, such as
+the UUID of a VirtualMachine, so that not every entity of the type needs
+to be retrieved. Other filters are matched against the entities a page at
+a time until one matches.
+
+"""
+
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_pattern_type = type(re.compile(""))
+
+# The exact property values the SearchIndex can find an entity by, for each
+# type of entity. Each maps to the SearchIndex method, the argument the
+# value is passed as and the other arguments of the method.
+SEARCH_INDEX_KEYS = {
+    "VirtualMachine": {
+        "config.uuid": ("FindByUuid", "uuid", {"vmSearch": True}),
+        "summary.config.uuid": ("FindByUuid", "uuid", {"vmSearch": True}),
+        "config.instanceUuid": ("FindByUuid", "uuid",
+                                {"vmSearch": True, "instanceUuid": True}),
+        "guest.ipAddress": ("FindByIp", "ip", {"vmSearch": True}),
+        "guest.hostName": ("FindByDnsName", "dnsName", {"vmSearch": True}),
+    },
+    "HostSystem": {
+        "hardware.systemInfo.uuid": ("FindByUuid", "uuid",
+                                     {"vmSearch": False}),
+        "summary.hardware.uuid": ("FindByUuid", "uuid", {"vmSearch": False}),
+        "name": ("FindByDnsName", "dnsName", {"vmSearch": False}),
+    },
+}
+
+
+class Lookup(object):
+    """A filter compiled for matching many entities.
+
+    The exact values of the filter are compared as one tuple, so each entity
+    costs a single comparison unless it matches them all. Regular
+    expressions and callables are only tried on entities which do.
+
+    :param filter: Property paths and what they should match.
+    :type filter: dict
+
+    """
+    def __init__(self, filter):
+        self.filter = filter
+        self.keys = sorted(filter.keys())
+        self.exact = {}
+        self.tests = []
+        for key in self.keys:
+            value = filter[key]
+            if isinstance(value, _pattern_type):
+                self.tests.append((key, self._search(value)))
+            elif callable(value):
+                self.tests.append((key, value))
+            else:
+                self.exact[key] = value
+        self._exact_keys = sorted(self.exact.keys())
+        self._exact_values = tuple(self.exact[key]
+                                   for key in self._exact_keys)
+
+    @staticmethod
+    def _search(pattern):
+        def test(value):
+            if value is None:
+                return False
+            return pattern.search(value) is not None
+        return test
+
+    def index_lookups(self, view_type, at_root):
+        """Get the SearchIndex calls which may find the entity.
+
+        FindChild is used for the name when the search starts below the
+        root folder, as the entity may be a child of where it starts. Other
+        lookups search the whole inventory so are only used from the root.
+
+        :param view_type: The type of entity being looked for.
+        :type view_type: str
+        :param at_root: Whether the search starts at the root folder.
+        :type at_root: bool
+        :returns: (method, arguments) for each lookup, the arguments of \
+        FindChild lack the entity to search.
+        :rtype: list
+
+        """
+        lookups = []
+        keys = SEARCH_INDEX_KEYS.get(view_type, {})
+        for key in self._exact_keys:
+            value = self.exact[key]
+            if not isinstance(value, basestring):
+                continue
+            if key == "name" and not at_root:
+                lookups.append(("FindChild", {"name": value}))
+            elif at_root and key in keys:
+                method, argument, kwargs = keys[key]
+                kwargs = dict(kwargs)
+                kwargs[argument] = value
+                lookups.append((method, kwargs))
+        return lookups
+
+    def match(self, object_content):
+        """Whether the properties in an ObjectContent match the filter.
+
+        A property the server didn't return is unset and matched as None.
+
+        :rtype: bool
+
+        """
+        values = {}
+        for dynprop in getattr(object_content, "propSet", None) or []:
+            values[dynprop.name] = dynprop.val
+
+        if self._exact_values != tuple(values.get(key)
+                                       for key in self._exact_keys):
+            return False
+        for key, test in self.tests:
+            if not test(values.get(key)):
+                return False
+        return True
@@ -1,10 +1,8 @@
 from psphere import ManagedObject, cached_property
 
 class ExtensibleManagedObject(ManagedObject):
-    _valid_attrs = set(['availableField', 'value'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['availableField', 'value'])
     @cached_property
     def availableField(self):
        return self._get_dataobject("availableField", True)
@@ -14,20 +12,16 @@ class ExtensibleManagedObject(ManagedObject):
 
 
 class Alarm(ExtensibleManagedObject):
-    _valid_attrs = set(['info'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['info'])
     @cached_property
     def info(self):
        return self._get_dataobject("info", False)
 
 
 class AlarmManager(ManagedObject):
-    _valid_attrs = set(['defaultExpression', 'description'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['defaultExpression', 'description'])
     @cached_property
     def defaultExpression(self):
        return self._get_dataobject("defaultExpression", True)
@@ -37,10 +31,8 @@ class AlarmManager(ManagedObject):
 
 
 class AuthorizationManager(ManagedObject):
-    _valid_attrs = set(['description', 'privilegeList', 'roleList'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['description', 'privilegeList', 'roleList'])
     @cached_property
     def description(self):
        return self._get_dataobject("description", False)
@@ -53,10 +45,8 @@ class AuthorizationManager(ManagedObject):
 
 
 class ManagedEntity(ExtensibleManagedObject):
-    _valid_attrs = set(['alarmActionsEnabled', 'configIssue', 'configStatus', 'customValue', 'declaredAlarmState', 'disabledMethod', 'effectiveRole', 'name', 'overallStatus', 'parent', 'permission', 'recentTask', 'tag', 'triggeredAlarmState'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['alarmActionsEnabled', 'configIssue', 'configStatus', 'customValue', 'declaredAlarmState', 'disabledMethod', 'effectiveRole', 'name', 'overallStatus', 'parent', 'permission', 'recentTask', 'tag', 'triggeredAlarmState'])
     @cached_property
     def alarmActionsEnabled(self):
        return self._get_dataobject("alarmActionsEnabled", False)
@@ -147,10 +137,8 @@ class ManagedEntity(ExtensibleManagedObject):
 
 
 class ComputeResource(ManagedEntity):
-    _valid_attrs = set(['configurationEx', 'datastore', 'environmentBrowser', 'host', 'network', 'resourcePool', 'summary'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['configurationEx', 'datastore', 'environmentBrowser', 'host', 'network', 'resourcePool', 'summary'])
     @cached_property
     def configurationEx(self):
        return self._get_dataobject("configurationEx", False)
@@ -175,10 +163,8 @@ class ComputeResource(ManagedEntity):
 
 
 class ClusterComputeResource(ComputeResource):
-    _valid_attrs = set(['actionHistory', 'configuration', 'drsFault', 'drsRecommendation', 'migrationHistory', 'recommendation'])
-    def __init__(self, mo_ref, client):
-        ComputeResource.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ComputeResource._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ComputeResource._valid_attrs | frozenset(['actionHistory', 'configuration', 'drsFault', 'drsRecommendation', 'migrationHistory', 'recommendation'])
     @cached_property
     def actionHistory(self):
        return self._get_dataobject("actionHistory", True)
@@ -200,10 +186,8 @@ class ClusterComputeResource(ComputeResource):
 
 
 class Profile(ManagedObject):
-    _valid_attrs = set(['complianceStatus', 'config', 'createdTime', 'description', 'entity', 'modifiedTime', 'name'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['complianceStatus', 'config', 'createdTime', 'description', 'entity', 'modifiedTime', 'name'])
     @cached_property
     def complianceStatus(self):
        return self._get_dataobject("complianceStatus", False)
@@ -228,51 +212,39 @@ class Profile(ManagedObject):
 
 
 class ClusterProfile(Profile):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        Profile.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, Profile._valid_attrs)
+    __slots__ = []
+    _valid_attrs = Profile._valid_attrs | frozenset([])
 
 
 class ProfileManager(ManagedObject):
-    _valid_attrs = set(['profile'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['profile'])
     @cached_property
     def profile(self):
        return self._get_mor("profile", True)
 
 
 class ClusterProfileManager(ProfileManager):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ProfileManager.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ProfileManager._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ProfileManager._valid_attrs | frozenset([])
 
 
 class View(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class ManagedObjectView(View):
-    _valid_attrs = set(['view'])
-    def __init__(self, mo_ref, client):
-        View.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, View._valid_attrs)
+    __slots__ = []
+    _valid_attrs = View._valid_attrs | frozenset(['view'])
     @cached_property
     def view(self):
        return self._get_mor("view", True)
 
 
 class ContainerView(ManagedObjectView):
-    _valid_attrs = set(['container', 'recursive', 'type'])
-    def __init__(self, mo_ref, client):
-        ManagedObjectView.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObjectView._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObjectView._valid_attrs | frozenset(['container', 'recursive', 'type'])
     @cached_property
     def container(self):
        return self._get_mor("container", False)
@@ -285,20 +257,16 @@ class ContainerView(ManagedObjectView):
 
 
 class CustomFieldsManager(ManagedObject):
-    _valid_attrs = set(['field'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['field'])
     @cached_property
     def field(self):
        return self._get_dataobject("field", True)
 
 
 class CustomizationSpecManager(ManagedObject):
-    _valid_attrs = set(['encryptionKey', 'info'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['encryptionKey', 'info'])
     @cached_property
     def encryptionKey(self):
        return self._get_dataobject("encryptionKey", True)
@@ -308,10 +276,8 @@ class CustomizationSpecManager(ManagedObject):
 
 
 class Datacenter(ManagedEntity):
-    _valid_attrs = set(['datastore', 'datastoreFolder', 'hostFolder', 'network', 'networkFolder', 'vmFolder'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['datastore', 'datastoreFolder', 'hostFolder', 'network', 'networkFolder', 'vmFolder'])
     @cached_property
     def datastore(self):
        return self._get_mor("datastore", True)
@@ -333,10 +299,8 @@ class Datacenter(ManagedEntity):
 
 
 class Datastore(ManagedEntity):
-    _valid_attrs = set(['browser', 'capability', 'host', 'info', 'iormConfiguration', 'summary', 'vm'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['browser', 'capability', 'host', 'info', 'iormConfiguration', 'summary', 'vm'])
     @cached_property
     def browser(self):
        return self._get_mor("browser", False)
@@ -361,17 +325,13 @@ class Datastore(ManagedEntity):
 
 
 class DiagnosticManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class Network(ManagedEntity):
-    _valid_attrs = set(['host', 'name', 'summary', 'vm'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['host', 'name', 'summary', 'vm'])
     @cached_property
     def host(self):
        return self._get_mor("host", True)
@@ -387,10 +347,8 @@ class Network(ManagedEntity):
 
 
 class DistributedVirtualPortgroup(Network):
-    _valid_attrs = set(['config', 'key', 'portKeys'])
-    def __init__(self, mo_ref, client):
-        Network.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, Network._valid_attrs)
+    __slots__ = []
+    _valid_attrs = Network._valid_attrs | frozenset(['config', 'key', 'portKeys'])
     @cached_property
     def config(self):
        return self._get_dataobject("config", False)
@@ -403,10 +361,8 @@ class DistributedVirtualPortgroup(Network):
 
 
 class DistributedVirtualSwitch(ManagedEntity):
-    _valid_attrs = set(['capability', 'config', 'networkResourcePool', 'portgroup', 'summary', 'uuid'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['capability', 'config', 'networkResourcePool', 'portgroup', 'summary', 'uuid'])
     @cached_property
     def capability(self):
        return self._get_dataobject("capability", False)
@@ -428,47 +384,37 @@ class DistributedVirtualSwitch(ManagedEntity):
 
 
 class DistributedVirtualSwitchManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class EnvironmentBrowser(ManagedObject):
-    _valid_attrs = set(['datastoreBrowser'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['datastoreBrowser'])
     @cached_property
     def datastoreBrowser(self):
        return self._get_mor("datastoreBrowser", False)
 
 
 class HistoryCollector(ManagedObject):
-    _valid_attrs = set(['filter'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['filter'])
     @cached_property
     def filter(self):
        return self._get_dataobject("filter", False)
 
 
 class EventHistoryCollector(HistoryCollector):
-    _valid_attrs = set(['latestPage'])
-    def __init__(self, mo_ref, client):
-        HistoryCollector.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, HistoryCollector._valid_attrs)
+    __slots__ = []
+    _valid_attrs = HistoryCollector._valid_attrs | frozenset(['latestPage'])
     @cached_property
     def latestPage(self):
        return self._get_dataobject("latestPage", True)
 
 
 class EventManager(ManagedObject):
-    _valid_attrs = set(['description', 'latestEvent', 'maxCollector'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['description', 'latestEvent', 'maxCollector'])
     @cached_property
     def description(self):
        return self._get_dataobject("description", False)
@@ -481,27 +427,21 @@ class EventManager(ManagedObject):
 
 
 class ExtensionManager(ManagedObject):
-    _valid_attrs = set(['extensionList'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['extensionList'])
     @cached_property
     def extensionList(self):
        return self._get_dataobject("extensionList", True)
 
 
 class FileManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class Folder(ManagedEntity):
-    _valid_attrs = set(['childEntity', 'childType'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['childEntity', 'childType'])
     @cached_property
     def childEntity(self):
        return self._get_mor("childEntity", True)
@@ -511,24 +451,18 @@ class Folder(ManagedEntity):
 
 
 class GuestAuthManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class GuestFileManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class GuestOperationsManager(ManagedObject):
-    _valid_attrs = set(['authManager', 'fileManager', 'processManager'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['authManager', 'fileManager', 'processManager'])
     @cached_property
     def authManager(self):
        return self._get_mor("authManager", False)
@@ -541,40 +475,30 @@ class GuestOperationsManager(ManagedObject):
 
 
 class GuestProcessManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 class HostAuthenticationStore(ManagedObject):
-    _valid_attrs = set(['info'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['info'])
     @cached_property
     def info(self):
        return self._get_dataobject("info", False)
 
 
 class HostDirectoryStore(HostAuthenticationStore):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        HostAuthenticationStore.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, HostAuthenticationStore._valid_attrs)
+    __slots__ = []
+    _valid_attrs = HostAuthenticationStore._valid_attrs | frozenset([])
 
 
 class HostActiveDirectoryAuthentication(HostDirectoryStore):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        HostDirectoryStore.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, HostDirectoryStore._valid_attrs)
+    __slots__ = []
+    _valid_attrs = HostDirectoryStore._valid_attrs | frozenset([])
 
 
 class HostAuthenticationManager(ManagedObject):
-    _valid_attrs = set(['info', 'supportedStore'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['info', 'supportedStore'])
     @cached_property
     def info(self):
        return self._get_dataobject("info", False)
@@ -584,45 +508,35 @@ class HostAuthenticationManager(ManagedObject):
 
 
 class HostAutoStartManager(ManagedObject):
-    _valid_attrs = set(['config'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['config'])
     @cached_property
     def config(self):
        return self._get_dataobject("config", False)
 
 
 class HostBootDeviceSystem(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 class HostCacheConfigurationManager(ManagedObject):
-    _valid_attrs = set(['cacheConfigurationInfo'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['cacheConfigurationInfo'])
     @cached_property
     def cacheConfigurationInfo(self):
        return self._get_dataobject("cacheConfigurationInfo", True)
 
 class HostCpuSchedulerSystem(ExtensibleManagedObject):
-    _valid_attrs = set(['hyperthreadInfo'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['hyperthreadInfo'])
     @cached_property
     def hyperthreadInfo(self):
        return self._get_dataobject("hyperthreadInfo", False)
 
 
 class HostDatastoreBrowser(ManagedObject):
-    _valid_attrs = set(['datastore', 'supportedType'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['datastore', 'supportedType'])
     @cached_property
     def datastore(self):
        return self._get_mor("datastore", True)
@@ -632,10 +546,8 @@ class HostDatastoreBrowser(ManagedObject):
 
 
 class HostDatastoreSystem(ManagedObject):
-    _valid_attrs = set(['capabilities', 'datastore'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['capabilities', 'datastore'])
     @cached_property
     def capabilities(self):
        return self._get_dataobject("capabilities", False)
@@ -645,91 +557,69 @@ class HostDatastoreSystem(ManagedObject):
 
 
 class HostDateTimeSystem(ManagedObject):
-    _valid_attrs = set(['dateTimeInfo'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['dateTimeInfo'])
     @cached_property
     def dateTimeInfo(self):
        return self._get_dataobject("dateTimeInfo", False)
 
 
 class HostDiagnosticSystem(ManagedObject):
-    _valid_attrs = set(['activePartition'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['activePartition'])
     @cached_property
     def activePartition(self):
        return self._get_dataobject("activePartition", False)
 
 class HostEsxAgentHostManager(ManagedObject):
-    _valid_attrs = set(['configInfo'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['configInfo'])
     @cached_property
     def configInfo(self):
        return self._get_dataobject("configInfo", False)
 
 class HostFirewallSystem(ExtensibleManagedObject):
-    _valid_attrs = set(['firewallInfo'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['firewallInfo'])
     @cached_property
     def firewallInfo(self):
        return self._get_dataobject("firewallInfo", False)
 
 
 class HostFirmwareSystem(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class HostHealthStatusSystem(ManagedObject):
-    _valid_attrs = set(['runtime'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['runtime'])
     @cached_property
     def runtime(self):
        return self._get_dataobject("runtime", False)
 
 class HostImageConfigManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 class HostKernelModuleSystem(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class HostLocalAccountManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class HostLocalAuthentication(HostAuthenticationStore):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        HostAuthenticationStore.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, HostAuthenticationStore._valid_attrs)
+    __slots__ = []
+    _valid_attrs = HostAuthenticationStore._valid_attrs | frozenset([])
 
 
 class HostMemorySystem(ExtensibleManagedObject):
-    _valid_attrs = set(['consoleReservationInfo', 'virtualMachineReservationInfo'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['consoleReservationInfo', 'virtualMachineReservationInfo'])
     @cached_property
     def consoleReservationInfo(self):
        return self._get_dataobject("consoleReservationInfo", False)
@@ -739,10 +629,8 @@ class HostMemorySystem(ExtensibleManagedObject):
 
 
 class HostNetworkSystem(ExtensibleManagedObject):
-    _valid_attrs = set(['capabilities', 'consoleIpRouteConfig', 'dnsConfig', 'ipRouteConfig', 'networkConfig', 'networkInfo', 'offloadCapabilities'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['capabilities', 'consoleIpRouteConfig', 'dnsConfig', 'ipRouteConfig', 'networkConfig', 'networkInfo', 'offloadCapabilities'])
     @cached_property
     def capabilities(self):
        return self._get_dataobject("capabilities", False)
@@ -767,27 +655,21 @@ class HostNetworkSystem(ExtensibleManagedObject):
 
 
 class HostPatchManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class HostPciPassthruSystem(ExtensibleManagedObject):
-    _valid_attrs = set(['pciPassthruInfo'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['pciPassthruInfo'])
     @cached_property
     def pciPassthruInfo(self):
        return self._get_dataobject("pciPassthruInfo", True)
 
 
 class HostPowerSystem(ManagedObject):
-    _valid_attrs = set(['capability', 'info'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['capability', 'info'])
     @cached_property
     def capability(self):
        return self._get_dataobject("capability", False)
@@ -797,37 +679,29 @@ class HostPowerSystem(ManagedObject):
 
 
 class HostProfile(Profile):
-    _valid_attrs = set(['referenceHost'])
-    def __init__(self, mo_ref, client):
-        Profile.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, Profile._valid_attrs)
+    __slots__ = []
+    _valid_attrs = Profile._valid_attrs | frozenset(['referenceHost'])
     @cached_property
     def referenceHost(self):
        return self._get_mor("referenceHost", False)
 
 
 class HostProfileManager(ProfileManager):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ProfileManager.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ProfileManager._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ProfileManager._valid_attrs | frozenset([])
 
 
 class HostServiceSystem(ExtensibleManagedObject):
-    _valid_attrs = set(['serviceInfo'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['serviceInfo'])
     @cached_property
     def serviceInfo(self):
        return self._get_dataobject("serviceInfo", False)
 
 
 class HostSnmpSystem(ManagedObject):
-    _valid_attrs = set(['configuration', 'limits'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['configuration', 'limits'])
     @cached_property
     def configuration(self):
        return self._get_dataobject("configuration", False)
@@ -837,10 +711,8 @@ class HostSnmpSystem(ManagedObject):
 
 
 class HostStorageSystem(ExtensibleManagedObject):
-    _valid_attrs = set(['fileSystemVolumeInfo', 'multipathStateInfo', 'storageDeviceInfo', 'systemFile'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['fileSystemVolumeInfo', 'multipathStateInfo', 'storageDeviceInfo', 'systemFile'])
     @cached_property
     def fileSystemVolumeInfo(self):
        return self._get_dataobject("fileSystemVolumeInfo", False)
@@ -856,10 +728,8 @@ class HostStorageSystem(ExtensibleManagedObject):
 
 
 class HostSystem(ManagedEntity):
-    _valid_attrs = set(['capability', 'config', 'configManager', 'datastore', 'datastoreBrowser', 'hardware', 'licensableResource', 'network', 'runtime', 'summary', 'systemResources', 'vm'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['capability', 'config', 'configManager', 'datastore', 'datastoreBrowser', 'hardware', 'licensableResource', 'network', 'runtime', 'summary', 'systemResources', 'vm'])
     @cached_property
     def capability(self):
        return self._get_dataobject("capability", False)
@@ -899,20 +769,16 @@ class HostSystem(ManagedEntity):
 
 
 class HostVirtualNicManager(ExtensibleManagedObject):
-    _valid_attrs = set(['info'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['info'])
     @cached_property
     def info(self):
        return self._get_dataobject("info", False)
 
 
 class HostVMotionSystem(ExtensibleManagedObject):
-    _valid_attrs = set(['ipConfig', 'netConfig'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['ipConfig', 'netConfig'])
     @cached_property
     def ipConfig(self):
        return self._get_dataobject("ipConfig", False)
@@ -922,10 +788,8 @@ class HostVMotionSystem(ExtensibleManagedObject):
 
 
 class HttpNfcLease(ManagedObject):
-    _valid_attrs = set(['error', 'info', 'initializeProgress', 'state'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['error', 'info', 'initializeProgress', 'state'])
     @cached_property
     def error(self):
        return self._get_dataobject("error", False)
@@ -941,36 +805,26 @@ class HttpNfcLease(ManagedObject):
 
 
 class InventoryView(ManagedObjectView):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObjectView.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObjectView._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObjectView._valid_attrs | frozenset([])
 
 
 class IpPoolManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 class IscsiManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 class LicenseAssignmentManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class LicenseManager(ManagedObject):
-    _valid_attrs = set(['diagnostics', 'evaluation', 'featureInfo', 'licenseAssignmentManager', 'licensedEdition', 'licenses', 'source', 'sourceAvailable'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['diagnostics', 'evaluation', 'featureInfo', 'licenseAssignmentManager', 'licensedEdition', 'licenses', 'source', 'sourceAvailable'])
     @cached_property
     def diagnostics(self):
        return self._get_dataobject("diagnostics", False)
@@ -998,27 +852,21 @@ class LicenseManager(ManagedObject):
 
 
 class ListView(ManagedObjectView):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObjectView.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObjectView._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObjectView._valid_attrs | frozenset([])
 
 
 class LocalizationManager(ManagedObject):
-    _valid_attrs = set(['catalog'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['catalog'])
     @cached_property
     def catalog(self):
        return self._get_dataobject("catalog", True)
 
 
 class OptionManager(ManagedObject):
-    _valid_attrs = set(['setting', 'supportedOption'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['setting', 'supportedOption'])
     @cached_property
     def setting(self):
        return self._get_dataobject("setting", True)
@@ -1028,17 +876,13 @@ class OptionManager(ManagedObject):
 
 
 class OvfManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class PerformanceManager(ManagedObject):
-    _valid_attrs = set(['description', 'historicalInterval', 'perfCounter'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['description', 'historicalInterval', 'perfCounter'])
     @cached_property
     def description(self):
        return self._get_dataobject("description", False)
@@ -1051,27 +895,21 @@ class PerformanceManager(ManagedObject):
 
 
 class ProfileComplianceManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class PropertyCollector(ManagedObject):
-    _valid_attrs = set(['filter'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['filter'])
     @cached_property
     def filter(self):
        return self._get_mor("filter", True)
 
 
 class PropertyFilter(ManagedObject):
-    _valid_attrs = set(['partialUpdates', 'spec'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['partialUpdates', 'spec'])
     @cached_property
     def partialUpdates(self):
        return self._get_dataobject("partialUpdates", False)
@@ -1081,17 +919,13 @@ class PropertyFilter(ManagedObject):
 
 
 class ResourcePlanningManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class ResourcePool(ManagedEntity):
-    _valid_attrs = set(['childConfiguration', 'config', 'owner', 'resourcePool', 'runtime', 'summary', 'vm'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['childConfiguration', 'config', 'owner', 'resourcePool', 'runtime', 'summary', 'vm'])
     @cached_property
     def childConfiguration(self):
        return self._get_dataobject("childConfiguration", True)
@@ -1116,20 +950,16 @@ class ResourcePool(ManagedEntity):
 
 
 class ScheduledTask(ExtensibleManagedObject):
-    _valid_attrs = set(['info'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['info'])
     @cached_property
     def info(self):
        return self._get_dataobject("info", False)
 
 
 class ScheduledTaskManager(ManagedObject):
-    _valid_attrs = set(['description', 'scheduledTask'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['description', 'scheduledTask'])
     @cached_property
     def description(self):
        return self._get_dataobject("description", False)
@@ -1139,17 +969,13 @@ class ScheduledTaskManager(ManagedObject):
 
 
 class SearchIndex(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class ServiceInstance(ManagedObject):
-    _valid_attrs = set(['capability', 'content', 'serverClock'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['capability', 'content', 'serverClock'])
     @cached_property
     def capability(self):
        return self._get_dataobject("capability", False)
@@ -1162,10 +988,8 @@ class ServiceInstance(ManagedObject):
 
 
 class SessionManager(ManagedObject):
-    _valid_attrs = set(['currentSession', 'defaultLocale', 'message', 'messageLocaleList', 'sessionList', 'supportedLocaleList'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['currentSession', 'defaultLocale', 'message', 'messageLocaleList', 'sessionList', 'supportedLocaleList'])
     @cached_property
     def currentSession(self):
        return self._get_dataobject("currentSession", False)
@@ -1186,10 +1010,8 @@ class SessionManager(ManagedObject):
        return self._get_dataobject("supportedLocaleList", True)
 
 class StoragePod(Folder):
-    _valid_attrs = set(['podStorageDrsEntry', 'summary'])
-    def __init__(self, mo_ref, client):
-        Folder.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, Folder._valid_attrs)
+    __slots__ = []
+    _valid_attrs = Folder._valid_attrs | frozenset(['podStorageDrsEntry', 'summary'])
     @cached_property
     def podStorageDrsEntry(self):
        return self._get_dataobject("podStorageDrsEntry", False)
@@ -1198,37 +1020,29 @@ class StoragePod(Folder):
        return self._get_dataobject("summary", False)
 
 class StorageResourceManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class Task(ExtensibleManagedObject):
-    _valid_attrs = set(['info'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['info'])
     @cached_property
     def info(self):
        return self._get_dataobject("info", False)
 
 
 class TaskHistoryCollector(HistoryCollector):
-    _valid_attrs = set(['latestPage'])
-    def __init__(self, mo_ref, client):
-        HistoryCollector.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, HistoryCollector._valid_attrs)
+    __slots__ = []
+    _valid_attrs = HistoryCollector._valid_attrs | frozenset(['latestPage'])
     @cached_property
     def latestPage(self):
        return self._get_dataobject("latestPage", True)
 
 
 class TaskManager(ManagedObject):
-    _valid_attrs = set(['description', 'maxCollector', 'recentTask'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['description', 'maxCollector', 'recentTask'])
     @cached_property
     def description(self):
        return self._get_dataobject("description", False)
@@ -1241,30 +1055,24 @@ class TaskManager(ManagedObject):
 
 
 class UserDirectory(ManagedObject):
-    _valid_attrs = set(['domainList'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['domainList'])
     @cached_property
     def domainList(self):
        return self._get_dataobject("domainList", True)
 
 
 class ViewManager(ManagedObject):
-    _valid_attrs = set(['viewList'])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset(['viewList'])
     @cached_property
     def viewList(self):
        return self._get_mor("viewList", True)
 
 
 class VirtualApp(ResourcePool):
-    _valid_attrs = set(['childLink', 'datastore', 'network', 'parentFolder', 'parentVApp', 'vAppConfig'])
-    def __init__(self, mo_ref, client):
-        ResourcePool.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ResourcePool._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ResourcePool._valid_attrs | frozenset(['childLink', 'datastore', 'network', 'parentFolder', 'parentVApp', 'vAppConfig'])
     @cached_property
     def childLink(self):
        return self._get_dataobject("childLink", True)
@@ -1286,24 +1094,18 @@ class VirtualApp(ResourcePool):
 
 
 class VirtualDiskManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class VirtualizationManager(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class VirtualMachine(ManagedEntity):
-    _valid_attrs = set(['capability', 'config', 'datastore', 'environmentBrowser', 'guest', 'guestHeartbeatStatus', 'layout', 'layoutEx', 'network', 'parentVApp', 'resourceConfig', 'resourcePool', 'rootSnapshot', 'runtime', 'snapshot', 'storage', 'summary'])
-    def __init__(self, mo_ref, client):
-        ManagedEntity.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedEntity._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedEntity._valid_attrs | frozenset(['capability', 'config', 'datastore', 'environmentBrowser', 'guest', 'guestHeartbeatStatus', 'layout', 'layoutEx', 'network', 'parentVApp', 'resourceConfig', 'resourcePool', 'rootSnapshot', 'runtime', 'snapshot', 'storage', 'summary'])
     @cached_property
     def capability(self):
        return self._get_dataobject("capability", False)
@@ -1358,24 +1160,18 @@ class VirtualMachine(ManagedEntity):
 
 
 class VirtualMachineCompatibilityChecker(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class VirtualMachineProvisioningChecker(ManagedObject):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        ManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ManagedObject._valid_attrs | frozenset([])
 
 
 class VirtualMachineSnapshot(ExtensibleManagedObject):
-    _valid_attrs = set(['childSnapshot', 'config'])
-    def __init__(self, mo_ref, client):
-        ExtensibleManagedObject.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, ExtensibleManagedObject._valid_attrs)
+    __slots__ = []
+    _valid_attrs = ExtensibleManagedObject._valid_attrs | frozenset(['childSnapshot', 'config'])
     @cached_property
     def childSnapshot(self):
        return self._get_mor("childSnapshot", True)
@@ -1385,10 +1181,8 @@ class VirtualMachineSnapshot(ExtensibleManagedObject):
 
 
 class VmwareDistributedVirtualSwitch(DistributedVirtualSwitch):
-    _valid_attrs = set([])
-    def __init__(self, mo_ref, client):
-        DistributedVirtualSwitch.__init__(self, mo_ref, client)
-        self._valid_attrs = set.union(self._valid_attrs, DistributedVirtualSwitch._valid_attrs)
+    __slots__ = []
+    _valid_attrs = DistributedVirtualSwitch._valid_attrs | frozenset([])
 
 
 classmap = dict((x.__name__, x) for x in (
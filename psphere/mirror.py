@@ -0,0 +1,220 @@
+"""
+:mod:`psphere.mirror` - A local mirror of server-side inventory
+===============================================================
+
+.. module:: mirror
+
+Keeps the properties of many managed objects current by consuming the
+incremental updates reported by WaitForUpdatesEx, instead of repeatedly
+retrieving the properties.
+
+"""
+
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryMirror(object):
+    """A local, incrementally updated copy of part of the inventory.
+
+    >>> from psphere.mirror import InventoryMirror
+    >>> mirror = InventoryMirror(client, {"VirtualMachine": ["name",
+    ...                                                      "runtime"],
+    ...                                   "HostSystem": ["name"]})
+    >>> mirror.update()
+    >>> for vm in mirror.views("VirtualMachine"):
+    ...     print(vm.name, vm.runtime.powerState)
+
+    The first call to update() retrieves every matching object, later calls
+    only transfer the objects and properties which have changed since the
+    previous call. Properties read from the views are served from the
+    mirror without contacting the server.
+
+    :param client: The client the mirror retrieves updates through.
+    :type client: Client
+    :param properties: The properties to mirror, keyed by the type of \
+    managed object they are mirrored for.
+    :type properties: dict
+    :param begin_entity: The MOR to start searching for objects. The \
+    default is to start the search at the root folder.
+    :type begin_entity: ManagedObjectReference or None
+
+    """
+    def __init__(self, client, properties, begin_entity=None):
+        self._client = client
+        self.properties = properties
+        self.begin_entity = begin_entity
+        self.version = ""
+        self.objects = {}
+        self._collector = None
+        self._filter = None
+
+    def start(self):
+        """Create the server-side filter which reports changes."""
+        if self._filter is not None:
+            return
+
+        begin_entity = self.begin_entity
+        if begin_entity is None:
+            begin_entity = self._client.sc.rootFolder._mo_ref
+
+        property_specs = []
+        for view_type, properties in self.properties.items():
+            property_spec = self._client.create('PropertySpec')
+            property_spec.type = view_type
+            property_spec.all = False
+            property_spec.pathSet = properties
+            property_specs.append(property_spec)
+
+        pfs = self._client.get_search_filter_spec(begin_entity,
+                                                  property_specs[0])
+        pfs.propSet = property_specs
+
+        # Use a dedicated collector so that our filter doesn't affect, and
+        # isn't affected by, anyone else using the session's collector
+        pc = self._client.sc.propertyCollector
+        self._collector = pc.CreatePropertyCollector()
+        self._filter = self._collector.CreateFilter(spec=pfs,
+                                                    partialUpdates=False)
+        logger.debug("Created filter %s", self._filter._mo_ref.value)
+
+    def destroy(self):
+        """Destroy the server-side filter and collector."""
+        if self._filter is not None:
+            self._filter.DestroyPropertyFilter()
+            self._filter = None
+        if self._collector is not None:
+            self._collector.DestroyPropertyCollector()
+            self._collector = None
+        self.version = ""
+
+    def update(self, max_wait=0):
+        """Apply any changes made on the server to the mirror.
+
+        :param max_wait: The number of seconds to wait for a change if \
+        there are none pending. 0 returns immediately, None waits until \
+        there is a change.
+        :type max_wait: int or None
+        :returns: The number of objects which entered, changed or left.
+        :rtype: int
+
+        """
+        self.start()
+        options = self._client.create('WaitOptions')
+        # Each call is held open for no longer than the transport allows,
+        # waiting longer takes several calls
+        limit = self._client._max_wait_seconds()
+        deadline = None
+        if max_wait is not None:
+            deadline = time.time() + max_wait
+
+        updated = 0
+        truncated = False
+        while True:
+            if truncated:
+                options.maxWaitSeconds = 0
+            elif deadline is None:
+                options.maxWaitSeconds = limit
+            else:
+                options.maxWaitSeconds = min(limit, max(0, int(math.ceil(
+                    deadline - time.time()))))
+            update_set = self._collector.WaitForUpdatesEx(
+                version=self.version, options=options)
+            # Nothing is returned if nothing changed within maxWaitSeconds
+            if update_set is None:
+                if not truncated and (deadline is None or
+                                      time.time() < deadline):
+                    continue
+                break
+
+            self.version = update_set.version
+            for filter_update in getattr(update_set, "filterSet", []):
+                for object_update in getattr(filter_update, "objectSet", []):
+                    self._apply(object_update)
+                    updated += 1
+
+            # A truncated update set has more changes waiting for us
+            truncated = getattr(update_set, "truncated", False)
+            if not truncated:
+                break
+
+        self._touch()
+        logger.debug("Applied %s object updates, now at version %s",
+                     updated, self.version)
+        return updated
+
+    def get(self, mo_ref):
+        """Get the mirrored view of a managed object.
+
+        :param mo_ref: The managed object to look up.
+        :type mo_ref: ManagedObjectReference or ManagedObject
+        :returns: The view, or None if the object isn't mirrored.
+        :rtype: ManagedObject
+
+        """
+        mo_ref = getattr(mo_ref, "_mo_ref", mo_ref)
+        return self.objects.get((str(mo_ref._type), str(mo_ref.value)))
+
+    def views(self, view_type=None):
+        """Get the mirrored views, optionally only those of one type.
+
+        :param view_type: The type of managed object to return.
+        :type view_type: str or None
+        :rtype: list of ManagedObject's
+
+        """
+        if view_type is None:
+            return self.objects.values()
+
+        return [view for (type_, value), view in self.objects.items()
+                if type_ == view_type]
+
+    def _apply(self, object_update):
+        """Apply a single ObjectUpdate to the mirror."""
+        mo_ref = object_update.obj._mo_ref
+        key = (str(mo_ref._type), str(mo_ref.value))
+        if object_update.kind == "leave":
+            logger.debug("%s %s left the mirror", key[0], key[1])
+            self.objects.pop(key, None)
+            return
+
+        view = self.objects.setdefault(key, object_update.obj)
+        for change in getattr(object_update, "changeSet", []):
+            if change.op in ["remove", "indirectRemove"] or \
+               getattr(change, "val", None) is None:
+                view.flush_cache(properties=[change.name])
+                continue
+
+            view._set_property(change.name, change.val)
+
+    def _touch(self):
+        """Mark the mirrored properties as current.
+
+        The mirror has just been brought up to date, so any property that
+        didn't change is still correct and shouldn't expire from the cache.
+
+        """
+        now = time.time()
+        for (type_, value), view in self.objects.items():
+            cache = getattr(view, "_cache", {})
+            for name in self.properties.get(type_, []):
+                if name in cache:
+                    cache[name] = (cache[name][0], now)
@@ -0,0 +1,119 @@
+"""
+:mod:`psphere.pool` - A pool of clients for use from many threads
+=================================================================
+
+.. module:: pool
+
+A :class:`psphere.client.Client` holds a single session and transport, so
+it must only be used by one thread at a time. A ClientPool holds a number
+of logged in clients which share one parsed WSDL and hands each of them to
+one thread at a time.
+
+"""
+
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+import threading
+import Queue
+
+from contextlib import contextmanager
+
+from psphere.client import Client
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool(object):
+    """A pool of logged in clients.
+
+    >>> from psphere.pool import ClientPool
+    >>> pool = ClientPool(size=8, server="vc.foo.com", username="me",
+    ...                   password="pass")
+    >>> with pool.client() as client:
+    ...     vms = VirtualMachine.all(client)
+
+    Clients are created as they are needed, up to size, and each has its own
+    session. Sessions which expire are logged in again transparently.
+
+    Views retrieved through a client keep using that client to lazily load
+    their properties, so they should only be used while the client is
+    checked out.
+
+    :param size: The maximum number of clients in the pool.
+    :type size: int
+    :param kwargs: The arguments used to create the first client, see \
+    :class:`psphere.client.Client`.
+
+    """
+    def __init__(self, size=4, **kwargs):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        kwargs.setdefault("relogin", True)
+        self._lock = threading.Lock()
+        self._idle = Queue.Queue()
+        self._clients = [Client(**kwargs)]
+        self._idle.put(self._clients[0])
+
+    def acquire(self):
+        """Check a client out of the pool.
+
+        If no client is idle a new one is created, unless the pool is full
+        in which case this blocks until a client is released.
+
+        :rtype: Client
+
+        """
+        try:
+            return self._idle.get_nowait()
+        except Queue.Empty:
+            pass
+
+        self._lock.acquire()
+        try:
+            if len(self._clients) < self.size:
+                logger.debug("Creating client %s of %s",
+                             len(self._clients) + 1, self.size)
+                client = self._clients[0].clone()
+                self._clients.append(client)
+                return client
+        finally:
+            self._lock.release()
+
+        return self._idle.get()
+
+    def release(self, client):
+        """Return a client to the pool."""
+        self._idle.put(client)
+
+    @contextmanager
+    def client(self):
+        """Check a client out of the pool for the duration of a with block."""
+        client = self.acquire()
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    def logout(self):
+        """Logout of every session in the pool."""
+        self._lock.acquire()
+        try:
+            for client in self._clients:
+                client.logout()
+        finally:
+            self._lock.release()
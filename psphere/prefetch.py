@@ -0,0 +1,200 @@
+"""
+:mod:`psphere.prefetch` - Adaptive prefetching of view properties
+=================================================================
+
+.. module:: prefetch
+
+Properties of a view are retrieved from the server one at a time as they
+are first used. A script which reads the name, runtime and summary of
+each VM therefore makes three requests per VM. A Prefetcher learns which
+properties of each class are used together, and when one of them is
+missing from the cache, retrieves the others in the same request.
+
+"""
+
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher(object):
+    """Learns which properties are used together and prefetches them.
+
+    >>> client = Client(prefetch=True)
+    >>> for vm in VirtualMachine.all(client):
+    ...     print(vm.name, vm.runtime.powerState, vm.summary.overallStatus)
+    >>> print(client.prefetcher.report())
+
+    The properties used on each view are recorded. When a property is
+    missing from the cache, every property which was used on at least
+    threshold of the views it was used on is retrieved with it.
+
+    With siblings enabled, the properties are retrieved in the same
+    request for the other views of the same class, in the client's
+    identity map, which don't have the missing property cached either.
+
+    :param threshold: How often a property must have been used with the \
+    missing property to be prefetched, from 0 to 1.
+    :type threshold: float
+    :param siblings: Whether to also retrieve the properties for other \
+    views of the same class.
+    :type siblings: bool
+    :param batch_size: The maximum number of views to retrieve the \
+    properties of in one request.
+    :type batch_size: int
+
+    """
+    def __init__(self, threshold=0.5, siblings=True, batch_size=100):
+        self.threshold = threshold
+        self.siblings = siblings
+        self.batch_size = batch_size
+        # The number of views each property of a class was used on
+        self._uses = {}
+        # The number of views each pair of properties was used together on
+        self._pairs = {}
+        # The [weakref, used properties, unused prefetched properties] of
+        # each view, keyed by id
+        self._views = {}
+        self.misses = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+    def _state(self, view):
+        key = id(view)
+        state = self._views.get(key)
+        if state is None:
+            views = self._views
+            def forget(ref):
+                views.pop(key, None)
+            state = self._views[key] = [weakref.ref(view, forget), set(),
+                                        set()]
+        return state
+
+    def accessed(self, view, name):
+        """Record that a property of a view was used."""
+        state = self._state(view)
+        used, prefetched = state[1], state[2]
+        if name in prefetched:
+            prefetched.discard(name)
+            self.prefetch_hits += 1
+        if name in used:
+            return
+
+        cls = view.__class__
+        uses = self._uses.setdefault(cls, {})
+        uses[name] = uses.get(name, 0) + 1
+        pairs = self._pairs.setdefault(cls, {})
+        for other in used:
+            for a, b in ((name, other), (other, name)):
+                counts = pairs.setdefault(a, {})
+                counts[b] = counts.get(b, 0) + 1
+        used.add(name)
+
+    def predict(self, cls, name):
+        """Get the properties which are usually used with a property.
+
+        :rtype: list
+
+        """
+        uses = self._uses.get(cls, {}).get(name)
+        if not uses:
+            return []
+        return sorted(other for other, count in
+                      self._pairs.get(cls, {}).get(name, {}).items()
+                      if float(count) / uses >= self.threshold)
+
+    def fetch(self, view, name, views=None):
+        """Retrieve a property missing from a view's cache, along with the
+        properties predicted to be used with it.
+
+        :param views: The views to retrieve the properties for, starting \
+        with view. The default is view and, if enabled, its siblings.
+        :type views: list of ManagedObject's or None
+
+        """
+        self.misses += 1
+        self.accessed(view, name)
+        if views is None or len(views) == 1:
+            views = [view]
+            if self.siblings is True:
+                views.extend(self._siblings(view, name))
+        for other in views[1:]:
+            self._state(other)[2].add(name)
+            self.prefetched += 1
+
+        # Only ask for the predicted properties which some view is missing
+        properties = [name]
+        for predicted in self.predict(view.__class__, name):
+            missing = [other for other in views
+                       if not other._is_cached(predicted)]
+            if not missing:
+                continue
+            properties.append(predicted)
+            for other in missing:
+                self._state(other)[2].add(predicted)
+            self.prefetched += len(missing)
+
+        logger.debug("Prefetching %s for %s views of type %s", properties,
+                     len(views), view.__class__.__name__)
+        view._client.update_views(views, properties)
+
+    def _siblings(self, view, name):
+        """Find other views of the same class without the property cached."""
+        siblings = []
+        cls = view.__class__
+        # Iterated rather than copied, so that a full batch is found
+        # without visiting every view in the map
+        try:
+            for other in view._client._identity_map.itervalues():
+                if len(siblings) >= self.batch_size - 1:
+                    break
+                if other.__class__ is not cls or other is view:
+                    continue
+                if not other._is_cached(name):
+                    siblings.append(other)
+        except RuntimeError:
+            # Another thread added a view, make do with those found
+            pass
+        return siblings
+
+    def report(self):
+        """Summarise how well prefetching has worked.
+
+        :returns: The number of misses which caused a request, properties \
+        prefetched and prefetched properties which were then used, the \
+        hit rate of prefetched properties and the properties learned to \
+        be used together, by class name.
+        :rtype: dict
+
+        """
+        hit_rate = 0.0
+        if self.prefetched:
+            hit_rate = float(self.prefetch_hits) / self.prefetched
+        learned = {}
+        for cls, uses in self._uses.items():
+            groups = {}
+            for name in uses:
+                predicted = self.predict(cls, name)
+                if predicted:
+                    groups[name] = predicted
+            if groups:
+                learned[cls.__name__] = groups
+        return {"misses": self.misses, "prefetched": self.prefetched,
+                "prefetch_hits": self.prefetch_hits, "hit_rate": hit_rate,
+                "learned": learned}
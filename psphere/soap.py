@@ -17,11 +17,32 @@ A leaky wrapper for the underlying suds library.
 # under the License.
 
 
+import cPickle
+import errno
+import hashlib
+import httplib
 import logging
+import new
+import os
+import socket
+import tempfile
+import threading
+import time
 import urllib2
+import urlparse
+import weakref
+import zlib
 import suds
 
 from pprint import pprint
+from StringIO import StringIO
+from xml.sax import make_parser
+from xml.sax.handler import feature_external_ges
+from suds.cache import Cache
+from suds.client import SoapClient
+from suds.sax.parser import Handler
+from suds.transport import Reply, TransportError
+from suds.transport.http import HttpTransport
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +63,54 @@ def get_client(url):
     return client
 
 
+# The objects suds built for each type, keyed by the factory which built
+# them. Clients cloned from each other share a factory and so prototypes.
+_prototypes = weakref.WeakKeyDictionary()
+
+
+def clone(obj):
+    """Copy a suds object and the objects and lists within it.
+
+    The copy shares the schema types and printer of the original, which are
+    never modified, so copying is much cheaper than suds building the object
+    again from the schema.
+
+    """
+    if isinstance(obj, list):
+        return [clone(item) for item in obj]
+    if not isinstance(obj, suds.sudsobject.Object):
+        return obj
+    copy = new.instance(obj.__class__)
+    attrs = copy.__dict__
+    for name, value in obj.__dict__.iteritems():
+        if name == "__keylist__":
+            attrs[name] = value[:]
+        elif name == "__printer__":
+            attrs[name] = value
+        else:
+            attrs[name] = clone(value)
+    return copy
+
+
+def instantiate(factory, _type):
+    """Create a suds object of the requested _type by copying a prototype.
+
+    The first object of each type is built by the factory and kept as the
+    prototype of later ones.
+
+    """
+    prototypes = _prototypes.get(factory)
+    if prototypes is None:
+        prototypes = _prototypes.setdefault(factory, {})
+    prototype = prototypes.get(_type)
+    if prototype is None:
+        prototype = prototypes[_type] = factory.create("ns0:%s" % _type)
+    return clone(prototype)
+
+
 def create(client, _type, **kwargs):
     """Create a suds object of the requested _type."""
-    obj = client.factory.create("ns0:%s" % _type)
+    obj = instantiate(client.factory, _type)
     for key, value in kwargs.items():
         setattr(obj, key, value)
     return obj
@@ -93,3 +159,538 @@ class ManagedObjectReference(suds.sudsobject.Property):
     def __init__(self, _type, value):
         suds.sudsobject.Property.__init__(self, value)
         self._type = _type
+
+
+class ConnectionPool(object):
+    """A pool of persistent HTTP connections, optionally limited per host.
+
+    :param maxsize: The maximum number of connections open to each host, \
+    or None for no limit. Callers wait for a connection to the host to be \
+    available, for at most the timeout they give.
+    :type maxsize: int or None
+
+    """
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = {}
+        # The number of connections to each host which are checked out
+        self._in_use = {}
+
+    def get(self, scheme, host, timeout):
+        """Get a connection to the host, reusing an idle one if possible.
+
+        :raises: socket.timeout if the pool is full for timeout seconds.
+        :returns: The connection and whether it has been used before.
+        :rtype: tuple
+
+        """
+        key = (scheme, host)
+        self._lock.acquire()
+        try:
+            if self.maxsize is not None:
+                deadline = None
+                if timeout is not None:
+                    deadline = time.time() + timeout
+                while self._in_use.get(key, 0) >= self.maxsize:
+                    if deadline is None:
+                        self._available.wait()
+                        continue
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise socket.timeout(
+                            "timed out waiting for a connection to %s" %
+                            host)
+                    self._available.wait(remaining)
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        finally:
+            self._lock.release()
+
+        logger.debug("Opening new %s connection to %s", scheme, host)
+        if scheme == "https":
+            return httplib.HTTPSConnection(host, timeout=timeout), False
+        return httplib.HTTPConnection(host, timeout=timeout), False
+
+    def put(self, scheme, host, connection, reusable=True):
+        """Return a connection to the pool, closing it if not reusable."""
+        key = (scheme, host)
+        self._lock.acquire()
+        try:
+            if reusable:
+                self._idle.setdefault(key, []).append(connection)
+            else:
+                connection.close()
+            self._in_use[key] -= 1
+            # Callers may be waiting for other hosts
+            self._available.notify_all()
+        finally:
+            self._lock.release()
+
+    def close(self):
+        """Close all idle connections."""
+        self._lock.acquire()
+        try:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle = {}
+        finally:
+            self._lock.release()
+
+
+# Shared by all KeepAliveTransport's which aren't given their own pool, so
+# that clients in the process reuse each other's idle connections. It has
+# no limit, as long-polls such as WaitForUpdatesEx hold their connection
+connection_pool = ConnectionPool()
+
+
+class _CookieResponse(object):
+    """Adapts a httplib response for cookielib."""
+    def __init__(self, response):
+        self._response = response
+
+    def info(self):
+        return self._response.msg
+
+
+def _never_arrived(error, sent):
+    """Whether a request which failed on a reused connection can't have
+    reached the server, so that sending it again can't run it twice.
+
+    That's when the server had closed the idle connection, which shows as
+    a reset or broken pipe while sending, or as the connection closing
+    before any of the response was read. A timeout never qualifies, the
+    server may still be running the method.
+
+    :param error: The exception the request failed with.
+    :param sent: Whether the whole request had been sent.
+    :type sent: bool
+
+    """
+    if sent is False:
+        return (isinstance(error, socket.error) and
+                not isinstance(error, socket.timeout) and
+                error.args[:1] in [(errno.ECONNRESET,), (errno.EPIPE,)])
+    return (isinstance(error, httplib.BadStatusLine) and
+            (error.line in ["", "''"] or
+             error.line.startswith("No status line received")))
+
+
+class KeepAliveTransport(HttpTransport):
+    """A suds transport which reuses HTTP/1.1 connections between requests.
+
+    Each transport keeps its own cookies, and therefore its own session,
+    but takes its connections from a ConnectionPool which may be shared.
+    Responses are requested gzip compressed and requests can optionally
+    be compressed too. Proxies are not supported.
+
+    >>> client = Client(transport=KeepAliveTransport(compress_requests=True))
+
+    :param pool: The pool to take connections from. The default is a \
+    pool shared by all transports in the process.
+    :type pool: ConnectionPool or None
+    :param compress_requests: Whether to gzip the request body.
+    :type compress_requests: bool
+    :param kwargs: Options passed to suds' HttpTransport.
+
+    """
+    def __init__(self, pool=None, compress_requests=False, **kwargs):
+        HttpTransport.__init__(self, **kwargs)
+        if pool is None:
+            pool = connection_pool
+        self.pool = pool
+        self.compress_requests = compress_requests
+
+    def send(self, request):
+        url = urlparse.urlsplit(request.url)
+        path = url.path
+        if url.query:
+            path += "?" + url.query
+
+        body = request.message
+        headers = dict(request.headers)
+        headers["Accept-Encoding"] = "gzip"
+        if self.compress_requests:
+            compressor = zlib.compressobj(6, zlib.DEFLATED,
+                                          16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            headers["Content-Encoding"] = "gzip"
+
+        u2request = urllib2.Request(request.url, body, headers)
+        self.addcookies(u2request)
+        headers = dict(u2request.header_items())
+
+        timeout = self.options.timeout
+        connection, reused = self.pool.get(url.scheme, url.netloc, timeout)
+        try:
+            sent = False
+            try:
+                connection.request("POST", path, body, headers)
+                sent = True
+                response = connection.getresponse()
+            except (socket.error, httplib.BadStatusLine), e:
+                if not reused or not _never_arrived(e, sent):
+                    raise
+                # The server closed the idle connection, try a new one
+                logger.debug("Reused connection to %s failed, reconnecting",
+                             url.netloc)
+                connection.close()
+                connection.request("POST", path, body, headers)
+                response = connection.getresponse()
+            data = response.read()
+        except:
+            self.pool.put(url.scheme, url.netloc, connection, reusable=False)
+            raise
+
+        self.pool.put(url.scheme, url.netloc, connection,
+                      reusable=not response.will_close)
+        self.cookiejar.extract_cookies(_CookieResponse(response), u2request)
+
+        if response.getheader("content-encoding") == "gzip":
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+        if response.status in (202, 204):
+            return None
+        if response.status >= 300:
+            raise TransportError(response.reason, response.status,
+                                 StringIO(data))
+        return Reply(response.status, dict(response.getheaders()), data)
+
+    def __deepcopy__(self, memo={}):
+        clone = HttpTransport.__deepcopy__(self, memo)
+        clone.pool = self.pool
+        clone.compress_requests = self.compress_requests
+        return clone
+
+
+def _pickle_atomically(obj, path):
+    """Pickle an object to a file, creating its directory if needed.
+
+    The pickle is written to a temporary file which is renamed into place,
+    so a process reading the file never sees it partially written. Errors
+    are raised once the temporary file is removed.
+
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError, e:
+        if e.errno != errno.EEXIST:
+            raise
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    renamed = False
+    try:
+        f = os.fdopen(fd, "wb")
+        try:
+            cPickle.dump(obj, f, 2)
+        finally:
+            f.close()
+        os.rename(tmp_path, path)
+        renamed = True
+    finally:
+        if not renamed:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+class WsdlCache(Cache):
+    """A persistent cache of processed WSDL models.
+
+    Used with the suds cachingpolicy of 1, suds stores the fully processed
+    WSDL and schema model in the cache instead of the raw documents. The
+    entries are keyed on the given key, so a change to the WSDL or to the
+    code which processes it creates a new entry rather than reusing a stale
+    one.
+
+    Entries are written with _pickle_atomically, so processes sharing the
+    cache never see a partially written entry.
+
+    :param location: The directory to store the cache in.
+    :type location: str
+    :param key: Identifies the WSDL and the software which processed it.
+    :type key: str
+
+    """
+    def __init__(self, location, key):
+        self.location = location
+        self.key = key
+
+    def _path(self, id):
+        digest = hashlib.sha1("%s-%s-%s" % (self.key, suds.__version__, id))
+        return os.path.join(self.location, "wsdl-%s.px" % digest.hexdigest())
+
+    def get(self, id):
+        path = self._path(id)
+        try:
+            f = open(path, "rb")
+        except IOError:
+            logger.debug("No cached WSDL in %s", path)
+            return None
+
+        try:
+            return cPickle.load(f)
+        except Exception, e:
+            logger.warning("Ignoring unreadable cached WSDL %s: %s", path, e)
+            return None
+        finally:
+            f.close()
+
+    def put(self, id, object):
+        path = self._path(id)
+        try:
+            _pickle_atomically(object, path)
+        except Exception, e:
+            # Another process may have written the entry first
+            logger.warning("Couldn't write cached WSDL %s: %s", path, e)
+        return object
+
+    def purge(self, id):
+        try:
+            os.remove(self._path(id))
+        except OSError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.location):
+            if name.startswith("wsdl-"):
+                os.remove(os.path.join(self.location, name))
+
+
+def wsdl_digest(wsdl_dir):
+    """Get a digest of the contents of the WSDL and schema in wsdl_dir."""
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(wsdl_dir)):
+        if not name.endswith((".wsdl", ".xsd")):
+            continue
+        f = open(os.path.join(wsdl_dir, name), "rb")
+        try:
+            digest.update(name)
+            digest.update(f.read())
+        finally:
+            f.close()
+    return digest.hexdigest()
+
+
+def mor_free_types(schema):
+    """Find the types whose instances can never contain a MOR.
+
+    A field may hold an instance of any subtype of its declared type, so a
+    type may contain a ManagedObjectReference if any of its fields are
+    declared as a MOR, as xsd:anyType, or as a type which has a subtype
+    that may contain one.
+
+    The dynamicProperty field every DynamicData has is not considered, it
+    is reserved and never populated by the server.
+
+    :param schema: The schema of a suds client, i.e. client.wsdl.schema
+    :type schema: suds.xsd.schema.Schema
+    :returns: The names of the complex types which can't contain a MOR.
+    :rtype: frozenset
+
+    """
+    # The types which have a field declared as each type
+    users = {}
+    bases = {}
+    complex_types = set()
+    for (name, ns), type_ in schema.types.items():
+        if type_.__class__.__name__ != "Complex":
+            continue
+        complex_types.add(name)
+        for child, ancestry in type_.children():
+            if child.name == "dynamicProperty":
+                continue
+            users.setdefault(child.type[0], set()).add(name)
+        for content in type_.rawchildren:
+            for extension in content.rawchildren:
+                if extension.__class__.__name__ == "Extension":
+                    bases[name] = extension.ref[0]
+
+    containers = set()
+    pending = list(users.get("ManagedObjectReference", set()) |
+                   users.get("anyType", set()))
+    while pending:
+        name = pending.pop()
+        if name in containers:
+            continue
+        containers.add(name)
+        # A field declared as this type or any of its base types may hold
+        # an instance of it
+        while name is not None:
+            pending.extend(users.get(name, []))
+            name = bases.get(name)
+
+    containers.add("ManagedObjectReference")
+    return frozenset(complex_types - containers)
+
+
+def service_methods(wsdl):
+    """Find the names of the methods the services of a WSDL define.
+
+    :param wsdl: The WSDL of a suds client, i.e. client.wsdl
+    :type wsdl: suds.wsdl.Definitions
+    :rtype: frozenset
+
+    """
+    methods = set()
+    for service in wsdl.services:
+        for port in service.ports:
+            methods.update(port.methods)
+    return frozenset(methods)
+
+
+class _ObjectContentHandler(Handler):
+    """A suds SAX handler which hands over each result as soon as it has
+    been parsed, instead of building a tree of the whole reply.
+
+    :param path: The local names of the elements from the Envelope down to \
+    the parent of the result elements.
+    :type path: list
+    :param names: The local names of the result elements.
+    :type names: list
+    :param callback: Called with each result element, which is removed \
+    from the tree afterwards.
+    :type callback: callable
+
+    """
+    def __init__(self, path, names, callback):
+        Handler.__init__(self)
+        self.path = path
+        self.names = names
+        self.callback = callback
+
+    def endElement(self, name):
+        node = self.top()
+        Handler.endElement(self, name)
+        if (len(self.nodes) != len(self.path) + 1 or
+            node.name not in self.names):
+            return
+        if [n.name for n in self.nodes[1:]] != self.path:
+            return
+        # Unmarshal while still attached, namespace prefixes are declared
+        # on the ancestors
+        self.callback(node)
+        node.detach()
+
+
+class ObjectContentStream(object):
+    """The ObjectContent's in a RetrieveProperties or RetrievePropertiesEx
+    reply, unmarshalled one at a time as the reply is parsed.
+
+    Only a single ObjectContent is held as an XML tree at a time, whereas
+    suds would build a tree of the whole reply before unmarshalling any of
+    it. The stream can only be iterated over once.
+
+    For RetrievePropertiesEx and ContinueRetrievePropertiesEx, token holds
+    the token for the next page, or None if there are no more pages. The
+    server sends it ahead of the objects, so it is set by the time the
+    first object is returned.
+
+    :param binding: The binding the reply is unmarshalled with.
+    :type binding: suds.bindings.binding.Binding
+    :param method: The method which was invoked.
+    :type method: suds.wsdl.Method
+    :param reply: The reply XML.
+    :type reply: str
+    :param convert: Called with each ObjectContent, the result is \
+    returned instead.
+    :type convert: callable or None
+
+    """
+    chunk_size = 65536
+
+    def __init__(self, binding, method, reply, convert=None):
+        self.token = None
+        self._reply = reply
+        self._convert = convert
+        self._unmarshaller = binding.unmarshaller()
+        self._items = []
+
+        result_type = binding.returned_types(method)[0]
+        self._path = ["Envelope", "Body", "%sResponse" % method.name]
+        self._names = [result_type.name]
+        self._type = result_type.resolve(nobuiltin=True)
+        if not result_type.unbounded():
+            # A RetrieveResult, which holds a page of objects and a token
+            child, ancestry = self._type.get_child("objects")
+            self._path.append(result_type.name)
+            self._names = ["objects", "token"]
+            self._type = child.resolve(nobuiltin=True)
+
+    def _parsed(self, node):
+        if node.name == "token":
+            self.token = node.getText()
+            return
+        self._items.append(self._unmarshaller.process(node, self._type))
+
+    def __iter__(self):
+        if self._reply is None:
+            raise ValueError("An ObjectContentStream can only be iterated "
+                             "over once")
+        reply, self._reply = self._reply, None
+        handler = _ObjectContentHandler(self._path, self._names, self._parsed)
+        parser = make_parser()
+        parser.setFeature(feature_external_ges, 0)
+        parser.setContentHandler(handler)
+
+        for start in xrange(0, len(reply), self.chunk_size):
+            parser.feed(reply[start:start + self.chunk_size])
+            for item in self._parsed_items():
+                yield item
+        parser.close()
+        for item in self._parsed_items():
+            yield item
+
+    def _parsed_items(self):
+        items, self._items = self._items, []
+        for item in items:
+            if self._convert is not None:
+                item = self._convert(item)
+            yield item
+
+
+class _StreamingSoapClient(SoapClient):
+    """A suds SoapClient which returns an ObjectContentStream instead of
+    unmarshalling the whole reply."""
+    def __init__(self, client, method, convert=None):
+        SoapClient.__init__(self, client, method)
+        self.convert = convert
+
+    def succeeded(self, binding, reply):
+        if self.options.faults is False:
+            raise ValueError("Streaming requires the faults option")
+        if len(reply) == 0:
+            return None
+        return ObjectContentStream(binding, self.method, reply, self.convert)
+
+
+def invoke_stream(client, method, convert=None, **kwargs):
+    """Invoke a RetrieveProperties style method on the underlying soap
+    service, streaming the ObjectContent's in the reply.
+
+    Faults are raised in the same way as for :func:`invoke`, the reply is
+    only parsed as the returned stream is iterated over. Plugins are not
+    given the parsed or unmarshalled reply.
+
+    :param method: RetrieveProperties, RetrievePropertiesEx or \
+    ContinueRetrievePropertiesEx
+    :type method: str
+    :param convert: Called with each ObjectContent, the result is \
+    returned from the stream instead.
+    :type convert: callable or None
+    :rtype: ObjectContentStream or None
+
+    """
+    if method not in ("RetrieveProperties", "RetrievePropertiesEx",
+                      "ContinueRetrievePropertiesEx"):
+        raise ValueError("%s doesn't return ObjectContent's" % method)
+    # Resolve the method in the same way as client.service does
+    proxy = getattr(client.service, method)
+    return _StreamingSoapClient(client, proxy.method, convert).invoke(
+        (), kwargs)
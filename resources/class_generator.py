@@ -16,10 +16,10 @@ for i, mo in enumerate(managed_objects):
     props = []
     for prop in mo["properties"]:
         props.append("%s" % prop["name"])
-    body_text += "    _valid_attrs = set(%s)\n" % props
-    body_text += "    def __init__(self, mo_ref, client):\n"
-    body_text += "        %s.__init__(self, mo_ref, client)\n" % (mo["extends"])
-    body_text += ("        self._valid_attrs = set.union(self._valid_attrs, %s._valid_attrs)\n" % mo["extends"])
+    # Views have no __dict__ and share their class's set of attributes
+    body_text += "    __slots__ = []\n"
+    body_text += ("    _valid_attrs = %s._valid_attrs | frozenset(%s)\n" %
+                  (mo["extends"], props))
     for prop in mo["properties"]:
         body_text += "    @cached_property\n"
         body_text += "    def %s(self):\n" % prop["name"]
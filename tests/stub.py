@@ -0,0 +1,263 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""A local stub of the vSphere API for the tests.
+
+The StubServer answers just enough of the API over plain HTTP for a
+Client to login and retrieve properties of a small inventory, counting
+the calls made for each method. Tests can answer other methods by adding
+handlers.
+
+"""
+
+import atexit
+import collections
+import re
+import threading
+import time
+
+from BaseHTTPServer import BaseHTTPRequestHandler
+from SocketServer import ThreadingTCPServer
+
+from suds.transport.http import HttpTransport
+
+from psphere.client import Client
+
+ENVELOPE = ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<soapenv:Envelope '
+            'xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            'xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            '<soapenv:Body><%(method)sResponse xmlns="urn:vim25">'
+            '%(returnval)s</%(method)sResponse></soapenv:Body>'
+            '</soapenv:Envelope>')
+
+FAULT = ('<?xml version="1.0" encoding="UTF-8"?>'
+         '<soapenv:Envelope '
+         'xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+         'xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+         'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+         '<soapenv:Body><soapenv:Fault><faultcode>ServerFaultCode'
+         '</faultcode><faultstring>%(message)s</faultstring><detail>'
+         '<%(fault)sFault xmlns="urn:vim25" xsi:type="%(fault)s">'
+         '%(detail)s</%(fault)sFault></detail></soapenv:Fault>'
+         '</soapenv:Body></soapenv:Envelope>')
+
+SERVICE_CONTENT = (
+    '<returnval><rootFolder type="Folder">group-d1</rootFolder>'
+    '<propertyCollector type="PropertyCollector">propertyCollector'
+    '</propertyCollector>'
+    '<about><name>Stub</name><fullName>Stub</fullName><vendor>psphere'
+    '</vendor><version>5.1.0</version><build>1</build>'
+    '<osType>linux-x64</osType><productLineId>vpx</productLineId>'
+    '<apiType>VirtualCenter</apiType><apiVersion>5.1</apiVersion></about>'
+    '<viewManager type="ViewManager">ViewManager</viewManager>'
+    '<sessionManager type="SessionManager">SessionManager</sessionManager>'
+    '<searchIndex type="SearchIndex">SearchIndex</searchIndex>'
+    '</returnval>')
+
+USER_SESSION = ('<returnval><key>1</key><userName>stub</userName>'
+                '<fullName>Stub</fullName>'
+                '<loginTime>2013-04-05T00:00:00Z</loginTime>'
+                '<lastActiveTime>2013-04-05T00:00:00Z</lastActiveTime>'
+                '<locale>en</locale><messageLocale>en</messageLocale>'
+                '</returnval>')
+
+METHOD = re.compile(r"<[\w]+:Body><[\w]+:(\w+)")
+OBJ = re.compile(r'<[\w:]*obj type="(\w+)"[^>]*>([^<]+)<')
+TYPE = re.compile(r"<[\w:]*type>(\w+)</[\w:]*type>")
+PATH = re.compile(r"<[\w:]*pathSet>([\w.]+)</[\w:]*pathSet>")
+
+
+def string(value):
+    """Get a property value of type xsd:string."""
+    return ("xsd:string", value)
+
+
+class StubFault(Exception):
+    """Raised by a handler to answer with a fault."""
+    def __init__(self, fault, message="", detail=""):
+        Exception.__init__(self, message)
+        self.fault = fault
+        self.message = message
+        self.detail = detail
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+
+    def do_POST(self):
+        stub = self.server.stub
+        request = self.rfile.read(int(self.headers["Content-Length"]))
+        method = METHOD.search(request).group(1)
+        stub.calls[method] += 1
+        if stub.latency:
+            time.sleep(stub.latency)
+        status = 200
+        try:
+            returnval = stub.handlers[method](request)
+            body = ENVELOPE % {"method": method, "returnval": returnval}
+        except StubFault, e:
+            status = 500
+            body = FAULT % {"fault": e.fault, "message": e.message,
+                            "detail": e.detail}
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Set-Cookie", 'vmware_soap_session="abc"; Path=/')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(object):
+    """A vSphere server with an inventory of managed objects.
+
+    The properties of each object are kept in objects, keyed by (type,
+    value), as a dict of the XML type and content of each property path.
+    RetrieveProperties returns the objects named in the filter, or every
+    object of the filter's type for a traversal.
+
+    """
+    def __init__(self):
+        self._server = ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.address = "127.0.0.1:%s" % self._server.server_address[1]
+        self.url = "http://%s/sdk" % self.address
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.reset()
+
+    def reset(self):
+        """Forget the inventory, calls and added handlers."""
+        self.calls = collections.Counter()
+        self.objects = {}
+        self.latency = 0
+        self.handlers = {
+            "RetrieveServiceContent": lambda request: SERVICE_CONTENT,
+            "Login": lambda request: USER_SESSION,
+            "Logout": lambda request: "",
+            "CurrentTime": lambda request:
+                "<returnval>2013-04-05T00:00:00Z</returnval>",
+            "RetrieveProperties": self.retrieve_properties,
+            "RetrievePropertiesEx": self.retrieve_properties_ex,
+            "CreatePropertyCollector": lambda request:
+                '<returnval type="PropertyCollector">session[1]</returnval>',
+            "CreateFilter": lambda request:
+                '<returnval type="PropertyFilter">session[1]/filter'
+                '</returnval>',
+            "DestroyPropertyCollector": lambda request: "",
+            "DestroyPropertyFilter": lambda request: "",
+        }
+
+    def add(self, type_, value, **properties):
+        """Add an object to the inventory.
+
+        The keyword arguments are the properties, with the dots of paths
+        replaced by underscores, as (XML type, content) tuples.
+
+        """
+        self.objects[(type_, value)] = dict(
+            (name.replace("_", "."), val) for name, val in properties.items())
+
+    def object_contents(self, request):
+        """Get the ObjectContents of the objects a filter selects."""
+        paths = PATH.findall(request)
+        if "selectSet" in request:
+            type_ = TYPE.search(request).group(1)
+            keys = sorted(key for key in self.objects if key[0] == type_)
+        else:
+            keys = [key for key in OBJ.findall(request)
+                    if key in self.objects]
+
+        contents = []
+        for type_, value in keys:
+            properties = self.objects[(type_, value)]
+            content = '<obj type="%s">%s</obj>' % (type_, value)
+            for path in paths:
+                if path in properties:
+                    content += ('<propSet><name>%s</name><val xsi:type="%s">'
+                                '%s</val></propSet>' %
+                                ((path,) + properties[path]))
+            contents.append(content)
+        return contents
+
+    def retrieve_properties(self, request):
+        return "".join("<returnval>%s</returnval>" % content
+                       for content in self.object_contents(request))
+
+    def retrieve_properties_ex(self, request):
+        contents = self.object_contents(request)
+        if not contents:
+            return ""
+        return "<returnval>%s</returnval>" % "".join(
+            "<objects>%s</objects>" % content for content in contents)
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _PlainTransport(HttpTransport):
+    """Speaks HTTP to the stub where a Client would use HTTPS."""
+    def send(self, request):
+        request.url = request.url.replace("https://", "http://", 1)
+        return HttpTransport.send(self, request)
+
+
+_server = None
+_client = None
+
+
+def server():
+    """Get the stub server, started on first use and emptied."""
+    global _server
+    if _server is None:
+        _server = StubServer()
+        # Stopped before the interpreter tears down its thread
+        atexit.register(_server.stop)
+    _server.reset()
+    return _server
+
+
+def client(**kwargs):
+    """Get a new client logged into the stub server, whose inventory and
+    handlers are kept.
+
+    The WSDL is loaded once and shared by every client, keyword arguments
+    create a client of its own instead.
+
+    """
+    global _client
+    if _server is None:
+        server()
+    stub = _server
+    options = {"server": stub.address, "username": "stub",
+               "password": "stub", "wsdl_cache": False,
+               "entity_index": False, "transport": _PlainTransport()}
+    if kwargs:
+        options.update(kwargs)
+        result = Client(**options)
+    else:
+        if _client is None:
+            _client = Client(**options)
+        result = _client.clone()
+    result.set_options(location=stub.url)
+    stub.calls.clear()
+    return result
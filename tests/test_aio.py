@@ -0,0 +1,162 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import datetime
+import socket
+import unittest
+
+import suds
+
+from psphere.aio import AsyncClient, Return
+from psphere.errors import TaskFailedError
+from psphere.managedobjects import Task
+from psphere.soap import ManagedObjectReference
+
+from tests import stub
+
+TASK_ERROR = ('<fault xsi:type="SystemError"><reason>boom</reason></fault>'
+              '<localizedMessage>boom</localizedMessage>')
+
+
+class AsyncClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        for i in range(3):
+            self.server.add("VirtualMachine", "vm-%s" % i,
+                            name=stub.string("vm%s" % i))
+        self.client = stub.client()
+        self.aclient = AsyncClient(self.client, max_connections=2,
+                                   task_interval=0.1)
+
+    def tearDown(self):
+        self.aclient.close()
+
+    def task(self, value, state):
+        properties = {"info_state": ("TaskInfoState", state)}
+        if state == "error":
+            properties["info_error"] = ("LocalizedMethodFault", TASK_ERROR)
+        self.server.add("Task", value, **properties)
+        return Task(ManagedObjectReference("Task", value), self.client)
+
+    def test_invoke(self):
+        futures = [self.aclient.invoke("CurrentTime", self.client.si)
+                   for i in range(5)]
+        times = self.aclient.run(futures)
+        self.assertEqual(len(times), 5)
+        self.assertTrue(isinstance(times[0], datetime.datetime))
+        self.assertEqual(self.server.calls["CurrentTime"], 5)
+
+    def test_find_entity_views(self):
+        vms = self.aclient.run(self.aclient.find_entity_views(
+            "VirtualMachine", properties=["name"]))
+        self.assertEqual(sorted(vm.name for vm in vms), ["vm0", "vm1", "vm2"])
+        self.assertEqual(dict(self.server.calls), {"RetrieveProperties": 1})
+
+    def test_get_views(self):
+        mo_refs = [ManagedObjectReference("VirtualMachine", "vm-%s" % i)
+                   for i in range(3)]
+        vms = self.aclient.run(self.aclient.get_views(mo_refs, ["name"]))
+        self.assertEqual([vm.name for vm in vms], ["vm0", "vm1", "vm2"])
+        self.assertEqual(dict(self.server.calls), {"RetrieveProperties": 1})
+
+    def test_wait_for_task(self):
+        task = self.task("task-1", "running")
+
+        def finish():
+            # The first poll, after 0.1 seconds, finds the task running
+            waited = self.aclient.wait_for_task(task)
+            yield self.aclient.sleep(0.15)
+            self.task("task-1", "success")
+            result = yield waited
+            raise Return(result)
+
+        self.assertTrue(self.aclient.run(finish()) is task)
+        self.assertEqual(task._get_cached("info.state")[0], "success")
+        self.assertEqual(self.server.calls["RetrieveProperties"], 2)
+
+    def test_task_failed(self):
+        task = self.task("task-1", "error")
+        self.assertRaises(TaskFailedError, self.aclient.run,
+                          self.aclient.wait_for_task(task))
+
+    def test_task_added_while_polling(self):
+        first = self.task("task-1", "success")
+        second = self.task("task-2", "success")
+        # The first poll is sent after 0.1 seconds and replied to after 0.4
+        self.server.latency = 0.3
+
+        def wait():
+            waited = self.aclient.wait_for_task(first)
+            yield self.aclient.sleep(0.2)
+            tasks = yield [waited, self.aclient.wait_for_task(second)]
+            raise Return(tasks)
+
+        self.assertEqual(self.aclient.run(wait()), [first, second])
+        self.assertEqual(self.server.calls["RetrieveProperties"], 2)
+
+    def test_purged_task(self):
+        tasks = [self.task("task-1", "success"),
+                 Task(ManagedObjectReference("Task", "task-2"), self.client),
+                 self.task("task-3", "success")]
+        self.server.handlers["RetrieveProperties"] = self.retrieve_existing
+        futures = [self.aclient.wait_for_task(task) for task in tasks]
+        self.aclient.run(self.aclient.sleep(0.2))
+        self.assertEqual(futures[0].result(), tasks[0])
+        self.assertRaises(suds.WebFault, futures[1].result)
+        self.assertEqual(futures[2].result(), tasks[2])
+        # The call for all three, then one for each
+        self.assertEqual(self.server.calls["RetrieveProperties"], 4)
+
+    def retrieve_existing(self, request):
+        for key in stub.OBJ.findall(request):
+            if key not in self.server.objects:
+                raise stub.StubFault("ManagedObjectNotFound",
+                                     "The object has already been deleted")
+        return self.server.retrieve_properties(request)
+
+    def test_relogin(self):
+        self.client.relogin = True
+        self.expired = True
+        self.server.handlers["CurrentTime"] = self.current_time
+        self.server.handlers["Login"] = self.login
+        futures = [self.aclient.invoke("CurrentTime", self.client.si)
+                   for i in range(4)]
+        self.assertEqual(len(self.aclient.run(futures)), 4)
+        # Calls which failed with the old session don't login again
+        self.assertEqual(self.server.calls["Login"], 1)
+
+    def current_time(self, request):
+        if self.expired is True:
+            raise stub.StubFault("NotAuthenticated",
+                                 "The session is not authenticated.")
+        return "<returnval>2013-04-05T00:00:00Z</returnval>"
+
+    def login(self, request):
+        self.expired = False
+        return stub.USER_SESSION
+
+    def test_close_fails_requests(self):
+        self.server.latency = 0.5
+        futures = [self.aclient.invoke("CurrentTime", self.client.si)
+                   for i in range(4)]
+        self.aclient.run(self.aclient.sleep(0.1))
+        self.aclient.close()
+        for future in futures:
+            self.assertTrue(future.done())
+            self.assertRaises(socket.error, future.result)
+
+
+if __name__ == "__main__":
+    unittest.main()
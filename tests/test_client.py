@@ -0,0 +1,225 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import unittest
+
+from psphere import cache_policy
+from psphere.managedobjects import VirtualMachine
+from psphere.soap import ManagedObjectReference
+
+from tests import stub
+
+
+class FindEntityViewsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        for i in range(20):
+            self.server.add("VirtualMachine", "vm-%s" % i,
+                            name=stub.string("vm%s" % i),
+                            runtime_powerState=("VirtualMachinePowerState",
+                                                "poweredOn"))
+        self.client = stub.client()
+
+    def test_one_round_trip(self):
+        vms = self.client.find_entity_views(
+            "VirtualMachine", properties=["name", "runtime.powerState"])
+        self.assertEqual(len(vms), 20)
+        self.assertEqual(sorted(vm.name for vm in vms),
+                         sorted("vm%s" % i for i in range(20)))
+        self.assertEqual(set(vm.runtime.powerState for vm in vms),
+                         set(["poweredOn"]))
+        self.assertEqual(dict(self.server.calls), {"RetrieveProperties": 1})
+
+    def test_all(self):
+        vms = VirtualMachine.all(self.client, properties=["name"])
+        self.assertEqual(len(vms), 20)
+        [vm.name for vm in vms]
+        self.assertEqual(sum(self.server.calls.values()), 1)
+
+    def test_unset_property(self):
+        self.server.add("VirtualMachine", "vm-20")
+        vms = self.client.find_entity_views("VirtualMachine",
+                                            properties=["name"])
+        self.assertEqual(len(vms), 21)
+        self.assertEqual(sum(self.server.calls.values()), 1)
+
+
+class FilterTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        # Neither property is set on the first VM
+        self.server.add("VirtualMachine", "vm-0")
+        self.server.add("VirtualMachine", "vm-1", name=stub.string("vm1"),
+                        runtime_powerState=("VirtualMachinePowerState",
+                                            "poweredOn"))
+        self.client = stub.client()
+
+    def test_find_entity_view_unset_properties(self):
+        vm = self.client.find_entity_view(
+            "VirtualMachine", filter={"name": "vm1",
+                                      "runtime.powerState": "poweredOn"})
+        self.assertEqual(vm._mo_ref.value, "vm-1")
+
+
+class CachePolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        self.server.add("VirtualMachine", "vm-1", name=stub.string("vm1"),
+                        runtime_powerState=("VirtualMachinePowerState",
+                                            "poweredOn"))
+        self.client = stub.client()
+        self.vm = self.client.find_entity_view(
+            "VirtualMachine", properties=["name", "runtime.powerState"])
+        self.server.calls.clear()
+
+    def tearDown(self):
+        cache_policy.clear()
+
+    def test_never_expires(self):
+        cache_policy.set_ttl(0, "VirtualMachine", "name")
+        cache_policy.set_ttl(0, "VirtualMachine", "runtime.powerState")
+        for i in range(3):
+            self.assertEqual(self.vm.name, "vm1")
+            self.assertEqual(self.vm.runtime.powerState, "poweredOn")
+        self.assertEqual(sum(self.server.calls.values()), 0)
+
+    def test_never_cached(self):
+        cache_policy.set_ttl(-1, "VirtualMachine", "name")
+        cache_policy.set_ttl(-1, "VirtualMachine", "runtime.powerState")
+        for i in range(3):
+            self.assertEqual(self.vm.name, "vm1")
+            self.assertEqual(self.vm.runtime.powerState, "poweredOn")
+        self.assertEqual(self.server.calls["RetrieveProperties"], 6)
+
+
+class FilterSpecTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        self.client = stub.client()
+
+    def test_property_spec_per_type(self):
+        mo_refs = ([ManagedObjectReference("VirtualMachine", "vm-%s" % i)
+                    for i in range(3)] +
+                   [ManagedObjectReference("HostSystem", "host-%s" % i)
+                    for i in range(2)])
+        pfs = self.client.get_views_filter_spec(mo_refs, ["name"])
+        self.assertEqual([property_spec.type for property_spec in pfs.propSet],
+                         ["VirtualMachine", "HostSystem"])
+        self.assertEqual(len(pfs.objectSet), 5)
+        # Later filters share the PropertySpecs
+        again = self.client.get_views_filter_spec(mo_refs, ["name"])
+        self.assertTrue(again.propSet[0] is pfs.propSet[0])
+
+    def test_marshal_leaves_shared_specs(self):
+        pfs = self.client.get_search_filter_spec(
+            self.client.sc.rootFolder._mo_ref,
+            self.client._property_spec("VirtualMachine", ["name"]))
+        shared = pfs.propSet + self.client._traversal_specs
+        before = [[(name, id(value)) for name, value in spec]
+                  for spec in shared]
+        self.client._marshal(pfs)
+        # Marshalling an object replaces its lists with new ones
+        self.assertEqual([[(name, id(value)) for name, value in spec]
+                          for spec in shared], before)
+
+
+class MethodTableTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        self.client = stub.client()
+        self.vm = VirtualMachine(
+            ManagedObjectReference("VirtualMachine", "vm-1"), self.client)
+
+    def test_unknown_method(self):
+        self.assertRaises(AttributeError, getattr, self.vm, "PowerOnVM")
+        self.assertFalse("PowerOnVM" in VirtualMachine.__dict__)
+        self.assertEqual(sum(self.server.calls.values()), 0)
+
+    def test_method_cached_on_class(self):
+        self.client.si.CurrentTime()
+        self.assertTrue("CurrentTime" in type(self.client.si).__dict__)
+        self.assertEqual(self.server.calls["CurrentTime"], 1)
+
+    def test_method_missing_from_other_client(self):
+        self.vm.PowerOnVM_Task
+        self.assertTrue("PowerOnVM_Task" in VirtualMachine.__dict__)
+        # A client whose WSDL lacks the method fails before calling it
+        other = stub.client()
+        other._methods = other._methods - frozenset(["PowerOnVM_Task"])
+        vm = VirtualMachine(ManagedObjectReference("VirtualMachine", "vm-1"),
+                            other)
+        self.assertRaises(AttributeError, vm.PowerOnVM_Task)
+        self.assertEqual(sum(self.server.calls.values()), 0)
+
+    def test_property_attribute_error(self):
+        broken = type("BrokenVirtualMachine", (VirtualMachine,),
+                      {"__slots__": [],
+                       "broken": property(lambda self: self.missing_thing)})
+        vm = broken(ManagedObjectReference("VirtualMachine", "vm-1"),
+                    self.client)
+        try:
+            vm.broken
+        except AttributeError, e:
+            self.assertTrue("missing_thing" in str(e))
+        else:
+            self.fail("AttributeError not raised")
+
+
+class ReloginTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        self.server.add("VirtualMachine", "vm-1", name=stub.string("vm1"))
+        self.server.handlers["CreateContainerView"] = self.create_view
+        self.server.handlers["RetrieveProperties"] = self.retrieve
+        self.views = []
+        self.expired = False
+        self.client = stub.client()
+        self.client.relogin = True
+        self.client.search_backend = "container_view"
+
+    def create_view(self, request):
+        self.views.append("session[%s]" % (len(self.views) + 1))
+        return '<returnval type="ContainerView">%s</returnval>' % \
+            self.views[-1]
+
+    def retrieve(self, request):
+        if self.expired is True:
+            self.expired = False
+            # Expiring the session destroys its views
+            del self.views[:]
+            raise stub.StubFault("NotAuthenticated",
+                                 "The session is not authenticated.")
+        value = stub.OBJ.search(request).group(2)
+        if value not in self.views:
+            raise stub.StubFault("ManagedObjectNotFound",
+                                 "The object has already been deleted")
+        return self.server.retrieve_properties(request)
+
+    def test_container_view_recreated(self):
+        vms = self.client.find_entity_views("VirtualMachine",
+                                            properties=["name"])
+        self.assertEqual([vm.name for vm in vms], ["vm1"])
+        self.expired = True
+        vms = self.client.find_entity_views("VirtualMachine",
+                                            properties=["name"])
+        self.assertEqual([vm.name for vm in vms], ["vm1"])
+        self.assertEqual(self.server.calls["Login"], 1)
+        self.assertEqual(self.server.calls["CreateContainerView"], 2)
+        # And later searches use the new view
+        self.client.find_entity_views("VirtualMachine", properties=["name"])
+        self.assertEqual(self.server.calls["CreateContainerView"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
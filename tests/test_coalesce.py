@@ -0,0 +1,204 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import threading
+import time
+import unittest
+
+from psphere.coalesce import RequestCoalescer
+from psphere.soap import ManagedObjectReference
+
+
+class FailingClient(object):
+    """Fails its first call with an exception, then returns nothing."""
+    def __init__(self, exception, method="_retrieve"):
+        self.exception = exception
+        self.method = method
+        self.calls = 0
+
+    def _fail(self):
+        self.calls += 1
+        if self.calls == 1:
+            raise self.exception
+
+    def _objects_filter_spec(self, mo_refs, paths):
+        if self.method == "_objects_filter_spec":
+            self._fail()
+        return None
+
+    def _retrieve(self, method, specSet):
+        if self.method == "_retrieve":
+            self._fail()
+        return []
+
+
+class View(object):
+    def __init__(self, mo_ref):
+        self._mo_ref = mo_ref
+
+
+class ObjectContent(object):
+    def __init__(self, mo_ref):
+        self.obj = View(mo_ref)
+
+
+class RecordingClient(object):
+    """Returns an ObjectContent for each managed object retrieved,
+    recording the managed objects and properties of each call.
+
+    Calls for a managed object named "vm-bad" fail. Each call first waits,
+    for up to a second, until the coalescer has had a number of requests.
+
+    """
+    def __init__(self, requests=0):
+        self.requests = requests
+        self.coalescer = None
+        self.calls = []
+
+    def _objects_filter_spec(self, mo_refs, paths):
+        return (list(mo_refs), paths)
+
+    def _retrieve(self, method, specSet):
+        deadline = time.time() + 1
+        while (self.coalescer.requests < self.requests and
+               time.time() < deadline):
+            time.sleep(0.01)
+        mo_refs, paths = specSet
+        self.calls.append((sorted(mo_ref.value for mo_ref in mo_refs),
+                           paths))
+        if "vm-bad" in [mo_ref.value for mo_ref in mo_refs]:
+            raise ValueError("The object has already been deleted")
+        return [ObjectContent(mo_ref) for mo_ref in mo_refs]
+
+
+def vm(value):
+    return ManagedObjectReference("VirtualMachine", value)
+
+
+class CoalesceTest(unittest.TestCase):
+    def coalescer(self, window=0, requests=0):
+        self.client = RecordingClient(requests)
+        self.client.coalescer = RequestCoalescer(self.client, window)
+        return self.client.coalescer
+
+    def run_threads(self, coalescer, requests):
+        """Make each (mo_refs, properties) request in a thread of its own.
+
+        :returns: The values of the ObjectContents, or the exception, of \
+        each request.
+
+        """
+        results = [None] * len(requests)
+
+        def retrieve(i, mo_refs, properties):
+            try:
+                results[i] = [object_content.obj._mo_ref.value
+                              for object_content in
+                              coalescer.retrieve(mo_refs, properties)]
+            except Exception, e:
+                results[i] = e
+
+        threads = [threading.Thread(target=retrieve, args=(i,) + request)
+                   for i, request in enumerate(requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        return results
+
+    def test_single_flight(self):
+        host = ManagedObjectReference("HostSystem", "host-1")
+        coalescer = self.coalescer(requests=8)
+        results = self.run_threads(coalescer, [([host], ["summary"])] * 8)
+        self.assertEqual(results, [["host-1"]] * 8)
+        self.assertEqual(coalescer.report(),
+                         {"requests": 8, "coalesced": 7, "calls": 1})
+
+    def test_window_merges_requests(self):
+        coalescer = self.coalescer(window=0.01)
+        results = self.run_threads(coalescer, [
+            ([vm("vm-1")], ["name"]), ([vm("vm-2")], ["runtime"]),
+            ([vm("vm-3")], ["name"])])
+        self.assertEqual(sorted(results), [["vm-1"], ["vm-2"], ["vm-3"]])
+        self.assertEqual(coalescer.calls, 1)
+        # One PropertySpec with the properties requested of any VM
+        self.assertEqual(self.client.calls, [
+            (["vm-1", "vm-2", "vm-3"],
+             [("VirtualMachine", ["name", "runtime"])])])
+
+    def test_failure_retried_per_caller(self):
+        coalescer = self.coalescer(window=0.05)
+        results = self.run_threads(coalescer, [
+            ([vm("vm-1")], ["name"]), ([vm("vm-bad")], ["name"]),
+            ([vm("vm-2")], ["name"])])
+        self.assertEqual(results[0], ["vm-1"])
+        self.assertTrue(isinstance(results[1], ValueError))
+        self.assertEqual(results[2], ["vm-2"])
+        self.assertEqual(coalescer.calls, 4)
+
+    def test_duplicates_retrieved_once(self):
+        coalescer = self.coalescer()
+        object_contents = coalescer.retrieve([vm("vm-1"), vm("vm-1")],
+                                             ["name"])
+        self.assertEqual(len(object_contents), 1)
+        self.assertEqual(self.client.calls, [(["vm-1"],
+                                              [("VirtualMachine", ["name"])])])
+
+
+class LeaderFailureTest(unittest.TestCase):
+    def retrieve(self, client):
+        coalescer = RequestCoalescer(client, window=0.2)
+        errors = {}
+
+        def retrieve(name):
+            mo_ref = ManagedObjectReference("VirtualMachine", name)
+            try:
+                coalescer.retrieve([mo_ref], ["name"])
+            except BaseException, e:
+                errors[name] = e
+
+        threads = []
+        for name in ["vm-1", "vm-2"]:
+            thread = threading.Thread(target=retrieve, args=(name,))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+            # The second joins the first's batch
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        # Later requests are retrieved as usual
+        self.assertEqual(coalescer.retrieve(
+            [ManagedObjectReference("VirtualMachine", "vm-1")], ["name"]), [])
+        return errors
+
+    def test_keyboard_interrupt(self):
+        errors = self.retrieve(FailingClient(KeyboardInterrupt()))
+        self.assertEqual(sorted(errors), ["vm-1", "vm-2"])
+        for error in errors.values():
+            self.assertTrue(isinstance(error, KeyboardInterrupt))
+
+    def test_filter_spec_failure(self):
+        errors = self.retrieve(FailingClient(ValueError("bad spec"),
+                                          "_objects_filter_spec"))
+        self.assertEqual(sorted(errors), ["vm-1", "vm-2"])
+        for error in errors.values():
+            self.assertTrue(isinstance(error, ValueError))
+
+
+if __name__ == "__main__":
+    unittest.main()
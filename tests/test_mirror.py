@@ -0,0 +1,65 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import re
+import unittest
+
+from psphere.mirror import InventoryMirror
+
+from tests import stub
+
+UPDATE_SET = ('<returnval><version>%(version)s</version><filterSet>'
+              '<filter type="PropertyFilter">session[1]/filter</filter>'
+              '<objectSet><kind>enter</kind>'
+              '<obj type="VirtualMachine">vm-1</obj>'
+              '<changeSet><name>name</name><op>assign</op>'
+              '<val xsi:type="xsd:string">vm1</val></changeSet>'
+              '</objectSet></filterSet></returnval>')
+
+MAX_WAIT = re.compile(r"<[\w:]*maxWaitSeconds>(\d+)<")
+
+
+class UpdateTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        self.server.handlers["WaitForUpdatesEx"] = self.wait_for_updates
+        self.waits = []
+        self.changes_after = 3
+        self.client = stub.client()
+        self.mirror = InventoryMirror(self.client, {"VirtualMachine":
+                                                    ["name"]})
+
+    def wait_for_updates(self, request):
+        self.waits.append(int(MAX_WAIT.search(request).group(1)))
+        if len(self.waits) < self.changes_after:
+            return ""
+        return UPDATE_SET % {"version": len(self.waits)}
+
+    def test_wait_until_change(self):
+        self.assertEqual(self.mirror.update(max_wait=None), 1)
+        self.assertEqual(self.waits, [15, 15, 15])
+        self.assertEqual(self.mirror.views()[0].name, "vm1")
+
+    def test_no_wait(self):
+        self.assertEqual(self.mirror.update(), 0)
+        self.assertEqual(self.waits, [0])
+
+    def test_wait_within_limit(self):
+        self.changes_after = 1
+        self.assertEqual(self.mirror.update(max_wait=5), 1)
+        self.assertEqual(self.waits, [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import unittest
+
+from psphere.prefetch import Prefetcher
+from psphere.soap import ManagedObjectReference
+
+from tests import stub
+
+
+class PrefetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        for i in range(20):
+            self.server.add("VirtualMachine", "vm-%s" % i,
+                            name=stub.string("vm%s" % i),
+                            runtime=("VirtualMachineRuntimeInfo",
+                                     "<powerState>poweredOn</powerState>"))
+        self.client = stub.client()
+        # Views looked up one at a time, rather than in a ViewList
+        self.vms = [self.client._mor_to_pobject(
+                    ManagedObjectReference("VirtualMachine", "vm-%s" % i))
+                    for i in range(20)]
+
+    def test_siblings(self):
+        self.client.prefetcher = Prefetcher(batch_size=8)
+        self.assertEqual([vm.name for vm in self.vms],
+                         ["vm%s" % i for i in range(20)])
+        # One call for each batch of views
+        self.assertEqual(self.server.calls["RetrieveProperties"], 3)
+
+    def test_learns_properties_used_together(self):
+        self.client.prefetcher = Prefetcher(siblings=False)
+        for i, vm in enumerate(self.vms):
+            self.assertEqual(vm.name, "vm%s" % i)
+            self.assertEqual(vm.runtime.powerState, "poweredOn")
+        # Only the first view's runtime is retrieved on its own
+        self.assertEqual(self.server.calls["RetrieveProperties"], 21)
+        self.assertEqual(self.client.prefetcher.report()["learned"],
+                         {"VirtualMachine": {"name": ["runtime"],
+                                             "runtime": ["name"]}})
+
+    def test_without_prefetcher(self):
+        for vm in self.vms:
+            vm.name
+            vm.runtime
+        self.assertEqual(self.server.calls["RetrieveProperties"], 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from suds.mx import Content
+from suds.mx.literal import Literal
+
+from psphere.soap import WsdlCache
+
+from tests import stub
+
+
+class WsdlCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = os.path.join(self.directory, "cache")
+        self.cache = WsdlCache(self.location, "key")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_put_creates_location(self):
+        self.cache.put("wsdl", {"a": 1})
+        self.assertEqual(self.cache.get("wsdl"), {"a": 1})
+        self.assertEqual(len(os.listdir(self.location)), 1)
+
+    def test_unpicklable_leaves_nothing(self):
+        self.cache.put("wsdl", lambda: None)
+        self.assertEqual(self.cache.get("wsdl"), None)
+        self.assertEqual(os.listdir(self.location), [])
+
+
+class PrototypeTest(unittest.TestCase):
+    def marshal(self, client, obj):
+        content = Content(tag="spec", value=obj,
+                          type=obj.__metadata__.sxtype)
+        return Literal(client.wsdl.schema).process(content).plain()
+
+    def test_created_objects_are_independent(self):
+        client = stub.client()
+        spec = client.create("VirtualMachineConfigSpec")
+        device_change = client.create("VirtualDeviceConfigSpec")
+        device_change.operation = "add"
+        spec.deviceChange.append(device_change)
+        spec.cpuAllocation.limit = 1000
+        spec.cpuAllocation.shares.level.value = "high"
+        spec.name = "vm1"
+        self.assertTrue("deviceChange" in self.marshal(client, spec))
+
+        pristine = client.factory.create("ns0:VirtualMachineConfigSpec")
+        for i in range(2):
+            created = client.create("VirtualMachineConfigSpec")
+            self.assertEqual(created.deviceChange, [])
+            self.assertEqual(created.cpuAllocation.limit, None)
+            self.assertEqual(str(created), str(pristine))
+            self.assertEqual(self.marshal(client, created),
+                             self.marshal(client, pristine))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import re
+import unittest
+
+from psphere.managedobjects import Task, VirtualMachine
+from psphere.soap import ManagedObjectReference
+
+from tests import stub
+
+TASK_INFO = ('<key>%(value)s</key><task type="Task">%(value)s</task>'
+             '<descriptionId>VirtualMachine.powerOn</descriptionId>'
+             '<state>%(state)s</state><cancelled>false</cancelled>'
+             '<cancelable>false</cancelable>'
+             '<queueTime>2013-04-05T00:00:00Z</queueTime>'
+             '<eventChainId>1</eventChainId>')
+
+UPDATE_SET = ('<returnval><version>%(version)s</version><filterSet>'
+              '<filter type="PropertyFilter">session[1]/filter</filter>'
+              '<objectSet><kind>modify</kind><obj type="Task">%(value)s</obj>'
+              '<changeSet><name>info.state</name><op>assign</op>'
+              '<val xsi:type="TaskInfoState">%(state)s</val></changeSet>'
+              '</objectSet></filterSet></returnval>')
+
+OBJECT_UPDATE = ('<objectSet><kind>modify</kind><obj type="Task">%(value)s'
+                 '</obj><changeSet><name>info.state</name><op>assign</op>'
+                 '<val xsi:type="TaskInfoState">%(state)s</val></changeSet>'
+                 '</objectSet>')
+
+THIS = re.compile(r'<[\w:]*_this type="\w+"[^>]*>([^<]+)<')
+
+MAX_WAIT = re.compile(r"<[\w:]*maxWaitSeconds>(\d+)<")
+
+
+class WaitForTasksTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        self.server.add("Task", "task-1", info=(
+            "TaskInfo", TASK_INFO % {"value": "task-1", "state": "success"}))
+        self.server.handlers["WaitForUpdatesEx"] = self.wait_for_updates
+        self.waits = []
+        self.client = stub.client()
+
+    def wait_for_updates(self, request):
+        """Report no change for two waits, then the task succeeding."""
+        match = MAX_WAIT.search(request)
+        self.waits.append(match and int(match.group(1)))
+        if len(self.waits) < 3:
+            return ""
+        return UPDATE_SET % {"version": 1, "value": "task-1",
+                             "state": "success"}
+
+    def test_long_task(self):
+        task = Task(ManagedObjectReference("Task", "task-1"), self.client)
+        self.client.wait_for_tasks([task])
+        self.assertEqual(task.info.state, "success")
+        # Each wait is kept under the client's 30 second timeout
+        self.assertEqual(self.waits, [15, 15, 15])
+
+
+class RunTasksTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        for i in range(1, 4):
+            self.server.add("VirtualMachine", "vm-%s" % i,
+                            name=stub.string("vm%s" % i))
+        self.server.add("Task", "task-1", info=(
+            "TaskInfo", TASK_INFO % {"value": "task-1", "state": "success"}))
+        self.server.add("Task", "task-3", info=(
+            "TaskInfo", TASK_INFO % {"value": "task-3", "state": "success"}))
+        # task-2 has been purged by the time its info is retrieved
+        self.server.handlers["PowerOnVM_Task"] = self.power_on
+        self.server.handlers["WaitForUpdatesEx"] = self.wait_for_updates
+        self.server.handlers["RetrieveProperties"] = self.retrieve
+        self.client = stub.client()
+
+    def power_on(self, request):
+        value = THIS.search(request).group(1)
+        return '<returnval type="Task">task-%s</returnval>' % \
+            value.split("-")[1]
+
+    def wait_for_updates(self, request):
+        return ('<returnval><version>1</version><filterSet>'
+                '<filter type="PropertyFilter">session[1]/filter</filter>'
+                '%s</filterSet></returnval>' % "".join(
+                    OBJECT_UPDATE % {"value": "task-%s" % i,
+                                     "state": "success"}
+                    for i in range(1, 4)))
+
+    def retrieve(self, request):
+        for key in stub.OBJ.findall(request):
+            if key not in self.server.objects:
+                raise stub.StubFault("ManagedObjectNotFound",
+                                     "The object has already been deleted")
+        return self.server.retrieve_properties(request)
+
+    def test_purged_task(self):
+        vms = [VirtualMachine(ManagedObjectReference("VirtualMachine",
+                                                     "vm-%s" % i),
+                              self.client)
+               for i in range(1, 4)]
+        results, failures = self.client.run_tasks("PowerOnVM_Task", vms)
+        self.assertEqual(failures, {})
+        self.assertEqual(sorted(task._mo_ref.value
+                                for task in results.values()),
+                         ["task-1", "task-2", "task-3"])
+        self.assertEqual(results[vms[0]].info.state, "success")
+        self.assertEqual(results[vms[2]].info.state, "success")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import socket
+import threading
+import time
+import unittest
+
+from suds.transport import Request
+
+from psphere import aio
+from psphere.soap import ConnectionPool, KeepAliveTransport
+
+RESPONSE = ("HTTP/1.1 200 OK\r\nContent-Type: text/xml\r\n"
+            "Content-Length: 2\r\n\r\nok")
+
+
+class ScriptedServer(object):
+    """Answers each request on a connection as the next action says.
+
+    "ok" responds and keeps the connection open, "close" closes it
+    without a response and "hang" holds the request without responding.
+
+    """
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.requests = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(5)
+        self.host = "127.0.0.1:%s" % self._sock.getsockname()[1]
+        thread = threading.Thread(target=self._serve)
+        thread.daemon = True
+        thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                connection, address = self._sock.accept()
+            except socket.error:
+                return
+            thread = threading.Thread(target=self._handle,
+                                      args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def _handle(self, connection):
+        f = connection.makefile("rb")
+        while True:
+            length = None
+            line = f.readline()
+            if not line:
+                break
+            while line.strip():
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":")[1])
+                line = f.readline()
+            f.read(length or 0)
+            self.requests += 1
+            action = self.actions.pop(0)
+            if action == "ok":
+                connection.sendall(RESPONSE)
+            elif action == "hang":
+                time.sleep(3)
+                break
+            else:
+                break
+        f.close()
+        connection.close()
+
+    def stop(self):
+        self._sock.close()
+
+
+class KeepAliveTransportTest(unittest.TestCase):
+    def send(self, server):
+        transport = KeepAliveTransport(pool=ConnectionPool())
+        transport.options.timeout = 1
+        request = Request("http://%s/sdk" % server.host, "<request/>")
+        transport.send(request)
+        return transport.send(request)
+
+    def test_retry_when_closed_unanswered(self):
+        server = ScriptedServer(["ok", "close", "ok"])
+        self.assertEqual(self.send(server).message, "ok")
+        self.assertEqual(server.requests, 3)
+        server.stop()
+
+    def test_no_retry_after_timeout(self):
+        server = ScriptedServer(["ok", "hang", "ok"])
+        self.assertRaises(socket.timeout, self.send, server)
+        self.assertEqual(server.requests, 2)
+        server.stop()
+
+
+class KeepAlivePoolTest(unittest.TestCase):
+    def test_unlimited_by_default(self):
+        pool = ConnectionPool()
+        connections = [pool.get("http", "127.0.0.1:1", 1) for i in range(10)]
+        self.assertEqual(len(connections), 10)
+
+    def test_full_pool_times_out(self):
+        pool = ConnectionPool(maxsize=1)
+        connection, reused = pool.get("http", "127.0.0.1:1", 1)
+        start = time.time()
+        self.assertRaises(socket.timeout, pool.get, "http", "127.0.0.1:1",
+                          0.2)
+        self.assertTrue(time.time() - start < 1)
+        # Other hosts have connections of their own
+        pool.get("http", "127.0.0.1:2", 0.2)
+        pool.put("http", "127.0.0.1:1", connection)
+        self.assertEqual(pool.get("http", "127.0.0.1:1", 0.2),
+                         (connection, True))
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def send(self, server, timeout=1):
+        loop = aio.EventLoop()
+        pool = aio.ConnectionPool(loop, "http", server.host, maxsize=1,
+                                  timeout=timeout)
+        data = ("POST /sdk HTTP/1.1\r\nHost: %s\r\nContent-Length: 10\r\n\r\n"
+                "<request/>" % server.host)
+        results = []
+        for i in range(2):
+            future = pool.send(data)
+            loop.run_until(future)
+            results.append(future)
+        pool.close()
+        return results
+
+    def test_retry_when_closed_unanswered(self):
+        server = ScriptedServer(["ok", "close", "ok"])
+        first, second = self.send(server)
+        self.assertEqual(second.result().status, 200)
+        self.assertEqual(server.requests, 3)
+        server.stop()
+
+    def test_no_retry_after_timeout(self):
+        server = ScriptedServer(["ok", "hang", "ok"])
+        first, second = self.send(server)
+        self.assertRaises(socket.timeout, second.result)
+        self.assertEqual(server.requests, 2)
+        server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# Copyright 2010 Jonathan Kinred
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at:
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sys
+import threading
+import unittest
+
+from psphere import ManagedObject, ViewList
+from psphere.prefetch import Prefetcher
+from psphere.soap import ManagedObjectReference
+
+from tests import stub
+
+
+class LayoutTest(unittest.TestCase):
+    def test_threads_get_distinct_positions(self):
+        interval = sys.getcheckinterval()
+        sys.setcheckinterval(1)
+        try:
+            for i in range(1000):
+                cls = type("Stress%s" % i, (ManagedObject,),
+                           {"__slots__": []})
+                views = [cls(ManagedObjectReference(cls.__name__,
+                                                    "obj-%s" % j), None)
+                         for j in range(8)]
+                start = threading.Event()
+                threads = [threading.Thread(target=self.cache,
+                                            args=(start, view, j))
+                           for j, view in enumerate(views)]
+                for thread in threads:
+                    thread.start()
+                start.set()
+                for thread in threads:
+                    thread.join()
+
+                positions = cls._positions.values()
+                self.assertEqual(len(set(positions)), len(positions))
+                for j, view in enumerate(views):
+                    for k in range(8):
+                        self.assertEqual(
+                            view._get_cached("p%s_%s" % (j, k))[0], (j, k))
+        finally:
+            sys.setcheckinterval(interval)
+
+    def test_threads_share_a_view(self):
+        interval = sys.getcheckinterval()
+        sys.setcheckinterval(1)
+        try:
+            for i in range(300):
+                cls = type("Shared%s" % i, (ManagedObject,),
+                           {"__slots__": []})
+                view = cls(ManagedObjectReference(cls.__name__, "obj-1"),
+                           None)
+                start = threading.Event()
+                threads = [threading.Thread(target=self.cache,
+                                            args=(start, view, j))
+                           for j in range(8)]
+                for thread in threads:
+                    thread.start()
+                start.set()
+                for thread in threads:
+                    thread.join()
+
+                for j in range(8):
+                    for k in range(8):
+                        self.assertEqual(
+                            view._get_cached("p%s_%s" % (j, k))[0], (j, k))
+        finally:
+            sys.setcheckinterval(interval)
+
+    def cache(self, start, view, j):
+        start.wait()
+        for k in range(8):
+            view._set_cached("p%s_%s" % (j, k), (j, k), 0)
+
+
+class ViewListTest(unittest.TestCase):
+    def setUp(self):
+        self.server = stub.server()
+        refs = "".join('<ManagedObjectReference type="VirtualMachine">vm-%s'
+                       '</ManagedObjectReference>' % i for i in range(10))
+        self.server.add("HostSystem", "host-1",
+                        vm=("ArrayOfManagedObjectReference", refs))
+        for i in range(10):
+            self.server.add("VirtualMachine", "vm-%s" % i,
+                            name=stub.string("vm%s" % i))
+        self.client = stub.client()
+        self.host = self.client._mor_to_pobject(
+            ManagedObjectReference("HostSystem", "host-1"))
+
+    def names(self):
+        vms = self.host.vm
+        self.assertTrue(isinstance(vms, ViewList))
+        self.server.calls.clear()
+        return [vm.name for vm in vms]
+
+    def test_one_request(self):
+        self.assertEqual(self.names(), ["vm%s" % i for i in range(10)])
+        self.assertEqual(dict(self.server.calls), {"RetrieveProperties": 1})
+
+    def test_batch_size(self):
+        self.client.prefetcher = Prefetcher(siblings=False, batch_size=4)
+        self.assertEqual(self.names(), ["vm%s" % i for i in range(10)])
+        self.assertEqual(dict(self.server.calls), {"RetrieveProperties": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()